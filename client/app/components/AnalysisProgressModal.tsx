@@ -7,6 +7,7 @@ interface AnalysisProgressModalProps {
   step: string;
   error: string | null;
   resultUrl: string | null;
+  onRefresh?: () => void;
 }
 
 export default function AnalysisProgressModal({
@@ -15,7 +16,8 @@ export default function AnalysisProgressModal({
   progress,
   step,
   error,
-  resultUrl
+  resultUrl,
+  onRefresh
 }: AnalysisProgressModalProps) {
   if (!isOpen) return null;
 
@@ -138,6 +140,24 @@ export default function AnalysisProgressModal({
               새 탭에서 열기
             </a>
           )}
+          {resultUrl && onRefresh && (
+            <button
+              onClick={onRefresh}
+              title="이전 결과를 쓰지 않고 다시 분석"
+              style={{
+                padding: '8px 16px',
+                backgroundColor: 'rgba(255,255,255,0.2)',
+                color: 'white',
+                border: 'none',
+                borderRadius: '6px',
+                cursor: 'pointer',
+                fontSize: '0.9em',
+                fontWeight: 'bold'
+              }}
+            >
+              다시 분석
+            </button>
+          )}
           <button
             onClick={onClose}
             style={{
@@ -78,6 +78,7 @@ export default function ExamAnalyzerPage() {
   // Question analysis states
   const [showAnalysisModal, setShowAnalysisModal] = useState(false);
   const [analysisUrl, setAnalysisUrl] = useState<string | null>(null);
+  const [analysisQuestion, setAnalysisQuestion] = useState<QuestionData | null>(null);
   const [analysisError, setAnalysisError] = useState<string | null>(null);
   const [analysisProgress, setAnalysisProgress] = useState<number>(0);
   const [analysisStep, setAnalysisStep] = useState<string>('');
@@ -196,12 +197,14 @@ export default function ExamAnalyzerPage() {
   }, [analyzeImage, result, isAnalyzing]);
 
   // Question analysis (SSE)
-  const analyzeQuestion = useCallback(async (question: QuestionData) => {
+  // force: 서버의 이전 분석 결과(캐시)를 쓰지 않고 다시 분석
+  const analyzeQuestion = useCallback(async (question: QuestionData, force = false) => {
     if (!currentSessionId) {
       alert('세션을 먼저 생성해주세요.');
       return;
     }
 
+    setAnalysisQuestion(question);
     setAnalysisError(null);
     setAnalysisUrl(null);
     setAnalysisProgress(0);
@@ -212,7 +215,7 @@ export default function ExamAnalyzerPage() {
       const response = await fetch(`${API_URL}/sessions/${currentSessionId}/analyze-question`, {
         method: 'POST',
         headers: getApiHeaders({ 'Content-Type': 'application/json' }),
-        body: JSON.stringify({ question })
+        body: JSON.stringify({ question, force })
       });
 
       if (!response.ok) {
@@ -237,7 +240,10 @@ export default function ExamAnalyzerPage() {
           if (line.startsWith('data: ')) {
             try {
               const data = JSON.parse(line.slice(6));
-              setAnalysisProgress(data.progress || 0);
+              // 대기열 안내(queued) 등 progress가 없는 이벤트는 진행률을 되돌리지 않음
+              if (typeof data.progress === 'number') {
+                setAnalysisProgress(data.progress);
+              }
               setAnalysisStep(data.message || '');
 
               if (data.step === 'complete') {
@@ -513,6 +519,7 @@ export default function ExamAnalyzerPage() {
           step={analysisStep}
           error={analysisError}
           resultUrl={analysisUrl}
+          onRefresh={analysisQuestion ? () => analyzeQuestion(analysisQuestion, true) : undefined}
         />
 
         {/* Settings modal */}
@@ -3,14 +3,22 @@
 문항 시각화 모듈 (2단계 AI 방식)
 1단계: 문제에서 어떤 도형을 그릴지 분석
 2단계: 분석 결과를 바탕으로 JSXGraph 파라미터 생성
+figure_description 기반 도형은 1단계와 무관하므로 1→2단계와 동시에 실행 (공통 마감 시간)
 """
 
 import os
 import json
 import re
 import time
+import hashlib
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 import google.generativeai as genai
 from dotenv import load_dotenv
+from utils.model_router import get_model
+from utils.tracing import span
+from utils.figure_ir import figure_from_elements
 
 load_dotenv()
 
@@ -19,6 +27,16 @@ GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
 if GEMINI_API_KEY:
     genai.configure(api_key=GEMINI_API_KEY)
 
+# 시각화 전체 마감 시간 (초). 넘기면 끝난 갈래의 결과만 반환
+ANALYZE_DEADLINE = float(os.environ.get('ANALYZE_QUESTION_DEADLINE', 90))
+# Gemini 호출 하나의 최소 시간 제한 (초). 마감까지 남은 시간이 이보다 짧으면 호출하지 않음
+MIN_CALL_TIMEOUT = 1.0
+# question_text / figure_description 두 갈래를 동시에 실행하는 스레드 풀 (요청 간 공유)
+_branch_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('ANALYZE_QUESTION_WORKERS', 8)),
+    thread_name_prefix='analyze-question',
+)
+
 
 # 1단계: 문제 분석 프롬프트 - 어떤 도형을 그릴지 결정
 STEP1_ANALYZE_PROMPT = '''다음 수학 문제를 읽고, 시각화가 필요한지 판단하고 어떤 도형을 그려야 하는지 설명해주세요.
@@ -137,6 +155,25 @@ FIGURE_DESC_PROMPT = '''다음 도형 설명을 바탕으로 시각화해주세
 '''
 
 
+def analysis_cache_key(question_data: dict) -> str:
+    """시각화 결과 캐시 키: 입력(question_number, question_text, figure_description) + 프롬프트 + 모델의 해시.
+    프롬프트나 모델 라우팅이 바뀌면 키가 달라져서 예전 결과를 쓰지 않음.
+    캐시된 HTML에 문항 번호가 들어가므로 번호가 다르면 다른 키
+    """
+    payload = json.dumps({
+        'question_number': str(question_data.get('question_number', '') or ''),
+        'question_text': question_data.get('question_text', '') or '',
+        'figure_description': question_data.get('figure_description', '') or '',
+        'prompts': [STEP1_ANALYZE_PROMPT, STEP2_GENERATE_PROMPT, FIGURE_DESC_PROMPT],
+        'models': [
+            get_model('analyze_figure_needs', 'gemini-2.5-flash'),
+            get_model('generate_figure_params', 'gemini-2.5-flash'),
+            get_model('generate_figure_from_description', 'gemini-2.5-flash'),
+        ],
+    }, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
 def analyze_question(question_data: dict, progress_callback=None) -> dict:
     """문항을 시각화합니다 (2단계 AI 방식).
 
@@ -147,10 +184,21 @@ def analyze_question(question_data: dict, progress_callback=None) -> dict:
     Returns:
         시각화 결과 딕셔너리
     """
+    # 두 갈래가 동시에 진행되므로 진행률은 줄어들지 않게 최댓값으로만 보고
+    progress_lock = threading.Lock()
+    last_progress = [0]
+    finished = [False]
+
     def report_progress(step, progress, message, details=None):
-        print(f"[{step}] {message}")
-        if progress_callback:
-            progress_callback(step, progress, message, details or {})
+        with progress_lock:
+            if finished[0]:
+                return  # 마감 후에 끝난 갈래의 보고는 버림
+            finished[0] = step in ('complete', 'error')
+            if step != 'error':
+                progress = last_progress[0] = max(last_progress[0], progress)
+            print(f"[{step}] {message}")
+            if progress_callback:
+                progress_callback(step, progress, message, details or {})
 
     report_progress('start', 0, '시각화 시작...', {})
 
@@ -158,28 +206,82 @@ def analyze_question(question_data: dict, progress_callback=None) -> dict:
     figure_description = question_data.get('figure_description', '')
 
     start_time = time.time()
+    deadline = time.monotonic() + ANALYZE_DEADLINE
     analysis_result = {}
 
-    try:
-        # 1. question_text 기반 2단계 도형 생성
+    def remaining():
+        """마감까지 남은 시간. 모자라면 None (호출을 시작하지 않음)
+        Gemini 호출에 이 값을 시간 제한으로 넘겨 마감 후에 풀 스레드를 붙잡지 않게 함
+        """
+        left = deadline - time.monotonic()
+        return left if left >= MIN_CALL_TIMEOUT else None
+
+    def question_branch():
+        """1단계 → 2단계 (question_text 기반)"""
+        timeout = remaining()
+        if timeout is None:
+            return {}  # 대기열에서 마감을 넘김
         report_progress('step1', 20, '[1단계] 도형 분석 중...', {})
-        step1_result = analyze_figure_needs(question_text)
-
-        if step1_result and step1_result.get('needs_visualization'):
-            report_progress('step2', 50, '[2단계] 도형 파라미터 생성 중...', {})
-            figure_data = generate_figure_params(step1_result)
+        with span('analyze.figure_needs'):
+            step1_result = analyze_figure_needs(question_text, timeout=timeout)
+        if step1_result.get('error'):
+            return {'errors': {'figure_needs': step1_result['error']}}
+        if not (step1_result and step1_result.get('needs_visualization')):
+            return {}
+        timeout = remaining()
+        if timeout is None:
+            # 마감 시각이 지났으면 2단계 호출을 시작하지 않음
+            return {}
+        report_progress('step2', 50, '[2단계] 도형 파라미터 생성 중...', {})
+        with span('analyze.figure_params'):
+            figure_data = generate_figure_params(step1_result, timeout=timeout)
+        if figure_data and figure_data.get('elements'):
+            # 분석 과정도 함께 저장
+            return {'step1_analysis': step1_result, 'step0_figure': figure_data}
+        if figure_data.get('error'):
+            return {'errors': {'figure_params': figure_data['error']}}
+        return {}
 
-            if figure_data and figure_data.get('elements'):
-                # 분석 과정도 함께 저장
-                analysis_result['step1_analysis'] = step1_result
-                analysis_result['step0_figure'] = figure_data
+    def description_branch():
+        """figure_description 기반 도형 생성 (1단계와 무관하므로 동시에 실행)"""
+        timeout = remaining()
+        if timeout is None:
+            return {}  # 대기열에서 마감을 넘김
+        report_progress('figure_desc', 40, '도형 생성 중 (figure_description)...', {})
+        with span('analyze.figure_from_description'):
+            figure_desc_data = generate_figure_from_description(figure_description, timeout=timeout)
+        if figure_desc_data and figure_desc_data.get('elements'):
+            report_progress('figure_desc', 75, '도형 생성 완료 (figure_description)', {})
+            return {'step0_figure_desc': figure_desc_data}
+        if figure_desc_data.get('error'):
+            return {'errors': {'figure_from_description': figure_desc_data['error']}}
+        return {}
 
-        # 2. figure_description 기반 도형 생성 (기존 방식)
+    try:
+        branches = {'question_text': question_branch}
         if figure_description:
-            report_progress('figure_desc', 75, '도형 생성 중 (figure_description)...', {})
-            figure_desc_data = generate_figure_from_description(figure_description)
-            if figure_desc_data and figure_desc_data.get('elements'):
-                analysis_result['step0_figure_desc'] = figure_desc_data
+            branches['figure_description'] = description_branch
+
+        # 각 갈래는 현재 컨텍스트(트레이스)를 복사해서 실행
+        futures = {
+            _branch_executor.submit(contextvars.copy_context().run, fn): name
+            for name, fn in branches.items()
+        }
+        done, pending = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+
+        # 결과는 갈래 순서대로 합침 (question_text → figure_description)
+        for future in sorted(done, key=lambda f: list(branches).index(futures[f])):
+            branch_result = future.result()
+            errors = branch_result.pop('errors', None)
+            if errors:
+                analysis_result.setdefault('errors', {}).update(errors)
+            analysis_result.update(branch_result)
+        if pending:
+            timed_out = sorted(futures[f] for f in pending)
+            for future in pending:
+                future.cancel()
+            print(f"⏱️ 시각화 마감 시간 초과 ({ANALYZE_DEADLINE:g}초): {', '.join(timed_out)}")
+            analysis_result['timed_out'] = timed_out
 
         latency_ms = (time.time() - start_time) * 1000
         report_progress('complete', 100, '시각화 완료!', {})
@@ -201,15 +303,20 @@ def analyze_question(question_data: dict, progress_callback=None) -> dict:
         }
 
 
-def analyze_figure_needs(question_text: str) -> dict:
-    """1단계: 문제에서 어떤 도형을 그릴지 분석합니다."""
+def _request_options(timeout: float = None) -> dict:
+    """generate_content의 request_options (시간 제한이 없으면 빈 값)"""
+    return {'timeout': timeout} if timeout else {}
+
+
+def analyze_figure_needs(question_text: str, timeout: float = None) -> dict:
+    """1단계: 문제에서 어떤 도형을 그릴지 분석합니다. (timeout: Gemini 호출 시간 제한, 초)"""
     if not question_text:
         return {}
 
     try:
         prompt = STEP1_ANALYZE_PROMPT.format(question_text=question_text)
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(prompt)
+        model = genai.GenerativeModel(get_model('analyze_figure_needs', 'gemini-2.5-flash'))
+        response = model.generate_content(prompt, request_options=_request_options(timeout))
 
         text = response.text.strip()
 
@@ -230,11 +337,12 @@ def analyze_figure_needs(question_text: str) -> dict:
         return result
 
     except Exception as e:
-        return {}
+        # 호출/파싱 실패는 '도형 없음'과 구분되도록 error로 반환 (실패 결과는 캐시하지 않음)
+        return {'error': f'{type(e).__name__}: {e}'}
 
 
-def generate_figure_params(step1_result: dict) -> dict:
-    """2단계: 분석 결과를 바탕으로 JSXGraph 파라미터를 생성합니다."""
+def generate_figure_params(step1_result: dict, timeout: float = None) -> dict:
+    """2단계: 분석 결과를 바탕으로 JSXGraph 파라미터를 생성합니다. (timeout: Gemini 호출 시간 제한, 초)"""
     if not step1_result:
         return {}
 
@@ -255,8 +363,8 @@ def generate_figure_params(step1_result: dict) -> dict:
             elements_description=elements_str
         )
 
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(prompt)
+        model = genai.GenerativeModel(get_model('generate_figure_params', 'gemini-2.5-flash'))
+        response = model.generate_content(prompt, request_options=_request_options(timeout))
 
         text = response.text.strip()
 
@@ -280,18 +388,19 @@ def generate_figure_params(step1_result: dict) -> dict:
         return result
 
     except Exception as e:
-        return {}
+        # 호출/파싱 실패는 '도형 없음'과 구분되도록 error로 반환 (실패 결과는 캐시하지 않음)
+        return {'error': f'{type(e).__name__}: {e}'}
 
 
-def generate_figure_from_description(figure_description: str) -> dict:
-    """원본 figure_description에서 도형을 생성합니다."""
+def generate_figure_from_description(figure_description: str, timeout: float = None) -> dict:
+    """원본 figure_description에서 도형을 생성합니다. (timeout: Gemini 호출 시간 제한, 초)"""
     if not figure_description:
         return {}
 
     try:
         prompt = FIGURE_DESC_PROMPT.format(figure_description=figure_description)
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(prompt)
+        model = genai.GenerativeModel(get_model('generate_figure_from_description', 'gemini-2.5-flash'))
+        response = model.generate_content(prompt, request_options=_request_options(timeout))
 
         text = response.text.strip()
 
@@ -318,7 +427,8 @@ def generate_figure_from_description(figure_description: str) -> dict:
         return result
 
     except Exception as e:
-        return {}
+        # 호출/파싱 실패는 '도형 없음'과 구분되도록 error로 반환 (실패 결과는 캐시하지 않음)
+        return {'error': f'{type(e).__name__}: {e}'}
 
 
 def generate_jsxgraph_code(elements: list, board_id: str, show_axis: bool = False) -> str:
@@ -326,21 +436,6 @@ def generate_jsxgraph_code(elements: list, board_id: str, show_axis: bool = Fals
     if not elements:
         return ""
 
-    def expr_to_js(expr: str) -> str:
-        """수학 수식을 JavaScript 표현식으로 변환"""
-        expr = str(expr)
-        expr = expr.replace('^', '**')
-        expr = expr.replace('sin', 'Math.sin')
-        expr = expr.replace('cos', 'Math.cos')
-        expr = expr.replace('tan', 'Math.tan')
-        expr = expr.replace('sqrt', 'Math.sqrt')
-        expr = expr.replace('abs', 'Math.abs')
-        expr = expr.replace('log', 'Math.log')
-        expr = expr.replace('exp', 'Math.exp')
-        expr = expr.replace('pi', 'Math.PI')
-        expr = expr.replace('PI', 'Math.PI')
-        return expr
-
     # 좌표축, 그리드, 레이블 모두 제거
     lines = []
     lines.append(f"var board = JXG.JSXGraph.initBoard('{board_id}', {{")
@@ -352,41 +447,28 @@ def generate_jsxgraph_code(elements: list, board_id: str, show_axis: bool = Fals
     lines.append("});")
     lines.append("")
 
+    # 함수/구간별 함수는 Figure IR에서 검증·변환된 수식 사용 (matplotlib 렌더와 같은 파서)
+    figure = figure_from_elements(elements)
+    for curve in figure.curves:
+        if curve.js is None:
+            lines.append(f"console.warn({json.dumps(f'수식 오류 ({curve.source}): {curve.error}', ensure_ascii=False)});")
+            continue
+        fn = f"function(x) {{ return {curve.js}; }}"
+        if curve.domain:
+            lines.append(f"board.create('functiongraph', [{fn}, {curve.domain[0]}, {curve.domain[1]}], {{strokeColor: '{curve.color}', strokeWidth: 1}});")
+            label_x = (curve.domain[0] + curve.domain[1]) / 2
+        else:
+            lines.append(f"board.create('functiongraph', [{fn}], {{strokeColor: '{curve.color}', strokeWidth: 1}});")
+            label_x = 2
+        lines.append(f"board.create('text', [{label_x}, ({fn})({label_x}) + 0.5, '{curve.label}'], {{fontSize: 12, color: '{curve.color}', useMathJax: true}});")
+
     named_points = {}
     point_counter = 0
 
-    for elem in elements:
+    for elem in figure.elements:
         elem_type = elem.get('type', '')
 
-        if elem_type == 'function':
-            expr = elem.get('expr', 'x')
-            color = elem.get('color', '#1a1a1a')
-            domain = elem.get('domain')  # [min, max] 형식
-            label = elem.get('label', f'y = {expr}')
-            js_expr = expr_to_js(expr)
-            if domain and len(domain) == 2:
-                lines.append(f"board.create('functiongraph', [function(x) {{ return {js_expr}; }}, {domain[0]}, {domain[1]}], {{strokeColor: '{color}', strokeWidth: 1}});")
-                label_x = (domain[0] + domain[1]) / 2
-                lines.append(f"board.create('text', [{label_x}, (function(x) {{ return {js_expr}; }})({label_x}) + 0.5, '{label}'], {{fontSize: 12, color: '{color}', useMathJax: true}});")
-            else:
-                lines.append(f"board.create('functiongraph', [function(x) {{ return {js_expr}; }}], {{strokeColor: '{color}', strokeWidth: 1}});")
-                lines.append(f"board.create('text', [2, (function(x) {{ return {js_expr}; }})(2) + 0.5, '{label}'], {{fontSize: 12, color: '{color}', useMathJax: true}});")
-
-        elif elem_type == 'piecewise':
-            pieces = elem.get('pieces', [])
-            colors = ['#1a1a1a', '#cc0000', '#006600', '#660099', '#cc6600']
-            for i, piece in enumerate(pieces):
-                piece_expr = piece.get('expr', 'x')
-                piece_domain = piece.get('domain', [-6, 6])
-                piece_color = piece.get('color', colors[i % len(colors)])
-                piece_label = piece.get('label', f'y = {piece_expr}')
-                js_piece_expr = expr_to_js(piece_expr)
-                if len(piece_domain) == 2:
-                    lines.append(f"board.create('functiongraph', [function(x) {{ return {js_piece_expr}; }}, {piece_domain[0]}, {piece_domain[1]}], {{strokeColor: '{piece_color}', strokeWidth: 1}});")
-                    label_x = (piece_domain[0] + piece_domain[1]) / 2
-                    lines.append(f"board.create('text', [{label_x}, (function(x) {{ return {js_piece_expr}; }})({label_x}) + 0.5, '{piece_label}'], {{fontSize: 12, color: '{piece_color}', useMathJax: true}});")
-
-        elif elem_type == 'point':
+        if elem_type == 'point':
             coords = elem.get('coords', [0, 0])
             name = elem.get('name', '')
             color = elem.get('color', 'black')
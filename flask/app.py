@@ -4,7 +4,7 @@ import os
 import json
 import re
 import shutil
-from flask import Flask, request, jsonify, send_from_directory, Response, send_file
+from flask import Flask, request, jsonify, Response, send_file, g
 from flask_cors import CORS
 import time
 import uuid
@@ -14,12 +14,26 @@ from PIL import Image
 import google.generativeai as genai
 from dotenv import load_dotenv
 from llm_tracker import tracker
-from generate_variants import generate_graph
+from generate_variants import render_graphs
 
 # 유틸리티 모듈 import
 from utils.json_parser import parse_gemini_json
-from utils.image import crop_image_by_bbox
+from utils.image import crop_image_by_bbox, generate_thumbnails, get_thumbnail, thumbnail_version, THUMBS_DIRNAME
 from utils.llm import ask_llm_to_fix_error, ask_llm_to_fix_json_error
+from utils import tracing
+from utils import model_router
+from utils.model_router import get_model
+from utils.session_catalog import SessionCatalog
+from utils import http_cache
+from utils.storage import atomic_write_json, read_json, session_lock, write_versioned_json, VersionConflict, SessionNotFound
+from utils.blob_store import BlobStore
+from utils import variant_store
+from utils import variant_manifest
+from utils import variant_pool
+from utils import render_cache
+from utils import jobs
+from utils.artifacts import send_artifact, record_artifact, record_artifacts, get_artifact_entry, IMMUTABLE_NAME_RE, IMMUTABLE_MAX_AGE
+from werkzeug.security import safe_join
 
 # 라우트 모듈에서 프롬프트 함수 import
 from routes.prompts import get_system_prompt, get_user_prompt, DEFAULT_SYSTEM_PROMPT, DEFAULT_USER_PROMPT
@@ -67,6 +81,7 @@ IMAGES_FOLDER = os.path.join(UPLOAD_FOLDER, 'images')
 CONFIG_FOLDER = 'config'  # config는 프로젝트 내부에 유지
 SESSIONS_FOLDER = os.path.join(GEN_DATA_PATH, 'data', 'sessions')
 VARIANTS_FOLDER = os.path.join(GEN_DATA_PATH, 'variants_output')
+EXAMS_FOLDER = os.path.join(GEN_DATA_PATH, 'data', 'exams')  # 여러 세션에서 조립한 문제지
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['IMAGES_FOLDER'] = IMAGES_FOLDER
@@ -83,8 +98,47 @@ os.makedirs(CONFIG_FOLDER, exist_ok=True) if not IS_VERCEL else None
 os.makedirs(SESSIONS_FOLDER, exist_ok=True)
 os.makedirs(VARIANTS_FOLDER, exist_ok=True)
 
+# 콘텐츠 주소 blob 저장소 (업로드/크롭 이미지, 그래프)
+BLOBS_FOLDER = os.path.join(GEN_DATA_PATH, 'blobs')
+blob_store = BlobStore(BLOBS_FOLDER)
+
+# 그래프 렌더 캐시 (graph_info 해시 → PNG, 메모리 + 디스크 LRU)
+render_cache.configure(os.path.join(GEN_DATA_PATH, 'cache', 'graphs'))
+
+# 세션 카탈로그 (목록 조회용 SQLite 인덱스)
+SESSION_CATALOG_DB = os.path.join(GEN_DATA_PATH, 'data', 'sessions_catalog.db')
+session_catalog = SessionCatalog(SESSION_CATALOG_DB, SESSIONS_FOLDER)
+
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 
+# 썸네일 캐시 유지 시간 (1년)
+THUMBNAIL_MAX_AGE = 365 * 24 * 3600
+
+
+# ==================== 요청 트레이싱 ====================
+
+@app.before_request
+def start_request_trace():
+    """요청마다 트레이스를 시작합니다."""
+    g.trace = tracing.Trace(f"{request.method} {request.path}")
+    g.trace_token = tracing.set_current(g.trace)
+
+
+@app.after_request
+def add_server_timing(response):
+    """동기 응답에 Server-Timing 헤더를 추가합니다 (SSE 스트림 제외)."""
+    trace = g.get('trace')
+    if trace is not None and response.mimetype != 'text/event-stream':
+        response.headers['Server-Timing'] = trace.server_timing()
+    return response
+
+
+@app.teardown_request
+def end_request_trace(exc):
+    token = g.pop('trace_token', None)
+    if token is not None:
+        tracing.reset_current(token)
+
 
 @app.route('/')
 def index():
@@ -100,41 +154,34 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
-def analyze_exam_image(img, system_prompt=None, user_prompt=None, api_key=None):
-    """Gemini Vision으로 시험 문항 이미지를 분석합니다."""
-    # API 키 설정
-    if api_key:
-        configure_genai(api_key)
+def store_blob(write_fn, ext):
+    """write_fn(path)으로 임시 파일을 만든 뒤 blob 저장소에 넣고 blob id를 반환합니다."""
+    temp_path = os.path.join(UPLOAD_FOLDER, f"temp_{uuid.uuid4().hex}.{ext}")
+    try:
+        write_fn(temp_path)
+        return blob_store.put_file(temp_path, ext, move=True)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
 
-    # gemini-2.5-pro 사용 (이미지 분석에 가장 정확함)
-    model_name = 'gemini-2.5-pro'
-    model = genai.GenerativeModel(model_name)
 
-    # 시스템 프롬프트와 사용자 프롬프트 결합
-    sys_prompt = system_prompt if system_prompt else get_system_prompt()
-    usr_prompt = user_prompt if user_prompt else get_user_prompt()
+def store_bytes_blob(data: bytes, ext):
+    """bytes를 blob 저장소에 넣고 blob id를 반환합니다."""
+    def write(path):
+        with open(path, 'wb') as f:
+            f.write(data)
+    return store_blob(write, ext)
 
-    # 프롬프트 결합: 시스템 프롬프트 + 사용자 프롬프트
-    combined_prompt = sys_prompt
-    if usr_prompt and usr_prompt.strip():
-        combined_prompt += "\n\n--- 추가 지시사항 ---\n" + usr_prompt
+
+def _analyze_image_with_model(model_name, combined_prompt, img):
+    """단일 모델로 이미지를 분석합니다. (응답 텍스트, APICall) 반환"""
+    model = genai.GenerativeModel(model_name)
 
     start_time = time.time()
     try:
-        response = model.generate_content([combined_prompt, img])
+        with tracing.span('gemini.analyze_image', model=model_name):
+            response = model.generate_content([combined_prompt, img])
         latency_ms = (time.time() - start_time) * 1000
-
-        # 사용량 추적
-        tracker.track_call(
-            model=model_name,
-            operation="analyze_image",
-            prompt=combined_prompt,
-            response_text=response.text,
-            latency_ms=latency_ms,
-            success=True
-        )
-
-        return parse_gemini_json(response.text)
     except Exception as e:
         latency_ms = (time.time() - start_time) * 1000
         tracker.track_call(
@@ -148,6 +195,78 @@ def analyze_exam_image(img, system_prompt=None, user_prompt=None, api_key=None):
         )
         raise
 
+    # 사용량 추적
+    call = tracker.track_call(
+        model=model_name,
+        operation="analyze_image",
+        prompt=combined_prompt,
+        response_text=response.text,
+        latency_ms=latency_ms,
+        success=True
+    )
+
+    return response.text, call
+
+
+def analyze_exam_image(img, system_prompt=None, user_prompt=None, api_key=None):
+    """Gemini Vision으로 시험 문항 이미지를 분석합니다.
+
+    빠른 모델부터 시도하고, 로컬 휴리스틱 검사에 실패하면 다음 모델(기본: gemini-2.5-pro)로
+    에스컬레이션합니다. 모델 체인은 model_router 설정의 'analyze_image' 항목을 따릅니다.
+    """
+    # API 키 설정
+    if api_key:
+        configure_genai(api_key)
+
+    chain = model_router.get_model_chain('analyze_image', 'gemini-2.5-pro')
+
+    # 시스템 프롬프트와 사용자 프롬프트 결합
+    sys_prompt = system_prompt if system_prompt else get_system_prompt()
+    usr_prompt = user_prompt if user_prompt else get_user_prompt()
+
+    # 프롬프트 결합: 시스템 프롬프트 + 사용자 프롬프트
+    combined_prompt = sys_prompt
+    if usr_prompt and usr_prompt.strip():
+        combined_prompt += "\n\n--- 추가 지시사항 ---\n" + usr_prompt
+
+    attempts = []
+    reasons = []
+    for idx, model_name in enumerate(chain):
+        is_last = idx == len(chain) - 1
+        next_model = None if is_last else chain[idx + 1]
+        try:
+            response_text, call = _analyze_image_with_model(model_name, combined_prompt, img)
+        except Exception as e:
+            if is_last:
+                tracker.track_routing('analyze_image', chain, model_name, attempts, reasons + ['call_failed'])
+                raise
+            reasons.append('call_failed')
+            print(f"🔀 {model_name} 호출 실패 ({e}) → {next_model}로 에스컬레이션")
+            continue
+        attempts.append(call)
+
+        try:
+            with tracing.span('parse.json'):
+                result = parse_gemini_json(response_text)
+        except json.JSONDecodeError:
+            if is_last:
+                tracker.track_routing('analyze_image', chain, model_name, attempts, reasons + ['json_parse_error'])
+                raise
+            reasons.append('json_parse_error')
+            print(f"🔀 {model_name} 응답 파싱 실패 → {next_model}로 에스컬레이션")
+            continue
+
+        failed = model_router.check_analysis_result(result)
+        if failed and not is_last:
+            reasons.extend(failed)
+            print(f"🔀 {model_name} 결과 검사 실패 ({', '.join(failed)}) → {next_model}로 에스컬레이션")
+            continue
+
+        tracker.track_routing('analyze_image', chain, model_name, attempts, reasons)
+        return result
+
+    raise RuntimeError("analyze_image 모델 체인이 비어 있습니다.")
+
 
 @app.route('/prompts', methods=['GET'])
 def get_prompts():
@@ -224,34 +343,36 @@ def analyze_file():
     system_prompt = request.form.get('system_prompt', None)
     user_prompt = request.form.get('user_prompt', None)
 
-    filename = secure_filename(file.filename)
-    filepath = os.path.join(app.config['IMAGES_FOLDER'], filename)
-    file.save(filepath)
+    ext = file.filename.rsplit('.', 1)[1].lower()
+    # /analyze는 세션을 만들지 않으므로 업로드 이미지와 그래프 blob은 참조 1로 계속 보관됨
+    # (응답의 image_url/graph_url이 이후에도 유효해야 함, 같은 내용은 한 번만 저장)
+    image_blob_id = store_blob(file.save, ext)
 
     try:
-        img = Image.open(filepath)
-        image_url = f"{SERVER_URL}/images/{filename}"
+        img = Image.open(blob_store.path(image_blob_id))
+        image_url = f"{SERVER_URL}/blobs/{image_blob_id}"
 
         # Gemini Vision으로 바로 분석
         try:
             result = analyze_exam_image(img, system_prompt, user_prompt, api_key)
             print(f"Analyzed {len(result.get('questions', []))} questions")
 
-            # 각 문항의 graph_info가 있으면 그래프 생성
-            for question in result.get('questions', []):
-                graph_info = question.get('graph_info')
-                if graph_info and graph_info.get('type') and graph_info.get('plot_data'):
+            # 각 문항의 graph_info가 있으면 그래프 생성 (프로세스 풀에서 한꺼번에 렌더링)
+            questions = result.get('questions', [])
+            graphs = render_graphs([q.get('graph_info') for q in questions], 'png')
+            for question, graph in zip(questions, graphs):
+                if graph:
                     try:
                         q_num = question.get('question_number', 'unknown')
-                        graph_filename = f"graph_q{q_num}_{uuid.uuid4().hex[:8]}.png"
-                        graph_path = os.path.join(app.config['IMAGES_FOLDER'], graph_filename)
+                        if not graph['ok']:
+                            raise RuntimeError(graph['error'])
 
-                        # 그래프 생성
-                        generate_graph(graph_info, graph_path)
+                        # 그래프 저장
+                        graph_blob_id = store_bytes_blob(graph['data'], 'png')
 
                         # graph_url 추가
-                        question['graph_url'] = f"{SERVER_URL}/images/{graph_filename}"
-                        print(f"Generated graph for question {q_num}: {graph_filename}")
+                        question['graph_url'] = f"{SERVER_URL}/blobs/{graph_blob_id}"
+                        print(f"Generated graph for question {q_num}: {graph_blob_id[:12]}")
                     except Exception as graph_error:
                         print(f"Graph generation error for question {q_num}: {graph_error}")
                         question['graph_error'] = str(graph_error)
@@ -264,7 +385,8 @@ def analyze_file():
 
         return jsonify({
             "success": True,
-            "filename": filename,
+            "filename": file.filename,
+            "image_id": image_blob_id,
             "image_url": image_url,
             "message": "분석 완료",
             "data": result
@@ -287,7 +409,7 @@ MAX_AUTO_RETRY = 2
 
 def ask_llm_to_fix_error(error_message: str, error_context: str, original_data: dict) -> dict:
     """LLM에게 오류 수정을 요청합니다."""
-    model_name = 'gemini-2.0-flash'
+    model_name = get_model('fix_error', 'gemini-2.0-flash')
     model = genai.GenerativeModel(model_name)
 
     fix_prompt = f"""다음 오류가 발생했습니다. 문제 데이터를 수정하여 오류를 해결해주세요.
@@ -364,7 +486,7 @@ def ask_llm_to_fix_error(error_message: str, error_context: str, original_data:
 
 def ask_llm_to_fix_json_error(error_message: str, raw_response: str) -> dict:
     """LLM에게 JSON 파싱 오류 수정을 요청합니다."""
-    model_name = 'gemini-2.0-flash'
+    model_name = get_model('fix_json', 'gemini-2.0-flash')
     model = genai.GenerativeModel(model_name)
 
     fix_prompt = f"""다음 JSON 파싱 오류를 수정해주세요.
@@ -434,7 +556,7 @@ def generate_variants():
     if not api_key:
         return jsonify({"success": False, "message": "Gemini API 키가 필요합니다. 설정에서 API 키를 입력해주세요."}), 401
 
-    from generate_variants import generate_variants_via_code, generate_html_report
+    from generate_variants import generate_variants_via_code, generate_html_report, report_graph_files, REPORT_GRAPH_MODE
     from datetime import datetime
 
     data = request.get_json()
@@ -575,7 +697,7 @@ def generate_variants():
             html_path = os.path.join(VARIANTS_FOLDER, html_filename)
 
             try:
-                generate_html_report(question_data, variants_data, html_path)
+                generate_html_report(question_data, variants_data, html_path, graph_mode=REPORT_GRAPH_MODE)
             except Exception as e:
                 error_msg = f"HTML 리포트 생성 실패: {str(e)}"
                 yield f"data: {json.dumps({'step': 'error', 'progress': 0, 'message': error_msg, 'error_type': 'report'})}\n\n"
@@ -583,9 +705,8 @@ def generate_variants():
 
             # JSON 결과 저장
             json_filename = f'variants_q{question_num}_{timestamp}.json'
-            json_path = os.path.join(VARIANTS_FOLDER, json_filename)
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(variants_data, f, ensure_ascii=False, indent=2)
+            json_path = variant_store.write_variant_set(os.path.join(VARIANTS_FOLDER, json_filename), variants_data)
+            record_artifacts(html_path, json_path, *report_graph_files(html_path))
 
             yield f"data: {json.dumps({'step': 'save', 'progress': 95, 'message': '파일 저장 완료'})}\n\n"
 
@@ -613,15 +734,54 @@ def generate_variants():
     })
 
 
+def send_variant_file(folder, filename):
+    """변형 문제 파일 전송. .json 요청인데 .qvs로 저장되어 있으면 JSON으로 변환해서 응답합니다.
+
+    HTML 리포트에 ?embed=1을 붙이면 그래프 파일을 base64로 넣은 단일 파일로 내려받습니다.
+    """
+    path = safe_join(folder, filename)
+    if path and filename.endswith('.html') and request.args.get('embed') in ('1', 'true') and os.path.isfile(path):
+        from generate_variants import embed_report_graphs
+        with open(path, 'r', encoding='utf-8') as f:
+            html = embed_report_graphs(f.read(), folder)
+        return Response(html, mimetype='text/html', headers={
+            'Content-Disposition': f'attachment; filename="{filename}"'
+        })
+    if path and filename.endswith('.json') and not os.path.exists(path):
+        stored_path = variant_store.resolve_path(path)
+        if stored_path:
+            entry = get_artifact_entry(folder, os.path.basename(stored_path))
+            body = json.dumps(variant_store.read_variant_set(stored_path), ensure_ascii=False, indent=2)
+            response = Response(body, mimetype='application/json')
+            response.set_etag(entry['sha256'])
+            if IMMUTABLE_NAME_RE.search(filename):
+                response.cache_control.public = True
+                response.cache_control.max_age = IMMUTABLE_MAX_AGE
+                response.cache_control.immutable = True
+            else:
+                response.headers['Cache-Control'] = 'no-cache'
+            return response.make_conditional(request)
+    return send_artifact(folder, filename)
+
+
 @app.route('/variants/<filename>')
 def serve_variant(filename):
     """변형 문제 HTML/JSON 파일을 제공합니다."""
-    return send_from_directory(VARIANTS_FOLDER, filename)
+    return send_variant_file(VARIANTS_FOLDER, filename)
 
 
 @app.route('/variants', methods=['GET'])
 def list_variants():
-    """생성된 변형 문제 목록을 반환합니다."""
+    """생성된 변형 문제 목록을 반환합니다. (limit/cursor 페이지네이션, ETag 지원)"""
+    validator = http_cache.directory_validator(VARIANTS_FOLDER)
+    cached = http_cache.not_modified(validator)
+    if cached:
+        return cached
+    try:
+        limit, after = http_cache.get_page_args()
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
     files = []
     if os.path.exists(VARIANTS_FOLDER):
         for f in os.listdir(VARIANTS_FOLDER):
@@ -631,13 +791,18 @@ def list_variants():
                     "url": f"{SERVER_URL}/variants/{f}",
                     "created": os.path.getmtime(os.path.join(VARIANTS_FOLDER, f))
                 })
-    files.sort(key=lambda x: x['created'], reverse=True)
-    return jsonify({"success": True, "files": files})
+    try:
+        files, next_cursor = http_cache.paginate(files, lambda x: (-x['created'], x['filename']), limit, after)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    return http_cache.with_validator(
+        jsonify({"success": True, "files": files, "next_cursor": next_cursor}), validator
+    )
 
 
 @app.route('/images/<filename>')
 def serve_image(filename):
-    return send_from_directory(app.config['IMAGES_FOLDER'], filename)
+    return send_artifact(app.config['IMAGES_FOLDER'], filename)
 
 
 # LLM 사용량 통계 API
@@ -688,50 +853,144 @@ def get_session_path(session_id):
     return os.path.join(app.config['SESSIONS_FOLDER'], session_id)
 
 
+def resolve_session_file(session_id, filename, metadata=None):
+    """세션 파일의 실제 경로 (blob 매핑 우선, 없으면 세션 폴더의 기존 파일)"""
+    if metadata is None:
+        metadata = load_session_metadata(session_id) or {}
+    blob_id = (metadata.get('blobs') or {}).get(filename)
+    if blob_id and blob_store.exists(blob_id):
+        return blob_store.path(blob_id)
+    return os.path.join(get_session_path(session_id), filename)
+
+
+def send_session_file(session_id, filename, metadata=None):
+    """세션 파일 전송 (blob이면 blob id를 ETag로 바로 send_file)"""
+    if metadata is None:
+        metadata = load_session_metadata(session_id) or {}
+    blob_id = (metadata.get('blobs') or {}).get(filename)
+    if blob_id and blob_store.exists(blob_id):
+        # 같은 파일명이 재분석으로 다른 blob을 가리킬 수 있으므로 immutable 아님
+        return blob_store.send(blob_id, immutable=False, download_name=filename)
+    return send_artifact(get_session_path(session_id), filename)
+
+
+def parse_version(value):
+    """요청의 version 값 (없으면 None). 정수가 아니면 ValueError."""
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, str)) or not str(value).strip().isdigit():
+        raise ValueError(f"version은 0 이상의 정수여야 합니다: {value!r}")
+    return int(value)
+
+
 def load_session_metadata(session_id):
-    """세션 메타데이터 로드"""
+    """세션 메타데이터 로드 (잠금 없음, 원자적 교체로 항상 완전한 파일을 읽음)"""
+    session_path = get_session_path(session_id)
+    return read_json(os.path.join(session_path, 'metadata.json'))
+
+
+def save_session_metadata(session_id, metadata, expected_version=None):
+    """세션 메타데이터 저장 (version 증가, expected_version 지정 시 compare-and-swap)
+
+    Returns:
+        저장된 새 version
+    """
     session_path = get_session_path(session_id)
     metadata_file = os.path.join(session_path, 'metadata.json')
-    if os.path.exists(metadata_file):
-        with open(metadata_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return None
+    with tracing.span('write.metadata'), session_lock(session_path):
+        version = write_versioned_json(metadata_file, metadata, expected_version)
+        session_catalog.upsert(session_id, metadata)
+    return version
+
+
+def update_session_metadata(session_id, updates, expected_version=None):
+    """잠금 안에서 최신 메타데이터를 다시 읽고 updates를 적용해서 저장합니다.
+
+    동시에 들어온 다른 수정(이름 변경, 재분석 등)을 덮어쓰지 않습니다.
+    이미 session_lock을 잡고 있다면 _update_session_metadata_locked를 사용합니다. (잠금은 재진입 불가)
+    """
+    session_path = get_session_path(session_id)
+    with session_lock(session_path):
+        return _update_session_metadata_locked(session_id, updates, expected_version)
 
 
-def save_session_metadata(session_id, metadata):
-    """세션 메타데이터 저장"""
+def _update_session_metadata_locked(session_id, updates, expected_version=None):
     session_path = get_session_path(session_id)
-    os.makedirs(session_path, exist_ok=True)
     metadata_file = os.path.join(session_path, 'metadata.json')
-    with open(metadata_file, 'w', encoding='utf-8') as f:
-        json.dump(metadata, f, ensure_ascii=False, indent=2)
+    metadata = read_json(metadata_file)
+    if metadata is None:
+        return None
+    metadata.update(updates)
+    with tracing.span('write.metadata'):
+        write_versioned_json(metadata_file, metadata, expected_version)
+        session_catalog.upsert(session_id, metadata)
+    return metadata
+
+
+@app.cli.command('rebuild-catalog')
+def rebuild_catalog_command():
+    """세션 폴더를 스캔해서 세션 카탈로그를 다시 만듭니다. (flask --app app rebuild-catalog)"""
+    count = session_catalog.rebuild()
+    print(f"📇 세션 카탈로그 재구축 완료: {count}개 세션")
 
 
 @app.route('/sessions', methods=['GET'])
 def list_sessions():
-    """모든 세션 목록 반환"""
-    sessions = []
-    sessions_folder = app.config['SESSIONS_FOLDER']
-
-    if os.path.exists(sessions_folder):
-        for session_id in os.listdir(sessions_folder):
-            session_path = os.path.join(sessions_folder, session_id)
-            if os.path.isdir(session_path):
-                metadata = load_session_metadata(session_id)
-                if metadata:
-                    sessions.append({
-                        "id": session_id,
-                        "name": metadata.get('name', session_id),
-                        "created_at": metadata.get('created_at'),
-                        "updated_at": metadata.get('updated_at'),
-                        "question_count": metadata.get('question_count', 0),
-                        "image_filename": metadata.get('image_filename'),
-                        "thumbnail_url": f"{SERVER_URL}/sessions/{session_id}/image"
-                    })
+    """세션 목록 반환 (카탈로그 조회)
+
+    Query params:
+        limit, offset: 페이지네이션 (limit 미지정 시 전체)
+        cursor: 이전 응답의 next_cursor (offset 대신 사용)
+        sort: created_at | updated_at | name | question_count (기본 created_at)
+        order: asc | desc (기본 desc)
+        q: 세션 이름 검색어
+    """
+    version, modified_at = session_catalog.version()
+    validator = http_cache.version_validator('sessions', version, modified_at)
+    cached = http_cache.not_modified(validator)
+    if cached:
+        return cached
+
+    limit = request.args.get('limit', type=int)
+    offset = request.args.get('offset', default=0, type=int)
+    sort = request.args.get('sort', 'created_at')
+    order = request.args.get('order', 'desc')
+    q = request.args.get('q', '').strip() or None
+
+    if (limit is not None and limit < 1) or offset < 0:
+        return jsonify({"success": False, "message": "limit은 1 이상, offset은 0 이상이어야 합니다."}), 400
+    try:
+        cursor = request.args.get('cursor')
+        after = http_cache.decode_cursor(cursor) if cursor else None
+        if after is not None and len(after) != 4:
+            raise ValueError(f'잘못된 커서입니다: {cursor}')
+        with tracing.span('catalog.list'):
+            rows, total, next_key = session_catalog.list(
+                limit=limit, offset=offset, sort=sort, order=order, q=q, after=after
+            )
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    sessions = [{
+        "id": row['id'],
+        "name": row['name'],
+        "created_at": row['created_at'] or None,
+        "updated_at": row['updated_at'] or None,
+        "question_count": row['question_count'],
+        "image_filename": row['image_filename'],
+        # 원본 이미지는 세션 생성 시 정해지므로 created_at으로 버전을 매김 (썸네일 설정이 바뀌어도 달라짐)
+        "thumbnail_url": f"{SERVER_URL}/sessions/{row['id']}/image?size=sm&v={thumbnail_version(row['created_at'] or '')}"
+    } for row in rows]
+
+    return http_cache.with_validator(jsonify({
+        "success": True,
+        "sessions": sessions,
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "next_cursor": http_cache.encode_cursor(next_key) if next_key else None
+    }), validator)
 
-    # 최신순 정렬
-    sessions.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-    return jsonify({"success": True, "sessions": sessions})
 
 @app.route('/sessions', methods=['POST'])
 def create_session():
@@ -757,9 +1016,11 @@ def create_session():
 
     # 임시 파일로 저장
     temp_path = os.path.join(UPLOAD_FOLDER, f"temp_{uuid.uuid4()}.{ext}")
-    file.save(temp_path)
+    with tracing.span('upload.save'):
+        file.save(temp_path)
 
     created_sessions = []  # 예외 처리를 위해 미리 초기화
+    stored_blobs = []  # 실패 시 참조를 해제할 blob id 목록
 
     try:
         img = Image.open(temp_path)
@@ -774,6 +1035,10 @@ def create_session():
 
         now = datetime.now().isoformat()
 
+        # 모든 문제의 그래프를 프로세스 풀에서 병렬 렌더링 (실패는 결과에 담겨 옴)
+        with tracing.span('graph.render_all', count=len(questions)):
+            graphs = render_graphs([q.get('graph_info') for q in questions], 'png')
+
         # 각 문제별로 별도 세션 생성
         for idx, question in enumerate(questions):
             q_num = question.get('question_number', f'Q{idx+1}')
@@ -788,17 +1053,32 @@ def create_session():
             session_path = get_session_path(session_id)
             os.makedirs(session_path, exist_ok=True)
 
-            # 원본 이미지 복사
+            # 원본 이미지는 blob으로 한 번만 저장하고 세션마다 참조만 추가
             image_filename = f"original.{ext}"
-            image_path = os.path.join(session_path, image_filename)
-            shutil.copy2(temp_path, image_path)
+            with tracing.span('write.image'):
+                if idx == 0:
+                    original_blob_id = blob_store.put_file(temp_path, ext)
+                else:
+                    blob_store.incref(original_blob_id)
+                stored_blobs.append(original_blob_id)
+            session_blobs = {image_filename: original_blob_id}
+
+            # 썸네일: 첫 세션에서 한 번 생성하고 나머지 세션에는 복사
+            try:
+                if idx == 0:
+                    generate_thumbnails(img, session_path)
+                else:
+                    first_thumbs = os.path.join(get_session_path(created_sessions[0]['session_id']), THUMBS_DIRNAME)
+                    shutil.copytree(first_thumbs, os.path.join(session_path, THUMBS_DIRNAME))
+            except Exception as thumb_error:
+                # 썸네일은 이미지 요청 시 다시 생성되므로 실패해도 계속 진행
+                print(f"⚠️ 썸네일 생성 실패: {thumb_error}")
 
             bounding_box = question.get('bounding_box')
 
             # 여러 문제가 있을 때 크롭된 이미지도 저장
             if len(questions) > 1:
                 cropped_filename = f"cropped.{ext}"
-                cropped_path = os.path.join(session_path, cropped_filename)
 
                 if bounding_box:
                     # Gemini가 bounding_box를 반환한 경우
@@ -812,17 +1092,23 @@ def create_session():
                         'height': 1 / len(questions)
                     }
                     cropped_img = crop_image_by_bbox(img, auto_bbox)
-                cropped_img.save(cropped_path)
+                with tracing.span('write.image'):
+                    cropped_blob_id = store_blob(cropped_img.save, ext)
+                    stored_blobs.append(cropped_blob_id)
+                session_blobs[cropped_filename] = cropped_blob_id
                 # 크롭된 이미지 URL을 question 데이터에 추가
                 question['cropped_image_url'] = f"{SERVER_URL}/sessions/{session_id}/files/{cropped_filename}"
 
-            # 그래프 생성 (graph_info가 있으면)
-            graph_info = question.get('graph_info')
-            if graph_info and graph_info.get('type') and graph_info.get('plot_data'):
+            # 그래프 저장 (graph_info가 있으면, 렌더링은 루프 전에 한꺼번에)
+            graph = graphs[idx]
+            if graph:
                 try:
+                    if not graph['ok']:
+                        raise RuntimeError(graph['error'])
                     graph_filename = f"graph_q{q_num}.png"
-                    graph_path = os.path.join(session_path, graph_filename)
-                    generate_graph(graph_info, graph_path)
+                    graph_blob_id = store_bytes_blob(graph['data'], 'png')
+                    stored_blobs.append(graph_blob_id)
+                    session_blobs[graph_filename] = graph_blob_id
                     question['graph_url'] = f"{SERVER_URL}/sessions/{session_id}/files/{graph_filename}"
                 except Exception as graph_error:
                     print(f"Graph generation error: {graph_error}")
@@ -831,8 +1117,8 @@ def create_session():
             # 단일 문제 결과 저장
             single_result = {"questions": [question]}
             analysis_file = os.path.join(session_path, 'analysis.json')
-            with open(analysis_file, 'w', encoding='utf-8') as f:
-                json.dump(single_result, f, ensure_ascii=False, indent=2)
+            with tracing.span('write.analysis'):
+                atomic_write_json(analysis_file, single_result)
 
             # 메타데이터 저장
             metadata = {
@@ -841,6 +1127,7 @@ def create_session():
                 "updated_at": now,
                 "image_filename": image_filename,
                 "original_filename": original_name,
+                "blobs": session_blobs,
                 "question_count": 1,
                 "system_prompt_used": system_prompt,
                 "user_prompt_used": user_prompt
@@ -858,6 +1145,10 @@ def create_session():
         # 임시 파일 삭제
         os.remove(temp_path)
 
+        # 요청 트레이스를 생성된 각 세션에 저장
+        for session_info in created_sessions:
+            tracing.save_trace(g.trace, get_session_path(session_info['session_id']))
+
         # 첫 번째 세션을 메인으로 반환 (하위 호환성)
         first_session = created_sessions[0]
         return jsonify({
@@ -879,6 +1170,8 @@ def create_session():
             session_folder = get_session_path(session_info['session_id'])
             if os.path.exists(session_folder):
                 shutil.rmtree(session_folder)
+            session_catalog.delete(session_info['session_id'])
+        blob_store.release_all(stored_blobs)
         print(f"Session creation error: {e}")
         import traceback
         traceback.print_exc()
@@ -911,6 +1204,7 @@ def get_session(session_id):
         "created_at": metadata.get('created_at'),
         "updated_at": metadata.get('updated_at'),
         "question_count": metadata.get('question_count', 0),
+        "version": metadata.get('version', 0),
         "image_url": f"{SERVER_URL}/sessions/{session_id}/image",
         "data": analysis_data
     })
@@ -918,7 +1212,7 @@ def get_session(session_id):
 
 @app.route('/sessions/<session_id>', methods=['PUT'])
 def update_session(session_id):
-    """세션 이름 수정"""
+    """세션 이름 수정 (요청에 version이 있으면 compare-and-swap, 불일치 시 409)"""
     session_path = get_session_path(session_id)
 
     if not os.path.exists(session_path):
@@ -929,18 +1223,31 @@ def update_session(session_id):
 
     if not new_name:
         return jsonify({"success": False, "message": "새 이름이 필요합니다."}), 400
+    try:
+        expected_version = parse_version(data.get('version'))
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
 
-    metadata = load_session_metadata(session_id)
-    if metadata:
-        metadata['name'] = new_name
-        metadata['updated_at'] = datetime.now().isoformat()
-        save_session_metadata(session_id, metadata)
+    try:
+        metadata = update_session_metadata(session_id, {
+            'name': new_name,
+            'updated_at': datetime.now().isoformat()
+        }, expected_version=expected_version)
+    except SessionNotFound:
+        return jsonify({"success": False, "message": "세션을 찾을 수 없습니다."}), 404
+    except VersionConflict as e:
+        return jsonify({
+            "success": False,
+            "message": "다른 요청이 먼저 세션을 수정했습니다. 새로고침 후 다시 시도해주세요.",
+            "current_version": e.current
+        }), 409
 
     return jsonify({
         "success": True,
         "message": "세션 이름이 수정되었습니다.",
         "session_id": session_id,
-        "name": new_name
+        "name": new_name,
+        "version": metadata.get('version') if metadata else None
     })
 
 
@@ -953,7 +1260,14 @@ def delete_session(session_id):
         return jsonify({"success": False, "message": "세션을 찾을 수 없습니다."}), 404
 
     try:
-        shutil.rmtree(session_path)
+        # 진행 중인 쓰기(재분석 등)와 겹치지 않도록 세션 잠금 안에서 삭제
+        # (잠금 뒤에 들어온 쓰기는 SessionNotFound로 끝남)
+        with session_lock(session_path):
+            metadata = load_session_metadata(session_id) or {}
+            shutil.rmtree(session_path)
+        session_catalog.delete(session_id)
+        # 세션이 참조하던 blob 해제 (마지막 참조면 파일 삭제)
+        blob_store.release_all((metadata.get('blobs') or {}).values())
         return jsonify({
             "success": True,
             "message": "세션이 삭제되었습니다.",
@@ -982,12 +1296,16 @@ def reanalyze_session(session_id):
 
     # 프롬프트 (요청에서 받거나 기존 것 사용)
     data = request.get_json() or {}
+    try:
+        expected_version = parse_version(data.get('version'))
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
     system_prompt = data.get('system_prompt', metadata.get('system_prompt_used'))
     user_prompt = data.get('user_prompt', metadata.get('user_prompt_used'))
 
     # 이미지 로드
     image_filename = metadata.get('image_filename', 'original.png')
-    image_path = os.path.join(session_path, image_filename)
+    image_path = resolve_session_file(session_id, image_filename, metadata)
 
     if not os.path.exists(image_path):
         return jsonify({"success": False, "message": "이미지 파일을 찾을 수 없습니다."}), 404
@@ -995,49 +1313,82 @@ def reanalyze_session(session_id):
     try:
         img = Image.open(image_path)
 
-        # Gemini Vision으로 재분석
+        # Gemini Vision으로 재분석 (잠금 없이 수행)
         result = analyze_exam_image(img, system_prompt, user_prompt, api_key)
         question_count = len(result.get('questions', []))
 
-        # 기존 그래프 파일 삭제
-        for f in os.listdir(session_path):
-            if f.startswith('graph_'):
-                os.remove(os.path.join(session_path, f))
-
-        # 각 문항의 graph_info가 있으면 그래프 생성
-        for question in result.get('questions', []):
-            graph_info = question.get('graph_info')
-            if graph_info and graph_info.get('type') and graph_info.get('plot_data'):
+        # 그래프 렌더링과 blob 저장도 잠금 밖에서 (같은 그래프는 같은 blob으로 저장됨)
+        questions = result.get('questions', [])
+        graph_blobs = {}
+        with tracing.span('graph.render_all', count=len(questions)):
+            graphs = render_graphs([q.get('graph_info') for q in questions], 'png')
+        for question, graph in zip(questions, graphs):
+            if graph:
                 try:
                     q_num = question.get('question_number', 'unknown')
+                    if not graph['ok']:
+                        raise RuntimeError(graph['error'])
                     graph_filename = f"graph_q{q_num}.png"
-                    graph_path = os.path.join(session_path, graph_filename)
-                    generate_graph(graph_info, graph_path)
+                    graph_blobs[graph_filename] = store_bytes_blob(graph['data'], 'png')
                     question['graph_url'] = f"{SERVER_URL}/sessions/{session_id}/files/{graph_filename}"
                 except Exception as graph_error:
                     print(f"Graph generation error: {graph_error}")
                     question['graph_error'] = str(graph_error)
 
-        # 분석 결과 저장
-        analysis_file = os.path.join(session_path, 'analysis.json')
-        with open(analysis_file, 'w', encoding='utf-8') as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
-
-        # 메타데이터 업데이트
-        metadata['updated_at'] = datetime.now().isoformat()
-        metadata['question_count'] = question_count
-        metadata['system_prompt_used'] = system_prompt
-        metadata['user_prompt_used'] = user_prompt
-        save_session_metadata(session_id, metadata)
+        # 결과 반영만 세션 쓰기 잠금 안에서 (그 사이의 이름 변경 등은 유지)
+        try:
+            with session_lock(session_path):
+                current = load_session_metadata(session_id) or {}
+                if expected_version is not None and int(current.get('version', 0)) != expected_version:
+                    raise VersionConflict(expected_version, current.get('version', 0))
+
+                # 기존 그래프 파일(이전 형식) 삭제, blob 참조는 메타데이터 저장 후 해제
+                for f in os.listdir(session_path):
+                    if f.startswith('graph_'):
+                        os.remove(os.path.join(session_path, f))
+                session_blobs = {name: blob_id for name, blob_id in (current.get('blobs') or {}).items()
+                                 if not name.startswith('graph_')}
+                old_graph_blobs = [blob_id for name, blob_id in (current.get('blobs') or {}).items()
+                                   if name.startswith('graph_')]
+                session_blobs.update(graph_blobs)
+
+                # 분석 결과 저장
+                analysis_file = os.path.join(session_path, 'analysis.json')
+                with tracing.span('write.analysis'):
+                    atomic_write_json(analysis_file, result)
+
+                # 메타데이터 업데이트 (잠금 안에서 최신 메타데이터를 다시 읽어서 적용)
+                metadata = _update_session_metadata_locked(session_id, {
+                    'updated_at': datetime.now().isoformat(),
+                    'question_count': question_count,
+                    'system_prompt_used': system_prompt,
+                    'user_prompt_used': user_prompt,
+                    'blobs': session_blobs
+                })
+        except BaseException:
+            # 반영하지 못했으면 새로 저장한 그래프 blob 참조를 되돌림
+            blob_store.release_all(graph_blobs.values())
+            raise
+        blob_store.release_all(old_graph_blobs)
+        tracing.save_trace(g.trace, session_path)
 
         return jsonify({
             "success": True,
             "session_id": session_id,
             "message": "재분석 완료",
             "question_count": question_count,
+            "version": metadata.get('version') if metadata else None,
             "data": result
         })
 
+    except VersionConflict as e:
+        return jsonify({
+            "success": False,
+            "message": "재분석 중 다른 요청이 세션을 수정했습니다. 새로고침 후 다시 시도해주세요.",
+            "current_version": e.current
+        }), 409
+    except SessionNotFound:
+        return jsonify({"success": False, "message": "재분석 중 세션이 삭제되었습니다."}), 404
     except Exception as e:
         print(f"Reanalysis error: {e}")
         import traceback
@@ -1047,7 +1398,7 @@ def reanalyze_session(session_id):
 
 @app.route('/sessions/<session_id>/image')
 def serve_session_image(session_id):
-    """세션의 원본 이미지 제공"""
+    """세션의 원본 이미지 제공 (?size=sm|md|lg 이면 썸네일, ?v=는 목록이 주는 썸네일 버전)"""
     session_path = get_session_path(session_id)
     metadata = load_session_metadata(session_id)
 
@@ -1055,7 +1406,27 @@ def serve_session_image(session_id):
         return jsonify({"success": False, "message": "세션을 찾을 수 없습니다."}), 404
 
     image_filename = metadata.get('image_filename', 'original.png')
-    return send_from_directory(session_path, image_filename)
+    size = request.args.get('size')
+    if not size:
+        return send_session_file(session_id, image_filename, metadata)
+
+    image_path = resolve_session_file(session_id, image_filename, metadata)
+    if not os.path.exists(image_path):
+        return jsonify({"success": False, "message": "이미지 파일을 찾을 수 없습니다."}), 404
+    try:
+        thumb_path = get_thumbnail(session_path, image_path, size)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    # 버전이 맞는 URL만 오래 캐시 (버전이 없거나 다르면 ETag로 재검증)
+    if request.args.get('v') == thumbnail_version(metadata.get('created_at') or ''):
+        response = send_file(thumb_path, max_age=THUMBNAIL_MAX_AGE)
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+    else:
+        response = send_file(thumb_path)
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 
 @app.route('/sessions/<session_id>/files/<filename>')
@@ -1066,107 +1437,139 @@ def serve_session_file(session_id, filename):
     if not os.path.exists(session_path):
         return jsonify({"success": False, "message": "세션을 찾을 수 없습니다."}), 404
 
-    return send_from_directory(session_path, filename)
+    return send_session_file(session_id, filename)
+
+
+@app.route('/blobs/<blob_id>')
+def serve_blob(blob_id):
+    """blob 저장소의 파일 제공 (내용 해시 주소이므로 immutable)"""
+    if not blob_store.exists(blob_id):
+        return jsonify({"success": False, "message": "파일을 찾을 수 없습니다."}), 404
+    return blob_store.send(blob_id, immutable=True)
+
+
+@app.route('/sessions/<session_id>/trace', methods=['GET'])
+def get_session_trace(session_id):
+    """세션에 저장된 최근 요청 트레이스 조회 (최신순)"""
+    session_path = get_session_path(session_id)
+
+    if not os.path.exists(session_path):
+        return jsonify({"success": False, "message": "세션을 찾을 수 없습니다."}), 404
+
+    limit = request.args.get('limit', 5, type=int)
+    traces = tracing.load_traces(session_path, limit=max(1, min(limit, tracing.MAX_TRACES_PER_SESSION)))
+    return jsonify({
+        "success": True,
+        "session_id": session_id,
+        "latest": traces[0] if traces else None,
+        "traces": traces
+    })
 
 
 # ==================== 세션별 변형 문제 API ====================
 
 @app.route('/sessions/<session_id>/variants', methods=['GET'])
 def get_session_variants(session_id):
-    """세션의 모든 변형 문제 목록 조회"""
+    """세션의 모든 변형 문제 목록 조회 (limit/cursor 페이지네이션, ETag 지원)"""
     session_path = get_session_path(session_id)
 
     if not os.path.exists(session_path):
         return jsonify({"success": False, "message": "세션을 찾을 수 없습니다."}), 404
 
     variants_folder = os.path.join(session_path, 'variants')
-    variants = []
-
-    if os.path.exists(variants_folder):
-        for f in os.listdir(variants_folder):
-            if f.endswith('.json') and f.startswith('q'):
-                # q{question_num}_{timestamp}.json 형식
-                parts = f.replace('.json', '').split('_')
-                question_num = parts[0][1:]  # 'q' 제거
-                timestamp = '_'.join(parts[1:]) if len(parts) > 1 else ''
-
-                json_path = os.path.join(variants_folder, f)
-                html_filename = f.replace('.json', '.html')
-
-                variants.append({
-                    "question_number": question_num,
-                    "json_filename": f,
-                    "html_filename": html_filename,
-                    "timestamp": timestamp,
-                    "created": os.path.getmtime(json_path),
-                    "json_url": f"{SERVER_URL}/sessions/{session_id}/variants/{f}",
-                    "html_url": f"{SERVER_URL}/sessions/{session_id}/variants/{html_filename}"
-                })
+    validator = http_cache.directory_validator(session_path, variants_folder)
+    cached = http_cache.not_modified(validator)
+    if cached:
+        return cached
+    try:
+        limit, after = http_cache.get_page_args()
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    # manifest 하나만 읽어서 목록 구성
+    variants = [{
+        "question_number": entry['question_number'],
+        "json_filename": entry['json_filename'],
+        "html_filename": entry['html_filename'],
+        "timestamp": entry['timestamp'],
+        "created": entry['created'],
+        "variant_count": entry['variant_count'],
+        "difficulty_counts": entry['difficulty_counts'],
+        "size": entry['size'],
+        "json_url": f"{SERVER_URL}/sessions/{session_id}/variants/{entry['json_filename']}",
+        "html_url": f"{SERVER_URL}/sessions/{session_id}/variants/{entry['html_filename']}"
+    } for entry in variant_manifest.list_entries(session_path)]
 
     # 문제 번호별로 정렬 후 최신순
-    variants.sort(key=lambda x: (x['question_number'], -x['created']))
+    try:
+        variants, next_cursor = http_cache.paginate(
+            variants, lambda x: (x['question_number'], -x['created'], x['json_filename']), limit, after
+        )
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
 
-    return jsonify({"success": True, "variants": variants})
+    return http_cache.with_validator(
+        jsonify({"success": True, "variants": variants, "next_cursor": next_cursor}), validator
+    )
 
 
 @app.route('/sessions/<session_id>/variants/<filename>')
 def serve_session_variant(session_id, filename):
-    """세션의 변형 문제 파일 제공"""
+    """세션의 변형 문제 파일 제공 (.qvs로 저장된 세트도 .json으로 제공)"""
     session_path = get_session_path(session_id)
     variants_folder = os.path.join(session_path, 'variants')
 
     if not os.path.exists(variants_folder):
         return jsonify({"success": False, "message": "변형 문제 폴더를 찾을 수 없습니다."}), 404
 
-    return send_from_directory(variants_folder, filename)
+    return send_variant_file(variants_folder, filename)
 
 
 @app.route('/sessions/<session_id>/variants/question/<question_num>', methods=['GET'])
 def get_question_variants(session_id, question_num):
-    """특정 문항의 변형 문제 목록 조회"""
+    """특정 문항의 변형 문제 목록 조회 (limit/cursor 페이지네이션, ETag 지원)"""
     session_path = get_session_path(session_id)
 
     if not os.path.exists(session_path):
         return jsonify({"success": False, "message": "세션을 찾을 수 없습니다."}), 404
 
     variants_folder = os.path.join(session_path, 'variants')
-    variants = []
-
-    if os.path.exists(variants_folder):
-        for f in os.listdir(variants_folder):
-            if f.startswith(f'q{question_num}_') and f.endswith('.json'):
-                timestamp = f.replace(f'q{question_num}_', '').replace('.json', '')
-                json_path = os.path.join(variants_folder, f)
-                html_filename = f.replace('.json', '.html')
-
-                # JSON 데이터 로드하여 변형 문제 개수 등 추가 정보 확인
-                variant_count = 0
-                try:
-                    with open(json_path, 'r', encoding='utf-8') as jf:
-                        data = json.load(jf)
-                        variant_count = len(data.get('variants', []))
-                except:
-                    pass
-
-                variants.append({
-                    "json_filename": f,
-                    "html_filename": html_filename,
-                    "timestamp": timestamp,
-                    "created": os.path.getmtime(json_path),
-                    "variant_count": variant_count,
-                    "json_url": f"{SERVER_URL}/sessions/{session_id}/variants/{f}",
-                    "html_url": f"{SERVER_URL}/sessions/{session_id}/variants/{html_filename}"
-                })
+    validator = http_cache.directory_validator(session_path, variants_folder)
+    cached = http_cache.not_modified(validator)
+    if cached:
+        return cached
+    try:
+        limit, after = http_cache.get_page_args()
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    # manifest 하나만 읽어서 목록 구성 (변형 개수도 manifest에 기록되어 있음)
+    variants = [{
+        "json_filename": entry['json_filename'],
+        "html_filename": entry['html_filename'],
+        "timestamp": entry['timestamp'],
+        "created": entry['created'],
+        "variant_count": entry['variant_count'],
+        "difficulty_counts": entry['difficulty_counts'],
+        "size": entry['size'],
+        "json_url": f"{SERVER_URL}/sessions/{session_id}/variants/{entry['json_filename']}",
+        "html_url": f"{SERVER_URL}/sessions/{session_id}/variants/{entry['html_filename']}"
+    } for entry in variant_manifest.list_entries(session_path, question_num)]
 
     # 최신순 정렬
-    variants.sort(key=lambda x: -x['created'])
+    has_variants = len(variants) > 0
+    try:
+        variants, next_cursor = http_cache.paginate(variants, lambda x: (-x['created'], x['json_filename']), limit, after)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
 
-    return jsonify({
+    return http_cache.with_validator(jsonify({
         "success": True,
         "question_number": question_num,
         "variants": variants,
-        "has_variants": len(variants) > 0
-    })
+        "has_variants": has_variants,
+        "next_cursor": next_cursor
+    }), validator)
 
 
 @app.route('/sessions/<session_id>/generate-variants', methods=['POST'])
@@ -1180,7 +1583,7 @@ def generate_session_variants(session_id):
     if not api_key:
         return jsonify({"success": False, "message": "Gemini API 키가 필요합니다. 설정에서 API 키를 입력해주세요."}), 401
 
-    from generate_variants import generate_variants_via_code, generate_html_report
+    from generate_variants import generate_variants_via_code, generate_html_report, report_graph_files, REPORT_GRAPH_MODE
 
     session_path = get_session_path(session_id)
 
@@ -1203,24 +1606,12 @@ def generate_session_variants(session_id):
 
     def generate():
         nonlocal question_data
-        import queue
-        import threading
 
         retry_count = 0
         variants_data = None
         last_error = None
 
-        # 진행 상황을 저장할 큐
-        progress_queue = queue.Queue()
-
-        def progress_callback(step, progress, message, details):
-            """콜백으로 받은 진행 상황을 큐에 추가"""
-            progress_queue.put({
-                'step': step,
-                'progress': progress,
-                'message': message,
-                **details
-            })
+        trace = tracing.Trace(f"POST /sessions/{session_id}/generate-variants")
 
         try:
             # 초기 상태
@@ -1235,40 +1626,17 @@ def generate_session_variants(session_id):
                     else:
                         yield f"data: {json.dumps({'step': 'auto_retry', 'progress': 5, 'message': f'자동 복구 시도 중... ({retry_count}/{MAX_AUTO_RETRY})', 'retry_count': retry_count})}\n\n"
 
-                    # 백그라운드 스레드에서 생성 실행
-                    result_holder = {'data': None, 'error': None}
-
-                    def run_generation():
-                        try:
-                            result_holder['data'] = generate_variants_via_code(
+                    def run_generation(stream):
+                        with tracing.activate(trace):
+                            return generate_variants_via_code(
                                 question_data,
-                                progress_callback=progress_callback
+                                progress_callback=stream.progress_callback
                             )
-                        except Exception as e:
-                            result_holder['error'] = e
-
-                    thread = threading.Thread(target=run_generation)
-                    thread.start()
-
-                    # 스레드가 완료될 때까지 큐에서 진행 상황 읽어서 전송
-                    while thread.is_alive():
-                        try:
-                            progress_data = progress_queue.get(timeout=0.5)
-                            yield f"data: {json.dumps(progress_data)}\n\n"
-                        except queue.Empty:
-                            continue
 
-                    # 남은 큐 비우기
-                    while not progress_queue.empty():
-                        progress_data = progress_queue.get_nowait()
-                        yield f"data: {json.dumps(progress_data)}\n\n"
-
-                    thread.join()
-
-                    if result_holder['error']:
-                        raise result_holder['error']
-
-                    variants_data = result_holder['data']
+                    # 공용 작업 풀에서 실행하고 진행 이벤트가 올 때만 전송 (없으면 하트비트)
+                    job = jobs.start_job(run_generation)
+                    yield from job.sse()
+                    variants_data = job.result()
                     break  # 성공하면 루프 탈출
 
                 except json.JSONDecodeError as je:
@@ -1337,27 +1705,44 @@ def generate_session_variants(session_id):
                 if f.startswith(f'q{question_num}_') and f.endswith('.html')
             ])
             # 새 파일 추가 후 10개를 초과하면 가장 오래된 것부터 삭제
+            evicted = []
             while len(existing_html_files) >= MAX_VARIANTS_PER_QUESTION:
                 oldest_html = existing_html_files.pop(0)
                 oldest_json = oldest_html.replace('.html', '.json')
                 try:
+                    for graph_path in report_graph_files(os.path.join(variants_folder, oldest_html)):
+                        os.remove(graph_path)
                     os.remove(os.path.join(variants_folder, oldest_html))
-                    json_to_delete = os.path.join(variants_folder, oldest_json)
-                    if os.path.exists(json_to_delete):
+                    json_to_delete = variant_store.resolve_path(os.path.join(variants_folder, oldest_json))
+                    if json_to_delete:
                         os.remove(json_to_delete)
+                        evicted.append(os.path.basename(json_to_delete))
                     print(f"  🗑️ 오래된 변형 문제 삭제: {oldest_html}")
                 except Exception as del_e:
                     print(f"  ⚠️ 파일 삭제 실패: {del_e}")
+            # 지운 파일은 바로 manifest에서 빼서 리포트/저장이 실패해도 없는 파일을 가리키지 않게 함
+            if evicted:
+                variant_manifest.update_manifest(session_path, removed=evicted)
 
             try:
-                generate_html_report(question_data, variants_data, html_path)
+                with tracing.activate(trace):
+                    generate_html_report(question_data, variants_data, html_path, graph_mode=REPORT_GRAPH_MODE)
             except Exception as e:
                 yield f"data: {json.dumps({'step': 'error', 'progress': 0, 'message': f'HTML 리포트 생성 실패: {str(e)}', 'error_type': 'report'})}\n\n"
                 return
 
             # JSON 결과 저장
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(variants_data, f, ensure_ascii=False, indent=2)
+            with trace.span('write.variants'):
+                json_path = variant_store.write_variant_set(json_path, variants_data)
+                stored_name = os.path.basename(json_path)
+                variant_manifest.update_manifest(
+                    session_path,
+                    added=[stored_name],
+                    headers={stored_name: variant_store.build_header(
+                        variants_data.get('variants', []),
+                        (variants_data.get('original') or {}).get('key_concepts')
+                    )}
+                )
 
             # Python 코드 파일 저장
             py_filename = None
@@ -1380,8 +1765,11 @@ import math
 ''')
                     f.write(variants_data['generated_code'])
                 print(f"  📄 Python 코드 저장: {py_filename}")
+                record_artifact(py_path)
+            record_artifacts(html_path, json_path, *report_graph_files(html_path))
 
             yield f"data: {json.dumps({'step': 'save', 'progress': 95, 'message': '파일 저장 완료'})}\n\n"
+            tracing.save_trace(trace, session_path)
 
             # 완료
             result = {
@@ -1422,11 +1810,17 @@ def delete_question_variants(session_id, question_num):
     variants_folder = os.path.join(session_path, 'variants')
     deleted_count = 0
 
+    removed = []
     if os.path.exists(variants_folder):
         for f in os.listdir(variants_folder):
             if f.startswith(f'q{question_num}_'):
                 os.remove(os.path.join(variants_folder, f))
-                deleted_count += 1
+                # 리포트 그래프(.png/.svg)도 같이 지우지만 변형 문제 개수에는 넣지 않음
+                if f.endswith(('.html', variant_store.JSON_EXT, variant_store.QVS_EXT)):
+                    removed.append(f)
+                    deleted_count += 1
+        if removed:
+            variant_manifest.update_manifest(session_path, removed=removed)
 
     return jsonify({
         "success": True,
@@ -1435,12 +1829,103 @@ def delete_question_variants(session_id, question_num):
     })
 
 
+def to_exam_question(variant, difficulty, points=3):
+    """변형 문제 레코드를 문제지용 형식으로 변환"""
+    return {
+        'question_number': str(variant.get('variant_id', '')),
+        'question_text': variant.get('question_text', ''),
+        'choices': variant.get('choices', []),
+        'answer': variant.get('answer', ''),
+        'explanation': variant.get('explanation', ''),
+        'difficulty': difficulty,
+        'points': points,
+        'has_passage': False,
+        'passage': None,
+        'has_figure': False,
+        'figure_description': None
+    }
+
+
+def _new_exam_path(exams_folder, questions):
+    """문항 번호를 다시 매기고 새 문제지 파일명/경로를 반환"""
+    for idx, q in enumerate(questions, 1):
+        q['question_number'] = str(idx)
+
+    os.makedirs(exams_folder, exist_ok=True)
+    # 같은 초에 만든 문제지가 서로 덮어쓰지 않도록 고유 접미사를 붙임
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filename = f'exam_{timestamp}_{uuid.uuid4().hex[:8]}.html'
+    return filename, os.path.join(exams_folder, filename)
+
+
+def write_exam_html(exams_folder, questions, title, include_answer_sheet=True):
+    """문제지 HTML을 조각 단위로 파일에 쓰고 파일명을 반환"""
+    from generate_exam import write_exam_file
+
+    filename, filepath = _new_exam_path(exams_folder, questions)
+    with tracing.span('exam.render', questions=len(questions)):
+        write_exam_file(filepath, questions, title, include_answer_sheet)
+        record_artifact(filepath)
+    return filename
+
+
+def write_exam_forms_html(exams_folder, questions, title, include_answer_sheet, forms, seed, exam_url_prefix):
+    """A/B/C... 유형별 문제지를 저장하고 [{form, filename, exam_url, answers}] 반환
+
+    문항 조각(수식/해설/그래프)은 내용 해시로 캐시되어 유형 간, 이후 문제지 간에 재사용됩니다.
+    """
+    from generate_exam import write_exam_forms
+
+    filename, _ = _new_exam_path(exams_folder, questions)
+    base = filename[:-len('.html')]
+    with tracing.span('exam.render', questions=len(questions), forms=forms):
+        results = write_exam_forms(
+            lambda label: os.path.join(exams_folder, f'{base}_{label}.html'),
+            questions, forms, title, include_answer_sheet, seed
+        )
+        for r in results:
+            record_artifact(r['path'])
+    return [{
+        "form": r['form'],
+        "filename": os.path.basename(r['path']),
+        "exam_url": f"{exam_url_prefix}/{os.path.basename(r['path'])}",
+        "answers": r['answers']
+    } for r in results]
+
+
+def stream_exam_html(exams_folder, questions, title, include_answer_sheet, exam_url_prefix):
+    """문제지 HTML을 응답으로 흘려보내면서 같은 내용을 파일에도 저장
+
+    전송이 끝까지 완료된 경우에만 파일을 교체하고, 중간에 끊기면 임시 파일을 지웁니다.
+    """
+    from generate_exam import iter_exam_html, WRITE_BUFFER_SIZE
+
+    filename, filepath = _new_exam_path(exams_folder, questions)
+    tmp_path = f'{filepath}.{uuid.uuid4().hex[:8]}.tmp'
+
+    def generate():
+        completed = False
+        try:
+            with open(tmp_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+                for fragment in iter_exam_html(questions, title, include_answer_sheet):
+                    f.write(fragment)
+                    yield fragment
+            os.replace(tmp_path, filepath)
+            record_artifact(filepath)
+            completed = True
+        finally:
+            if not completed and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    return Response(generate(), mimetype='text/html', headers={
+        'X-Exam-Url': f"{exam_url_prefix}/{filename}",
+        'Cache-Control': 'no-cache'
+    })
+
+
 @app.route('/sessions/<session_id>/generate-exam', methods=['POST'])
 def generate_exam(session_id):
     """세션의 변형 문제들로 수능 스타일 문제지 생성"""
-    from generate_exam import generate_exam_html
-    import random
-
     session_path = get_session_path(session_id)
     if not os.path.exists(session_path):
         return jsonify({"success": False, "message": "세션을 찾을 수 없습니다."}), 404
@@ -1450,98 +1935,158 @@ def generate_exam(session_id):
     if not os.path.exists(variants_folder):
         return jsonify({"success": False, "message": "변형 문제가 없습니다. 먼저 변형 문제를 생성해주세요."}), 404
 
-    # 모든 변형 문제 수집
-    all_variants = []
-    variant_json_files = [f for f in os.listdir(variants_folder) if f.endswith('.json') and not f.endswith('_code.json')]
-
-    for json_file in variant_json_files:
-        json_path = os.path.join(variants_folder, json_file)
-        try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                variant_data = json.load(f)
-
-            # variants 배열에서 문제 추출
-            for variant in variant_data.get('variants', []):
-                # 문제지용 형식으로 변환
-                q = {
-                    'question_number': str(variant.get('variant_id', '')),
-                    'question_text': variant.get('question_text', ''),
-                    'choices': variant.get('choices', []),
-                    'answer': variant.get('answer', ''),
-                    'explanation': variant.get('explanation', ''),
-                    'difficulty': variant.get('difficulty', '중'),
-                    'points': 3,  # 기본 배점
-                    'has_passage': False,
-                    'passage': None,
-                    'has_figure': False,
-                    'figure_description': None
-                }
-                all_variants.append(q)
-        except Exception as e:
-            print(f"변형 문제 로드 오류 ({json_file}): {e}")
-            continue
-
-    if not all_variants:
+    # 변형 문제 풀 (manifest version이 바뀌지 않았으면 메모리 캐시 재사용)
+    pool = variant_pool.get_pool(session_path)
+    if not len(pool):
         return jsonify({"success": False, "message": "유효한 변형 문제가 없습니다."}), 400
 
     # 요청 파라미터
     data = request.get_json() or {}
-    question_count = min(data.get('question_count', 5), len(all_variants))
+    question_count = min(data.get('question_count', 5), len(pool))
     difficulty = data.get('difficulty', 'mixed')
     title = data.get('title', '수학 모의고사')
     include_answer_sheet = data.get('include_answer_sheet', True)
 
-    # 문항 선택 (난이도 필터링)
-    selected_questions = []
+    # 문항 선택 (난이도 필터링, 부족하면 다른 문제로 채움)
     difficulty_map = {'easy': '쉬움', 'medium': '보통', 'hard': '어려움'}
+    target_level = None if difficulty == 'mixed' else difficulty_map.get(difficulty, '보통')
+    with tracing.span('exam.sample', pool_size=len(pool)):
+        positions = pool.sample(question_count, target_level)
+        variants = pool.get_records(positions)
 
-    if difficulty == 'mixed':
-        # 랜덤하게 섞어서 선택
-        random.shuffle(all_variants)
-        selected_questions = all_variants[:question_count]
-    else:
-        target_level = difficulty_map.get(difficulty, '보통')
-        # 해당 난이도 문제 필터링
-        filtered = [q for q in all_variants if q.get('difficulty') == target_level]
-        random.shuffle(filtered)
-        selected_questions = filtered[:question_count]
-
-        # 부족한 경우 다른 문제로 채우기
-        if len(selected_questions) < question_count:
-            remaining = [q for q in all_variants if q not in selected_questions]
-            random.shuffle(remaining)
-            selected_questions.extend(remaining[:question_count - len(selected_questions)])
-
-    # 문항 번호 재부여
-    for idx, q in enumerate(selected_questions, 1):
-        q['question_number'] = str(idx)
+    selected_questions = [
+        to_exam_question(variant, pool.items[pos][2])
+        for pos, variant in zip(positions, variants)
+    ]
 
-    # exams 폴더 생성
     exams_folder = os.path.join(session_path, 'exams')
-    os.makedirs(exams_folder, exist_ok=True)
+    forms = data.get('forms', 1)
+    if forms != 1:
+        try:
+            form_files = write_exam_forms_html(
+                exams_folder, selected_questions, title, include_answer_sheet, int(forms), data.get('seed'),
+                f"{SERVER_URL}/sessions/{session_id}/exams"
+            )
+        except (TypeError, ValueError) as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        return jsonify({
+            "success": True,
+            "exam_url": form_files[0]['exam_url'],
+            "forms": form_files,
+            "question_count": len(selected_questions)
+        })
+    if data.get('stream'):
+        # 완성된 문서를 기다리지 않고 HTML을 바로 전송 (저장 위치는 X-Exam-Url 헤더)
+        return stream_exam_html(
+            exams_folder, selected_questions, title, include_answer_sheet,
+            f"{SERVER_URL}/sessions/{session_id}/exams"
+        )
+    filename = write_exam_html(exams_folder, selected_questions, title, include_answer_sheet)
 
-    # 파일명 생성
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f'exam_{timestamp}.html'
-    filepath = os.path.join(exams_folder, filename)
+    return jsonify({
+        "success": True,
+        "exam_url": f"{SERVER_URL}/sessions/{session_id}/exams/{filename}",
+        "question_count": len(selected_questions)
+    })
 
-    # HTML 생성
-    html_content = generate_exam_html(
-        questions=selected_questions,
-        title=title,
-        include_answer_sheet=include_answer_sheet
-    )
 
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+@app.route('/exams/build', methods=['POST'])
+def build_cross_session_exam():
+    """여러 세션의 변형 문제로 제약 조건을 만족하는 문제지 생성
+
+    요청 예:
+        {
+            "session_ids": ["..."],          # 생략하면 변형 문제가 있는 모든 세션
+            "question_count": 20,
+            "constraints": {
+                "difficulty": {"easy": 5, "medium": 10, "hard": 5},
+                "max_per_question": 1,
+                "concepts": ["미분", "적분"],
+                "total_points": 60
+            },
+            "seed": 42,
+            "forms": 1,                      # 2 이상이면 A/B/C... 유형별 문제지 (문항/선택지 순서 섞기)
+            "stream": false                  # true면 HTML을 바로 스트리밍 (리포트는 생략, 단일 유형만)
+        }
+    """
+    from exam_builder import build_exam
+
+    data = request.get_json() or {}
+    session_ids = data.get('session_ids')
+    if session_ids is None:
+        session_ids = [
+            d for d in os.listdir(SESSIONS_FOLDER)
+            if os.path.isdir(os.path.join(SESSIONS_FOLDER, d, 'variants'))
+        ]
+    elif not isinstance(session_ids, list):
+        return jsonify({"success": False, "message": "session_ids는 목록이어야 합니다."}), 400
+
+    pools = []
+    with tracing.span('exam.pools', sessions=len(session_ids)):
+        for session_id in session_ids:
+            session_path = get_session_path(secure_filename(str(session_id)))
+            if not os.path.isdir(session_path):
+                return jsonify({"success": False, "message": f"세션을 찾을 수 없습니다: {session_id}"}), 404
+            pools.append((session_id, variant_pool.get_pool(session_path)))
+
+    try:
+        with tracing.span('exam.build', pool_size=sum(len(p) for _, p in pools)):
+            result = build_exam(
+                pools,
+                data.get('question_count', 20),
+                constraints=data.get('constraints') or {},
+                seed=data.get('seed')
+            )
+    except (TypeError, ValueError) as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    questions = [to_exam_question(item['variant'], item['difficulty'], item['points']) for item in result['items']]
+    title = data.get('title', '수학 모의고사')
+    include_answer_sheet = data.get('include_answer_sheet', True)
+    report = result['report']
+    forms = data.get('forms', 1)
+    form_files = None
+    if forms != 1:
+        try:
+            form_files = write_exam_forms_html(
+                EXAMS_FOLDER, questions, title, include_answer_sheet, int(forms), data.get('seed'),
+                f"{SERVER_URL}/exams"
+            )
+        except (TypeError, ValueError) as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        filename = form_files[0]['filename']
+    elif data.get('stream'):
+        return stream_exam_html(EXAMS_FOLDER, questions, title, include_answer_sheet, f"{SERVER_URL}/exams")
+    else:
+        filename = write_exam_html(EXAMS_FOLDER, questions, title, include_answer_sheet)
 
+    print(f"📝 교차 세션 문제지 생성: {len(questions)}문항, 제약 충족={report['satisfied']} ({report['elapsed_ms']}ms)")
     return jsonify({
         "success": True,
-        "exam_url": f"{SERVER_URL}/sessions/{session_id}/exams/{filename}",
-        "question_count": len(selected_questions)
+        "exam_url": f"{SERVER_URL}/exams/{filename}",
+        "question_count": len(questions),
+        "forms": form_files,
+        "items": [{
+            "session_id": item['session_id'],
+            "source_question": item['source_question'],
+            "json_filename": variant_store.json_name(item['stored_filename']),
+            "variant_id": item['variant'].get('variant_id'),
+            "difficulty": item['difficulty'],
+            "points": item['points'],
+            "key_concepts": item['key_concepts']
+        } for item in result['items']],
+        "report": report
     })
 
 
+@app.route('/exams/<filename>')
+def get_built_exam_file(filename):
+    """교차 세션 문제지 파일 제공"""
+    if os.path.exists(os.path.join(EXAMS_FOLDER, secure_filename(filename))):
+        return send_artifact(EXAMS_FOLDER, secure_filename(filename), mimetype='text/html')
+    return jsonify({"success": False, "message": "파일을 찾을 수 없습니다."}), 404
+
+
 @app.route('/sessions/<session_id>/exams/<filename>')
 def get_exam_file(session_id, filename):
     """문제지 파일 제공"""
@@ -1550,12 +2095,59 @@ def get_exam_file(session_id, filename):
     filepath = os.path.join(exams_folder, filename)
 
     if os.path.exists(filepath):
-        return send_file(filepath, mimetype='text/html')
+        return send_artifact(exams_folder, filename, mimetype='text/html')
     return jsonify({"success": False, "message": "파일을 찾을 수 없습니다."}), 404
 
 
 # ==================== 문항 분석 API ====================
 
+ANALYSIS_CACHE_FILENAME = '.cache.json'
+ANALYSIS_CACHE_MAX_ENTRIES = 200
+
+
+def get_cached_analysis(analysis_folder: str, cache_key: str):
+    """캐시 키에 해당하는 이전 분석 결과 (html/json 파일명, analysis).
+    파일이 지워졌거나 색인/항목 형식이 잘못되었으면 None (캐시 미스)
+    """
+    try:
+        index = read_json(os.path.join(analysis_folder, ANALYSIS_CACHE_FILENAME), {}) or {}
+    except (OSError, ValueError):
+        return None
+    entry = index.get(cache_key) if isinstance(index, dict) else None
+    if not isinstance(entry, dict):
+        return None
+    html_filename, json_filename = entry.get('html'), entry.get('json')
+    if not isinstance(html_filename, str) or not isinstance(json_filename, str):
+        return None
+    json_path = safe_join(analysis_folder, json_filename)
+    html_path = safe_join(analysis_folder, html_filename)
+    if not json_path or not html_path or not os.path.isfile(json_path) or not os.path.isfile(html_path):
+        return None
+    try:
+        analysis = (read_json(json_path, {}) or {}).get('analysis', {})
+    except (OSError, ValueError, AttributeError):
+        return None
+    return {'html': html_filename, 'json': json_filename, 'analysis': analysis}
+
+
+def store_cached_analysis(analysis_folder: str, cache_key: str, html_filename: str, json_filename: str):
+    """분석 결과 파일을 캐시 색인(analysis/.cache.json)에 등록합니다. 오래된 항목부터 정리."""
+    session_path = os.path.dirname(analysis_folder)
+    index_path = os.path.join(analysis_folder, ANALYSIS_CACHE_FILENAME)
+    with session_lock(session_path):
+        try:
+            index = read_json(index_path, {}) or {}
+        except (OSError, ValueError):
+            index = {}
+        if not isinstance(index, dict):
+            index = {}  # 손상된 색인은 새로 시작
+        index.pop(cache_key, None)
+        index[cache_key] = {'html': html_filename, 'json': json_filename, 'created_at': time.time()}
+        while len(index) > ANALYSIS_CACHE_MAX_ENTRIES:
+            index.pop(next(iter(index)))
+        atomic_write_json(index_path, index)
+
+
 @app.route('/sessions/<session_id>/analyze-question', methods=['POST'])
 def analyze_session_question(session_id):
     """문항 심층 분석 (SSE로 진행 상황 전송)"""
@@ -1564,7 +2156,7 @@ def analyze_session_question(session_id):
     if not api_key:
         return jsonify({"success": False, "message": "Gemini API 키가 필요합니다. 설정에서 API 키를 입력해주세요."}), 401
 
-    from analyze_question import analyze_question, generate_analysis_html
+    from analyze_question import analyze_question, generate_analysis_html, analysis_cache_key
 
     session_path = get_session_path(session_id)
     if not os.path.exists(session_path):
@@ -1578,59 +2170,48 @@ def analyze_session_question(session_id):
 
     task_id = str(uuid.uuid1())
     question_num = question_data.get('question_number', 'unknown')
+    # force: 캐시를 무시하고 다시 분석
+    force = bool(data.get('force')) or request.args.get('force') in ('1', 'true')
 
     # 분석 결과 폴더 생성
     analysis_folder = os.path.join(session_path, 'analysis')
     os.makedirs(analysis_folder, exist_ok=True)
+    cache_key = analysis_cache_key(question_data)
+    cached_entry = None if force else get_cached_analysis(analysis_folder, cache_key)
 
     def generate():
-        import queue
-        import threading
-
-        progress_queue = queue.Queue()
+        if cached_entry:
+            # 입력과 프롬프트가 같으면 이전 결과를 바로 반환 (Gemini 호출/파일 생성 없음)
+            analysis_url = f"{SERVER_URL}/sessions/{session_id}/analysis"
+            yield f"data: {json.dumps({'step': 'start', 'progress': 0, 'message': '이전 분석 결과 사용', 'task_id': task_id, 'cached': True})}\n\n"
+            result = {
+                'step': 'complete',
+                'progress': 100,
+                'message': '문항 분석 완료! (캐시)',
+                'html_url': f"{analysis_url}/{cached_entry['html']}",
+                'json_url': f"{analysis_url}/{cached_entry['json']}",
+                'analysis': cached_entry['analysis'],
+                'cached': True
+            }
+            yield f"data: {json.dumps(result)}\n\n"
+            return
 
-        def progress_callback(step, progress, message, details):
-            progress_queue.put({
-                'step': step,
-                'progress': progress,
-                'message': message,
-                **details
-            })
+        trace = tracing.Trace(f"POST /sessions/{session_id}/analyze-question")
 
         try:
             yield f"data: {json.dumps({'step': 'start', 'progress': 0, 'message': '문항 분석 시작...', 'task_id': task_id})}\n\n"
 
-            result_holder = {'data': None, 'error': None}
-
-            def run_analysis():
-                try:
-                    result_holder['data'] = analyze_question(
+            def run_analysis(stream):
+                with tracing.activate(trace), tracing.span('analyze_question'):
+                    return analyze_question(
                         question_data,
-                        progress_callback=progress_callback
+                        progress_callback=stream.progress_callback
                     )
-                except Exception as e:
-                    result_holder['error'] = e
-
-            thread = threading.Thread(target=run_analysis)
-            thread.start()
-
-            while thread.is_alive():
-                try:
-                    progress_data = progress_queue.get(timeout=0.5)
-                    yield f"data: {json.dumps(progress_data)}\n\n"
-                except queue.Empty:
-                    continue
-
-            while not progress_queue.empty():
-                progress_data = progress_queue.get_nowait()
-                yield f"data: {json.dumps(progress_data)}\n\n"
 
-            thread.join()
-
-            if result_holder['error']:
-                raise result_holder['error']
-
-            analysis_result = result_holder['data']
+            # 공용 작업 풀에서 실행하고 진행 이벤트가 올 때만 전송 (없으면 하트비트)
+            job = jobs.start_job(run_analysis)
+            yield from job.sse()
+            analysis_result = job.result()
 
             if not analysis_result.get('success'):
                 yield f"data: {json.dumps({'step': 'error', 'progress': 0, 'message': analysis_result.get('error', '분석 실패')})}\n\n"
@@ -1645,14 +2226,24 @@ def analyze_session_question(session_id):
             html_path = os.path.join(analysis_folder, html_filename)
             json_path = os.path.join(analysis_folder, json_filename)
 
-            html_content = generate_analysis_html(question_data, analysis_result)
-            with open(html_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(analysis_result, f, ensure_ascii=False, indent=2)
+            with trace.span('analysis.render_html'):
+                html_content = generate_analysis_html(question_data, analysis_result)
+            with trace.span('write.analysis'):
+                with open(html_path, 'w', encoding='utf-8') as f:
+                    f.write(html_content)
+
+                with open(json_path, 'w', encoding='utf-8') as f:
+                    json.dump(analysis_result, f, ensure_ascii=False, indent=2)
+                record_artifacts(html_path, json_path)
+                # 도형이 하나 이상 있고 실패/시간 초과한 갈래가 없는 결과만 캐시
+                # (일시적인 Gemini 오류로 빈 결과가 계속 반환되지 않도록)
+                analysis = analysis_result.get('analysis', {})
+                if ((analysis.get('step0_figure') or analysis.get('step0_figure_desc'))
+                        and not analysis.get('errors') and not analysis.get('timed_out')):
+                    store_cached_analysis(analysis_folder, cache_key, html_filename, json_filename)
 
             yield f"data: {json.dumps({'step': 'save', 'progress': 95, 'message': '파일 저장 완료'})}\n\n"
+            tracing.save_trace(trace, session_path)
 
             result = {
                 'step': 'complete',
@@ -1684,19 +2275,31 @@ def serve_analysis_file(session_id, filename):
 
     if not os.path.exists(analysis_folder):
         return jsonify({"success": False, "message": "분석 폴더를 찾을 수 없습니다."}), 404
+    if filename.startswith('.'):
+        # 캐시 색인(.cache.json), 매니페스트 등 내부 파일은 제공하지 않음
+        return jsonify({"success": False, "message": "파일을 찾을 수 없습니다."}), 404
 
-    return send_from_directory(analysis_folder, filename)
+    return send_artifact(analysis_folder, filename)
 
 
 @app.route('/sessions/<session_id>/analysis', methods=['GET'])
 def get_session_analysis_list(session_id):
-    """세션의 분석 결과 목록 조회"""
+    """세션의 분석 결과 목록 조회 (limit/cursor 페이지네이션, ETag 지원)"""
     session_path = get_session_path(session_id)
 
     if not os.path.exists(session_path):
         return jsonify({"success": False, "message": "세션을 찾을 수 없습니다."}), 404
 
     analysis_folder = os.path.join(session_path, 'analysis')
+    validator = http_cache.directory_validator(session_path, analysis_folder)
+    cached = http_cache.not_modified(validator)
+    if cached:
+        return cached
+    try:
+        limit, after = http_cache.get_page_args()
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
     analyses = []
 
     if os.path.exists(analysis_folder):
@@ -1719,9 +2322,16 @@ def get_session_analysis_list(session_id):
                     "html_url": f"{SERVER_URL}/sessions/{session_id}/analysis/{html_filename}"
                 })
 
-    analyses.sort(key=lambda x: (x['question_number'], -x['created']))
+    try:
+        analyses, next_cursor = http_cache.paginate(
+            analyses, lambda x: (x['question_number'], -x['created'], x['json_filename']), limit, after
+        )
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
 
-    return jsonify({"success": True, "analyses": analyses})
+    return http_cache.with_validator(
+        jsonify({"success": True, "analyses": analyses, "next_cursor": next_cursor}), validator
+    )
 
 
 # ============================================================
@@ -0,0 +1,327 @@
+# exam_builder.py
+"""여러 세션의 변형 문제로 제약 조건을 만족하는 문제지 구성
+
+제약 조건 (constraints):
+- difficulty: 난이도별 문항 수 또는 비율 (예: {"쉬움": 5, "보통": 10, "어려움": 5}, {"easy": 0.3, "hard": 0.7})
+- max_per_question: 같은 원본 문항(세션 + 문항 번호)에서 뽑을 최대 개수
+- concepts: 반드시 포함할 핵심 개념 (변형 세트 key_concepts와 부분 일치)
+- total_points: 목표 총점 (배점은 points_by_difficulty, 기본 2/3/4점)
+
+풀이 방식:
+1. 탐욕 선택 - 후보를 (원본 문항, 난이도, 충족 개념) 그룹으로 묶어서 그룹 단위로 평가
+   → 비용이 변형 개수가 아니라 그룹 수에 비례하므로 1만 개 이상 풀에서도 빠름
+2. 국소 탐색 - 문항 하나를 다른 그룹의 문항으로 바꿔서 위반 점수가 줄면 채택
+"""
+
+import random
+import time
+from collections import Counter
+
+DIFFICULTY_ALIASES = {'easy': '쉬움', 'medium': '보통', 'hard': '어려움'}
+DIFFICULTY_ORDER = {'쉬움': 0, '보통': 1, '중': 1, '어려움': 2}
+DEFAULT_POINTS = {'쉬움': 2, '보통': 3, '어려움': 4}
+FALLBACK_POINTS = 3
+
+# 위반 가중치 (원본 문항 중복 > 난이도 > 개념 > 총점)
+W_SOURCE = 100
+W_DIFFICULTY = 10
+W_CONCEPT = 5
+W_POINTS = 1
+
+# 국소 탐색 한도
+MAX_ITERATIONS = 5000
+MAX_STALL = 300
+TIME_LIMIT = 2.0
+SWAP_CANDIDATES = 32
+
+
+class _Group:
+    """서로 바꿔도 제약 평가가 같은 후보 묶음"""
+    __slots__ = ('source', 'difficulty', 'points', 'covers', 'members')
+
+    def __init__(self, source, difficulty, points, covers):
+        self.source = source
+        self.difficulty = difficulty
+        self.points = points
+        self.covers = covers
+        self.members = []  # [(session_id, pool, pos)]
+
+    def take(self, rng):
+        i = rng.randrange(len(self.members))
+        self.members[i], self.members[-1] = self.members[-1], self.members[i]
+        return self.members.pop()
+
+
+class _State:
+    """선택된 문항들의 집계 (추가/제거 O(1), 위반 점수 O(문항 수))"""
+
+    def __init__(self, targets, max_per, n_concepts, total_points):
+        self.targets = targets
+        self.max_per = max_per
+        self.n_concepts = n_concepts
+        self.total_points = total_points
+        self.difficulty = Counter()
+        self.source = Counter()
+        self.cover = Counter()
+        self.covered = 0
+        self.points = 0
+
+    def add(self, group):
+        self.difficulty[group.difficulty] += 1
+        self.source[group.source] += 1
+        self.points += group.points
+        for c in group.covers:
+            if self.cover[c] == 0:
+                self.covered += 1
+            self.cover[c] += 1
+
+    def remove(self, group):
+        self.difficulty[group.difficulty] -= 1
+        self.source[group.source] -= 1
+        self.points -= group.points
+        for c in group.covers:
+            self.cover[c] -= 1
+            if self.cover[c] == 0:
+                self.covered -= 1
+
+    def penalty(self) -> float:
+        score = 0
+        if self.max_per:
+            score += W_SOURCE * sum(n - self.max_per for n in self.source.values() if n > self.max_per)
+        if self.targets:
+            keys = set(self.targets) | {d for d, n in self.difficulty.items() if n}
+            score += W_DIFFICULTY * sum(abs(self.difficulty[d] - self.targets.get(d, 0)) for d in keys)
+        score += W_CONCEPT * (self.n_concepts - self.covered)
+        if self.total_points:
+            score += W_POINTS * abs(self.points - self.total_points)
+        return score
+
+
+def _normalize_difficulty(value) -> str:
+    return DIFFICULTY_ALIASES.get(value, value)
+
+
+def difficulty_targets(spec: dict, count: int):
+    """난이도 분포를 문항 수로 변환합니다. 합이 count가 아니면 비율로 보고 최대 잔여법으로 배분."""
+    if not spec:
+        return None
+    if not isinstance(spec, dict):
+        raise ValueError("difficulty는 {난이도: 문항 수 또는 비율} 형식이어야 합니다.")
+    weights = {}
+    for key, value in spec.items():
+        value = float(value)
+        if value < 0:
+            raise ValueError(f"난이도 비율은 음수일 수 없습니다: {key}")
+        weights[_normalize_difficulty(key)] = weights.get(_normalize_difficulty(key), 0) + value
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("난이도 분포의 합이 0입니다.")
+
+    raw = {d: w * count / total for d, w in weights.items()}
+    targets = {d: int(v) for d, v in raw.items()}
+    remainder = count - sum(targets.values())
+    for d in sorted(raw, key=lambda d: raw[d] - targets[d], reverse=True)[:remainder]:
+        targets[d] += 1
+    return targets
+
+
+def _build_groups(pools, points_map, concepts):
+    """풀의 후보를 그룹으로 묶습니다. 개념 충족 여부는 저장 파일당 한 번만 계산."""
+    needles = [c.strip().lower() for c in concepts]
+    groups = {}
+    for session_id, pool in pools:
+        covers_by_file = {}
+        for stored, set_concepts in pool.concepts.items():
+            haystack = [c.lower() for c in set_concepts]
+            covers_by_file[stored] = frozenset(
+                i for i, needle in enumerate(needles) if any(needle in c for c in haystack)
+            )
+        for pos, (stored, _index, difficulty, question_number) in enumerate(pool.items):
+            source = (session_id, question_number)
+            covers = covers_by_file.get(stored, frozenset())
+            key = (source, difficulty, covers)
+            group = groups.get(key)
+            if group is None:
+                points = points_map.get(difficulty, FALLBACK_POINTS)
+                group = groups[key] = _Group(source, difficulty, points, covers)
+            group.members.append((session_id, pool, pos))
+    return list(groups.values())
+
+
+def _greedy(groups, state, count, rng):
+    """빈 자리마다 위반 점수 증가가 가장 작은 그룹을 고릅니다."""
+    chosen = []
+    for slot in range(count):
+        remaining = count - slot
+        best, best_key = None, None
+        for g in groups:
+            if not g.members:
+                continue
+            score = 0
+            if state.max_per and state.source[g.source] >= state.max_per:
+                score += W_SOURCE
+            if state.targets:
+                score += -W_DIFFICULTY if state.difficulty[g.difficulty] < state.targets.get(g.difficulty, 0) else W_DIFFICULTY
+            score -= W_CONCEPT * sum(1 for c in g.covers if state.cover[c] == 0)
+            if state.total_points:
+                # 남은 자리에 고르게 배분했을 때의 목표 배점과의 차이
+                score += W_POINTS * abs(g.points - (state.total_points - state.points) / remaining)
+            key = (score, rng.random())
+            if best_key is None or key < best_key:
+                best, best_key = g, key
+        if best is None:
+            break
+        state.add(best)
+        chosen.append((best, best.take(rng)))
+    return chosen
+
+
+def _local_search(groups, chosen, state, rng, deadline):
+    """문항 하나를 다른 그룹 문항으로 교체해서 위반 점수가 줄면 채택합니다."""
+    by_concept = {}
+    for g in groups:
+        for c in g.covers:
+            by_concept.setdefault(c, []).append(g)
+
+    current = state.penalty()
+    iterations = stall = 0
+    while chosen and current > 0 and iterations < MAX_ITERATIONS and stall < MAX_STALL:
+        if time.monotonic() > deadline:
+            break
+        iterations += 1
+        stall += 1
+
+        candidates = rng.sample(groups, min(SWAP_CANDIDATES, len(groups)))
+        # 빠진 개념이 있으면 그 개념을 가진 그룹도 후보에 넣음
+        for c in range(state.n_concepts):
+            if state.cover[c] == 0 and c in by_concept:
+                candidates.append(rng.choice(by_concept[c]))
+
+        i = rng.randrange(len(chosen))
+        old_group, old_member = chosen[i]
+        state.remove(old_group)
+        best, best_penalty = None, current
+        for g in candidates:
+            if g is old_group or not g.members:
+                continue
+            state.add(g)
+            penalty = state.penalty()
+            state.remove(g)
+            if penalty < best_penalty:
+                best, best_penalty = g, penalty
+
+        if best is None:
+            state.add(old_group)
+            continue
+        old_group.members.append(old_member)
+        state.add(best)
+        chosen[i] = (best, best.take(rng))
+        current = best_penalty
+        stall = 0
+    return iterations
+
+
+def _report(state, chosen, count, concepts, pool_size, iterations, elapsed_ms):
+    difficulty_actual = {d: n for d, n in state.difficulty.items() if n}
+    overflow = [
+        {'session_id': s[0], 'question_number': s[1], 'count': n}
+        for s, n in state.source.items() if state.max_per and n > state.max_per
+    ]
+    covered = [concepts[c] for c in range(len(concepts)) if state.cover[c] > 0]
+    missing = [concepts[c] for c in range(len(concepts)) if state.cover[c] == 0]
+
+    report = {
+        'pool_size': pool_size,
+        'requested_count': count,
+        'selected_count': len(chosen),
+        'count_ok': len(chosen) == count,
+        'difficulty': {
+            'target': state.targets,
+            'actual': difficulty_actual,
+            'ok': not state.targets or all(
+                difficulty_actual.get(d, 0) == n for d, n in state.targets.items()
+            ) and sum(difficulty_actual.values()) == sum(state.targets.values()),
+        },
+        'max_per_question': {
+            'limit': state.max_per,
+            'max_actual': max((n for n in state.source.values()), default=0),
+            'violations': overflow,
+            'ok': not overflow,
+        },
+        'concepts': {'required': concepts, 'covered': covered, 'missing': missing, 'ok': not missing},
+        'points': {
+            'target': state.total_points,
+            'actual': state.points,
+            'ok': not state.total_points or state.points == state.total_points,
+        },
+        'penalty': state.penalty(),
+        'iterations': iterations,
+        'elapsed_ms': round(elapsed_ms, 1),
+    }
+    report['satisfied'] = all(
+        report[k]['ok'] for k in ('difficulty', 'max_per_question', 'concepts', 'points')
+    ) and report['count_ok']
+    return report
+
+
+def build_exam(pools, count: int, constraints: dict = None, seed=None, time_limit: float = TIME_LIMIT) -> dict:
+    """여러 세션의 변형 문제 풀에서 제약 조건을 최대한 만족하는 문항을 고릅니다.
+
+    Args:
+        pools: [(session_id, VariantPool)] 목록
+        count: 문항 수
+        constraints: difficulty, max_per_question, concepts, total_points, points_by_difficulty
+        seed: 난수 시드 (같은 시드면 같은 결과)
+        time_limit: 국소 탐색 시간 제한 (초)
+
+    Returns:
+        {"items": [...], "report": {...}} - items는 난이도 순으로 정렬
+    """
+    start = time.monotonic()
+    constraints = constraints or {}
+    if not isinstance(constraints, dict):
+        raise ValueError("constraints는 객체여야 합니다.")
+    if not isinstance(constraints.get('points_by_difficulty') or {}, dict):
+        raise ValueError("points_by_difficulty는 {난이도: 배점} 형식이어야 합니다.")
+    if not isinstance(constraints.get('concepts') or [], list):
+        raise ValueError("concepts는 목록이어야 합니다.")
+    rng = random.Random(seed)
+
+    requested = count = int(count)
+    if count <= 0:
+        raise ValueError("문항 수는 1 이상이어야 합니다.")
+    pool_size = sum(len(pool) for _, pool in pools)
+    if not pool_size:
+        raise ValueError("유효한 변형 문제가 없습니다.")
+    count = min(count, pool_size)
+
+    points_map = dict(DEFAULT_POINTS)
+    for key, value in (constraints.get('points_by_difficulty') or {}).items():
+        points_map[_normalize_difficulty(key)] = int(value)
+    concepts = [c for c in (constraints.get('concepts') or []) if isinstance(c, str) and c.strip()]
+    max_per = int(constraints.get('max_per_question') or 0)
+    total_points = int(constraints.get('total_points') or 0)
+
+    state = _State(difficulty_targets(constraints.get('difficulty'), count), max_per, len(concepts), total_points)
+    groups = _build_groups(pools, points_map, concepts)
+    chosen = _greedy(groups, state, count, rng)
+    iterations = _local_search(groups, chosen, state, rng, start + time_limit)
+
+    # 레코드는 풀의 파일 캐시를 거쳐 선택된 것만 읽음
+    chosen.sort(key=lambda gm: (DIFFICULTY_ORDER.get(gm[0].difficulty, 1), gm[0].points))
+    items = []
+    for group, (session_id, pool, pos) in chosen:
+        stored, index, difficulty, question_number = pool.items[pos]
+        items.append({
+            'session_id': session_id,
+            'source_question': question_number,
+            'stored_filename': stored,
+            'index': index,
+            'difficulty': difficulty,
+            'points': group.points,
+            'key_concepts': pool.concepts.get(stored, []),
+            'variant': pool.get_records([pos])[0],
+        })
+
+    report = _report(state, chosen, requested, concepts, pool_size, iterations, (time.monotonic() - start) * 1000)
+    return {'items': items, 'report': report}
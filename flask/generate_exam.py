@@ -7,11 +7,29 @@
 - 페이지 번호
 - 객관식 형식
 - 그래프는 Function Plot (JS) 사용
+- 조각 단위 렌더링 (iter_exam_html) → 파일/HTTP 응답에 바로 기록
+- 문항 조각 캐시 + A/B/C형 (문항/선택지 순서 섞기)
 """
 
+import os
 import re
 import json
+import hashlib
+import random
+import threading
+import uuid
+from collections import OrderedDict, namedtuple
 from datetime import datetime
+from functools import lru_cache
+
+from utils.figure_ir import figure_from_graph, to_function_plot
+
+# 문제지 파일 쓰기 버퍼 크기
+WRITE_BUFFER_SIZE = 64 * 1024
+
+_LONG_FLOAT_RE = re.compile(r'-?\d+\.\d{10,}')
+_MATH_SPLIT_RE = re.compile(r'(\$\$[\s\S]*?\$\$|\$[^$]+?\$)')
+_STEP_RE = re.compile(r'^\[(\d+단계)\]\s*(.*)$')
 
 
 def clean_float(text: str) -> str:
@@ -36,8 +54,7 @@ def clean_float(text: str) -> str:
             return num_str
 
     # 소수점 이하 10자리 이상인 숫자 패턴
-    pattern = r'-?\d+\.\d{10,}'
-    return re.sub(pattern, round_float, text)
+    return _LONG_FLOAT_RE.sub(round_float, text)
 
 
 def escape_html(text: str) -> str:
@@ -50,8 +67,9 @@ def escape_html(text: str) -> str:
     return text
 
 
+@lru_cache(maxsize=4096)
 def format_math_text(text: str) -> str:
-    """LaTeX 수식을 KaTeX 렌더링 가능한 형식으로 변환"""
+    """LaTeX 수식을 KaTeX 렌더링 가능한 형식으로 변환 (선택지 등 반복 문자열은 캐시)"""
     if not text:
         return ""
 
@@ -59,7 +77,7 @@ def format_math_text(text: str) -> str:
     text = clean_float(text)
 
     # HTML 이스케이프 (수식 외부만)
-    parts = re.split(r'(\$\$[\s\S]*?\$\$|\$[^$]+?\$)', text)
+    parts = _MATH_SPLIT_RE.split(text)
     result = []
     for part in parts:
         if part.startswith('$$') and part.endswith('$$'):
@@ -102,7 +120,7 @@ def format_explanation(text: str) -> str:
             continue
 
         # [1단계], [2단계] 등의 패턴 제거하고 내용만 추출
-        step_match = re.match(r'^\[(\d+단계)\]\s*(.*)$', line)
+        step_match = _STEP_RE.match(line)
         if step_match:
             # 이전 블록 저장
             if current_block:
@@ -157,6 +175,23 @@ def format_explanation(text: str) -> str:
     return ''.join(html_parts)
 
 
+def graph_payload(graph_info: dict) -> str:
+    """data-graph 속성에 넣을 JSON.
+    함수/영역 그래프는 Figure IR에서 샘플링한 Function Plot 설정(fp)을 함께 넣어
+    브라우저가 수식 문자열을 다시 해석하지 않게 함
+    """
+    payload = dict(graph_info)
+    try:
+        fp = to_function_plot(figure_from_graph(graph_info))
+    except Exception as e:
+        # numpy 없는 환경이나 샘플링 실패: 문제지 전체를 실패시키지 않고 브라우저에서 수식으로 그림
+        print(f"⚠️ Function Plot 데이터 생성 실패, 원본 graph_info 사용: {e}")
+        fp = None
+    if fp:
+        payload['fp'] = fp
+    return json.dumps(payload, ensure_ascii=False)
+
+
 def generate_graph_html(graph_info: dict, graph_id: str) -> str:
     """그래프 정보를 Function Plot으로 렌더링할 HTML 생성"""
     if not graph_info or graph_info.get('type') == 'none':
@@ -166,7 +201,7 @@ def generate_graph_html(graph_info: dict, graph_id: str) -> str:
     plot_data = graph_info.get('plot_data', {})
 
     # graph_info를 JSON으로 변환하여 JavaScript에서 사용
-    graph_json = json.dumps(graph_info, ensure_ascii=False)
+    graph_json = graph_payload(graph_info)
 
     return f'''
 <div class="graph-container">
@@ -175,167 +210,63 @@ def generate_graph_html(graph_info: dict, graph_id: str) -> str:
 '''
 
 
-def generate_exam_html(questions: list, title: str = "수학 모의고사", include_answer_sheet: bool = True) -> str:
-    """수능 스타일 문제지 HTML 생성"""
-
-    today = datetime.now().strftime('%Y년 %m월 %d일')
-
-    # 빈 문제 필터링 (question_text가 있는 문제만)
-    valid_questions = [q for q in questions if q.get('question_text', '').strip()]
-
-    # 문항별 HTML 생성
-    questions_html = ""
-    answers = []
-    graph_count = 0
-
-    for idx, q in enumerate(valid_questions, 1):
-        q_num = idx
-        q_text = format_math_text(q.get('question_text', ''))
-        choices = q.get('choices', [])
-        points = q.get('points', 3)
-
-        # 지문이 있는 경우
-        passage_html = ""
-        if q.get('has_passage') and q.get('passage'):
-            passage = format_math_text(q.get('passage'))
-            passage_html = f'''
-<div class="passage">
-{passage}
-</div>'''
-
-        # 선택지 생성 - 한 줄로 나란히
-        choices_html = ""
-        answer = q.get('answer', '')
-        explanation = q.get('explanation', '')
-        graph_info = q.get('graph_info', {})
-
-        if choices:
-            choices_html = '<div class="choices">'
-            for c in choices:
-                c_num = c.get('number', '')
-                c_text = format_math_text(c.get('text', ''))
-                choices_html += f'<span class="choice"><span class="choice-num">{c_num}</span>{c_text}</span>'
-            choices_html += '</div>'
-
-            # 정답과 해설 저장 (graph_info 포함)
-            answers.append((q_num, answer if answer else '-', explanation, graph_info))
-        else:
-            # 주관식
-            choices_html = '<div class="answer-blank"></div>'
-            answers.append((q_num, answer if answer else '-', explanation, graph_info))
-
-        # 그림/도표 설명
-        figure_html = ""
-        if q.get('has_figure') and q.get('figure_description'):
-            figure_html = f'''
-<div class="figure-box">
-[그림] {escape_html(q.get('figure_description'))}
-</div>'''
-
-        questions_html += f'''
-<div class="question">
-<div class="q-header">
-<span class="q-num">{q_num}</span>
-<span class="q-points">[{points}점]</span>
-</div>
-<div class="q-content">
-{passage_html}
-<div class="q-text">{q_text}</div>
-{figure_html}
-{choices_html}
-</div>
-<div class="work-space"></div>
-</div>
-'''
-
-    # 정답 및 해설 HTML
-    answer_sheet_html = ""
-    if include_answer_sheet and answers:
-        answer_items = ""
-        for q_num, ans, explanation, graph_info in answers:
-            # 단계별 해설 포맷팅
-            explanation_html = format_explanation(explanation) if explanation else ""
-
-            # 그래프 HTML 생성 (Function Plot 사용)
-            graph_html = ""
-            if graph_info and graph_info.get('type') != 'none':
-                graph_id = f"graph-{graph_count}"
-                graph_count += 1
-                graph_html = generate_graph_html(graph_info, graph_id)
-
-            answer_items += f'''
-<div class="answer-item">
-<div class="answer-header">
-<span class="answer-num">{q_num}번</span>
-<span class="answer-value">정답: {ans}</span>
-</div>
-{graph_html}
-<div class="explanation">{explanation_html}</div>
-</div>'''
-
-        answer_sheet_html = f'''
-<div class="page answer-sheet-page">
-<div class="answer-sheet">
-<h2>정답 및 해설</h2>
-<div class="answer-list">
-{answer_items}
-</div>
-</div>
-<div class="page-number"></div>
-</div>
-'''
+# ==================== 템플릿 ====================
+# 문서 골격과 문항/해설 조각은 모듈 로드 시 한 번만 만들어 두고,
+# 렌더링할 때는 조각 단위로 format만 해서 바로 내보냅니다.
 
-    html = f'''<!DOCTYPE html>
+_DOC_HEAD = '''<!DOCTYPE html>
 <html lang="ko">
 <head>
 <meta charset="UTF-8">
 <meta name="viewport" content="width=device-width, initial-scale=1.0">
-<title>{escape_html(title)}</title>
+<title>{title}</title>
 <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/katex@0.16.9/dist/katex.min.css">
 <script defer src="https://cdn.jsdelivr.net/npm/katex@0.16.9/dist/katex.min.js"></script>
 <script defer src="https://cdn.jsdelivr.net/npm/katex@0.16.9/dist/contrib/auto-render.min.js"></script>
 <script src="https://cdn.jsdelivr.net/npm/d3@7"></script>
 <script src="https://cdn.jsdelivr.net/npm/function-plot@1/dist/function-plot.min.js"></script>
-<style>
+'''
+
+_DOC_STYLE = '''<style>
 /* 인쇄 설정 - A3 */
-@media print {{
-    @page {{
+@media print {
+    @page {
         size: A3 portrait;
         margin: 10mm;
-    }}
-    body {{
+    }
+    body {
         -webkit-print-color-adjust: exact;
         print-color-adjust: exact;
-    }}
-    .no-print {{
+    }
+    .no-print {
         display: none !important;
-    }}
-    .page {{
+    }
+    .page {
         page-break-after: always;
         box-shadow: none !important;
         margin: 0 !important;
-    }}
-    .page:last-child {{
+    }
+    .page:last-child {
         page-break-after: avoid;
-    }}
-}}
+    }
+}
 
-* {{
+* {
     box-sizing: border-box;
     margin: 0;
     padding: 0;
-}}
+}
 
-body {{
+body {
     font-family: 'Noto Sans KR', 'Malgun Gothic', sans-serif;
     font-size: 11pt;
     line-height: 1.6;
     color: #000;
     background: #e0e0e0;
-}}
+}
 
 /* A3 페이지 스타일 (297mm x 420mm) */
-.page {{
+.page {
     width: 297mm;
     min-height: 420mm;
     margin: 10mm auto;
@@ -343,74 +274,74 @@ body {{
     background: #fff;
     box-shadow: 0 2px 10px rgba(0,0,0,0.2);
     position: relative;
-}}
+}
 
 /* 인쇄 스타일 */
-@media print {{
-    @page {{
+@media print {
+    @page {
         size: A3 portrait;
         margin: 15mm 20mm;
-    }}
+    }
 
-    body {{
+    body {
         background: #fff;
-    }}
+    }
 
-    .page {{
+    .page {
         width: 100%;
         min-height: auto;
         margin: 0;
         padding: 0;
         box-shadow: none;
         page-break-after: always;
-    }}
+    }
 
-    .page:last-child {{
+    .page:last-child {
         page-break-after: auto;
-    }}
+    }
 
-    .print-btn {{
+    .print-btn {
         display: none !important;
-    }}
+    }
 
-    .two-column {{
+    .two-column {
         column-count: 2;
         column-gap: 25px;
         column-fill: auto;
-    }}
+    }
 
-    .question {{
+    .question {
         break-inside: avoid;
         page-break-inside: avoid;
-    }}
+    }
 
-    .answer-sheet-page {{
+    .answer-sheet-page {
         page-break-before: always;
-    }}
-}}
+    }
+}
 
 /* 헤더 */
-.exam-header {{
+.exam-header {
     text-align: center;
     border-bottom: 3px double #000;
     padding-bottom: 12px;
     margin-bottom: 20px;
-}}
+}
 
-.exam-title {{
+.exam-title {
     font-size: 28pt;
     font-weight: bold;
     letter-spacing: 3px;
     margin-bottom: 8px;
-}}
+}
 
-.exam-info {{
+.exam-info {
     font-size: 11pt;
     color: #333;
-}}
+}
 
 /* 2단 레이아웃 */
-.two-column {{
+.two-column {
     -webkit-column-count: 2;
     -moz-column-count: 2;
     column-count: 2;
@@ -418,56 +349,56 @@ body {{
     -moz-column-gap: 25px;
     column-gap: 25px;
     column-rule: 1px solid #ccc;
-}}
+}
 
 /* 문항 스타일 */
-.question {{
+.question {
     -webkit-column-break-inside: avoid;
     break-inside: avoid;
     page-break-inside: avoid;
     margin-bottom: 10px;
     padding-bottom: 10px;
     border-bottom: 1px dotted #aaa;
-}}
+}
 
-.q-header {{
+.q-header {
     display: flex;
     align-items: center;
     margin-bottom: 8px;
-}}
+}
 
-.q-num {{
+.q-num {
     font-weight: bold;
     font-size: 14pt;
     margin-right: 8px;
-}}
+}
 
-.q-points {{
+.q-points {
     font-size: 9pt;
     color: #555;
-}}
+}
 
-.q-content {{
+.q-content {
     padding-left: 36px;
-}}
+}
 
-.q-text {{
+.q-text {
     margin-bottom: 10px;
     text-align: justify;
     word-break: keep-all;
-}}
+}
 
 /* 지문 박스 */
-.passage {{
+.passage {
     background: #f5f5f5;
     border-left: 3px solid #666;
     padding: 10px 12px;
     margin-bottom: 10px;
     font-size: 10pt;
-}}
+}
 
 /* 그림 박스 */
-.figure-box {{
+.figure-box {
     border: 1px solid #999;
     padding: 12px;
     margin: 10px 0;
@@ -475,39 +406,39 @@ body {{
     background: #fafafa;
     color: #666;
     font-size: 9pt;
-}}
+}
 
 /* 선택지 - 한 줄로 나란히 */
-.choices {{
+.choices {
     display: flex;
     flex-wrap: wrap;
     gap: 8px 20px;
     margin-top: 10px;
     align-items: baseline;
-}}
+}
 
-.choice {{
+.choice {
     display: inline-flex;
     align-items: baseline;
     font-size: 10.5pt;
     white-space: nowrap;
-}}
+}
 
-.choice-num {{
+.choice-num {
     font-weight: bold;
     margin-right: 4px;
-}}
+}
 
 /* 주관식 답란 */
-.answer-blank {{
+.answer-blank {
     border: 1px solid #000;
     height: 35px;
     margin-top: 10px;
     background: #fafafa;
-}}
+}
 
 /* 필기 여백 - 컬럼 너비에 꽉 차게 */
-.work-space {{
+.work-space {
     width: 100%;
     height: 240px;
     margin-top: 12px;
@@ -519,10 +450,10 @@ body {{
         #f0f0f0 24px
     );
     border-radius: 4px;
-}}
+}
 
 /* 페이지 번호 */
-.page-number {{
+.page-number {
     position: absolute;
     bottom: 12mm;
     left: 0;
@@ -530,27 +461,27 @@ body {{
     text-align: center;
     font-size: 11pt;
     color: #666;
-}}
+}
 
 /* 정답 및 해설 페이지 */
-.answer-sheet-page {{
+.answer-sheet-page {
     display: block;
     padding-top: 15mm;
-}}
+}
 
-.answer-sheet {{
+.answer-sheet {
     width: 100%;
-}}
+}
 
-.answer-sheet h2 {{
+.answer-sheet h2 {
     text-align: center;
     font-size: 20pt;
     margin-bottom: 25px;
     padding-bottom: 12px;
     border-bottom: 2px solid #000;
-}}
+}
 
-.answer-list {{
+.answer-list {
     -webkit-column-count: 2;
     -moz-column-count: 2;
     column-count: 2;
@@ -558,92 +489,92 @@ body {{
     -moz-column-gap: 25px;
     column-gap: 25px;
     column-rule: 1px solid #ccc;
-}}
+}
 
-.answer-item {{
+.answer-item {
     -webkit-column-break-inside: avoid;
     break-inside: avoid;
     page-break-inside: avoid;
     margin-bottom: 15px;
     padding-bottom: 12px;
     border-bottom: 1px dotted #aaa;
-}}
+}
 
-.answer-header {{
+.answer-header {
     display: flex;
     align-items: center;
     gap: 12px;
     margin-bottom: 8px;
-}}
+}
 
-.answer-num {{
+.answer-num {
     font-weight: bold;
     font-size: 12pt;
     color: #333;
-}}
+}
 
-.answer-value {{
+.answer-value {
     font-weight: bold;
     font-size: 12pt;
     color: #000;
     background: #f0f0f0;
     padding: 2px 10px;
     border-radius: 4px;
-}}
+}
 
-.explanation {{
+.explanation {
     font-size: 10pt;
     line-height: 1.7;
     color: #333;
     padding-left: 5px;
     word-break: keep-all;
-}}
+}
 
 /* 해설 스타일 */
-.exp-title {{
+.exp-title {
     font-weight: bold;
     font-size: 11pt;
     margin-bottom: 10px;
     color: #000;
-}}
+}
 
-.exp-block {{
+.exp-block {
     margin-bottom: 10px;
     padding-left: 8px;
     border-left: 2px solid #ddd;
     font-size: 10pt;
     line-height: 1.8;
     color: #333;
-}}
+}
 
 /* 그래프 스타일 */
-.graph-container {{
+.graph-container {
     text-align: center;
     margin: 10px 0;
     padding: 8px;
     background: #fafafa;
     border: 1px solid #ddd;
     border-radius: 4px;
-}}
+}
 
-.graph-plot {{
+.graph-plot {
     width: 100%;
     max-width: 350px;
     height: 250px;
     margin: 0 auto;
-}}
+}
 
-.graph-error {{
+.graph-error {
     color: #666;
     font-size: 9pt;
     font-style: italic;
     padding: 10px;
     background: #f5f5f5;
     border-radius: 4px;
-}}
+}
 
 /* 인쇄 버튼 */
-.print-btn {{
+.print-btn {
     position: fixed;
     top: 20px;
     right: 20px;
@@ -655,86 +586,155 @@ body {{
     font-size: 15px;
     cursor: pointer;
     z-index: 1000;
-}}
+}
 
-.print-btn:hover {{
+.print-btn:hover {
     background: #555;
-}}
+}
 
 /* KaTeX 스타일 조정 */
-.katex {{
+.katex {
     font-size: 1.05em;
-}}
+}
 </style>
 </head>
-<body>
+'''
+
+_DOC_BODY_TOP = '''<body>
 <button class="print-btn no-print" onclick="window.print()">인쇄하기</button>
 
 <div class="page">
 <header class="exam-header">
-<h1 class="exam-title">{escape_html(title)}</h1>
-<div class="exam-info">{today} | 문항 수: {len(valid_questions)}개</div>
+<h1 class="exam-title">{title}</h1>
+<div class="exam-info">{today} | 문항 수: {count}개</div>
 </header>
 
 <main class="two-column" id="questions-container">
-{questions_html}
+'''
+
+_PASSAGE_TEMPLATE = '''
+<div class="passage">
+{passage}
+</div>'''
+
+_FIGURE_TEMPLATE = '''
+<div class="figure-box">
+[그림] {description}
+</div>'''
+
+_CHOICE_TEMPLATE = '<span class="choice"><span class="choice-num">{num}</span>{text}</span>'
+
+_QUESTION_TEMPLATE = '''
+<div class="question">
+<div class="q-header">
+<span class="q-num">{num}</span>
+<span class="q-points">[{points}점]</span>
+</div>
+<div class="q-content">
+{passage}
+<div class="q-text">{text}</div>
+{figure}
+{choices}
+</div>
+<div class="work-space"></div>
+</div>
+'''
+
+_QUESTIONS_END = '''
 </main>
 
 <div class="page-number">- 1 -</div>
 </div>
 
-{answer_sheet_html}
+'''
+
+_ANSWER_SHEET_START = '''
+<div class="page answer-sheet-page">
+<div class="answer-sheet">
+<h2>정답 및 해설</h2>
+<div class="answer-list">
+'''
+
+_ANSWER_TEMPLATE = '''
+<div class="answer-item">
+<div class="answer-header">
+<span class="answer-num">{num}번</span>
+<span class="answer-value">정답: {answer}</span>
+</div>
+{graph}
+<div class="explanation">{explanation}</div>
+</div>'''
+
+_ANSWER_SHEET_END = '''
+</div>
+</div>
+<div class="page-number"></div>
+</div>
+'''
+
+_DOC_TAIL = '''
 
 <script>
-document.addEventListener("DOMContentLoaded", function() {{
+document.addEventListener("DOMContentLoaded", function() {
     // KaTeX 렌더링
-    renderMathInElement(document.body, {{
+    renderMathInElement(document.body, {
         delimiters: [
-            {{left: "$$", right: "$$", display: true}},
-            {{left: "$", right: "$", display: false}}
+            {left: "$$", right: "$$", display: true},
+            {left: "$", right: "$", display: false}
         ],
         throwOnError: false
-    }});
+    });
 
     // Function Plot으로 그래프 렌더링
-    document.querySelectorAll('.graph-plot').forEach(function(el) {{
-        try {{
+    document.querySelectorAll('.graph-plot').forEach(function(el) {
+        try {
             const graphData = JSON.parse(el.dataset.graph);
             renderGraph(el.id, graphData);
-        }} catch (e) {{
+        } catch (e) {
             el.innerHTML = '<div class="graph-error">[그래프 렌더링 오류]</div>';
-        }}
-    }});
-}});
+        }
+    });
+});
 
-function renderGraph(elementId, graphInfo) {{
-    const plotData = graphInfo.plot_data || {{}};
+function renderGraph(elementId, graphInfo) {
+    const plotData = graphInfo.plot_data || {};
     const graphType = graphInfo.type || '';
     const target = '#' + elementId;
 
-    try {{
-        if (graphType === 'function') {{
+    try {
+        if (graphInfo.fp) {
+            // 서버에서 Figure IR로 샘플링한 곡선 (함수/영역 그래프)
+            functionPlot({
+                target: target,
+                width: 350,
+                height: 250,
+                xAxis: graphInfo.fp.xAxis,
+                yAxis: graphInfo.fp.yAxis,
+                grid: true,
+                data: graphInfo.fp.data
+            });
+        } else if (graphType === 'function') {
             // 함수 그래프
             const xRange = plotData.x_range || [-5, 5];
             const functions = plotData.functions || [];
 
-            const data = functions.map(f => ({{
+            const data = functions.map(f => ({
                 fn: f.expression.replace(/np\./g, 'Math.').replace(/\*\*/g, '^'),
                 color: f.color || 'black'
-            }}));
+            }));
 
-            if (data.length > 0) {{
-                functionPlot({{
+            if (data.length > 0) {
+                functionPlot({
                     target: target,
                     width: 350,
                     height: 250,
-                    xAxis: {{ domain: xRange }},
-                    yAxis: {{ domain: [-10, 10] }},
+                    xAxis: { domain: xRange },
+                    yAxis: { domain: [-10, 10] },
                     grid: true,
                     data: data
-                }});
-            }}
-        }} else if (graphType === 'coordinate') {{
+                });
+            }
+        } else if (graphType === 'coordinate') {
             // 좌표평면에 점/선
             const points = plotData.points || [];
             const lines = plotData.lines || [];
@@ -742,74 +742,74 @@ function renderGraph(elementId, graphInfo) {{
             const data = [];
 
             // 선 추가
-            lines.forEach(line => {{
-                if (line.x && line.y && line.x.length >= 2) {{
-                    data.push({{
+            lines.forEach(line => {
+                if (line.x && line.y && line.x.length >= 2) {
+                    data.push({
                         points: line.x.map((x, i) => [x, line.y[i]]),
                         fnType: 'points',
                         graphType: 'polyline',
                         color: 'black'
-                    }});
-                }}
-            }});
+                    });
+                }
+            });
 
             // 점 추가
-            points.forEach(pt => {{
-                data.push({{
+            points.forEach(pt => {
+                data.push({
                     points: [[pt.x, pt.y]],
                     fnType: 'points',
                     graphType: 'scatter',
                     color: 'black'
-                }});
-            }});
+                });
+            });
 
-            if (data.length > 0) {{
-                functionPlot({{
+            if (data.length > 0) {
+                functionPlot({
                     target: target,
                     width: 350,
                     height: 250,
-                    xAxis: {{ domain: [-5, 5] }},
-                    yAxis: {{ domain: [-5, 5] }},
+                    xAxis: { domain: [-5, 5] },
+                    yAxis: { domain: [-5, 5] },
                     grid: true,
                     data: data
-                }});
-            }}
-        }} else if (graphType === 'geometry') {{
+                });
+            }
+        } else if (graphType === 'geometry') {
             // 도형 - SVG로 직접 그리기
             const shapes = plotData.shapes || [];
             let svgContent = '<svg viewBox="-5 -5 10 10" style="width:100%;height:100%;background:#fff">';
             svgContent += '<line x1="-5" y1="0" x2="5" y2="0" stroke="#ccc" stroke-width="0.05"/>';
             svgContent += '<line x1="0" y1="-5" x2="0" y2="5" stroke="#ccc" stroke-width="0.05"/>';
 
-            shapes.forEach(shape => {{
-                if (shape.type === 'circle') {{
-                    svgContent += `<circle cx="${{shape.cx||0}}" cy="${{-(shape.cy||0)}}" r="${{shape.r||1}}" fill="none" stroke="black" stroke-width="0.05"/>`;
-                }} else if (shape.type === 'polygon') {{
-                    const pts = (shape.vertices || []).map(v => `${{v[0]}},${{-v[1]}}`).join(' ');
-                    svgContent += `<polygon points="${{pts}}" fill="none" stroke="black" stroke-width="0.05"/>`;
-                }} else if (shape.type === 'line') {{
-                    svgContent += `<line x1="${{shape.x1||0}}" y1="${{-(shape.y1||0)}}" x2="${{shape.x2||1}}" y2="${{-(shape.y2||1)}}" stroke="black" stroke-width="0.05"/>`;
-                }}
-            }});
+            shapes.forEach(shape => {
+                if (shape.type === 'circle') {
+                    svgContent += `<circle cx="${shape.cx||0}" cy="${-(shape.cy||0)}" r="${shape.r||1}" fill="none" stroke="black" stroke-width="0.05"/>`;
+                } else if (shape.type === 'polygon') {
+                    const pts = (shape.vertices || []).map(v => `${v[0]},${-v[1]}`).join(' ');
+                    svgContent += `<polygon points="${pts}" fill="none" stroke="black" stroke-width="0.05"/>`;
+                } else if (shape.type === 'line') {
+                    svgContent += `<line x1="${shape.x1||0}" y1="${-(shape.y1||0)}" x2="${shape.x2||1}" y2="${-(shape.y2||1)}" stroke="black" stroke-width="0.05"/>`;
+                }
+            });
 
             svgContent += '</svg>';
             document.getElementById(elementId).innerHTML = svgContent;
-        }} else if (graphType === 'number_line') {{
+        } else if (graphType === 'number_line') {
             // 수직선 - SVG
             const points = plotData.points || [];
             let svgContent = '<svg viewBox="-6 -1 12 2" style="width:100%;height:60px;background:#fff">';
             svgContent += '<line x1="-5" y1="0" x2="5" y2="0" stroke="black" stroke-width="0.05"/>';
 
-            points.forEach(pt => {{
-                svgContent += `<circle cx="${{pt.x}}" cy="0" r="0.15" fill="black"/>`;
-                if (pt.label) {{
-                    svgContent += `<text x="${{pt.x}}" y="0.6" font-size="0.4" text-anchor="middle">${{pt.label}}</text>`;
-                }}
-            }});
+            points.forEach(pt => {
+                svgContent += `<circle cx="${pt.x}" cy="0" r="0.15" fill="black"/>`;
+                if (pt.label) {
+                    svgContent += `<text x="${pt.x}" y="0.6" font-size="0.4" text-anchor="middle">${pt.label}</text>`;
+                }
+            });
 
             svgContent += '</svg>';
             document.getElementById(elementId).innerHTML = svgContent;
-        }} else if (graphType === 'venn' || graphType === 'venn_diagram') {{
+        } else if (graphType === 'venn' || graphType === 'venn_diagram') {
             // 벤다이어그램 - SVG
             const sets = plotData.sets || [];
             const values = plotData.values || [];
@@ -820,34 +820,352 @@ function renderGraph(elementId, graphInfo) {{
 
             // 집합 원
             const colors = ['rgba(52,152,219,0.3)', 'rgba(231,76,60,0.3)', 'rgba(46,204,113,0.3)'];
-            sets.forEach((s, i) => {{
+            sets.forEach((s, i) => {
                 const cx = s.cx !== undefined ? s.cx : (-0.7 + i * 1.4);
                 const cy = s.cy !== undefined ? s.cy : 0;
                 const r = s.r || 1.2;
-                svgContent += `<circle cx="${{cx}}" cy="${{-cy}}" r="${{r}}" fill="${{colors[i % 3]}}" stroke="black" stroke-width="0.03"/>`;
-                if (s.label) {{
-                    svgContent += `<text x="${{cx}}" y="${{-(cy + r + 0.3)}}" font-size="0.4" text-anchor="middle" font-weight="bold">${{s.label}}</text>`;
-                }}
-            }});
+                svgContent += `<circle cx="${cx}" cy="${-cy}" r="${r}" fill="${colors[i % 3]}" stroke="black" stroke-width="0.03"/>`;
+                if (s.label) {
+                    svgContent += `<text x="${cx}" y="${-(cy + r + 0.3)}" font-size="0.4" text-anchor="middle" font-weight="bold">${s.label}</text>`;
+                }
+            });
 
             // 값 표시
-            values.forEach(v => {{
-                svgContent += `<text x="${{v.x}}" y="${{-v.y}}" font-size="0.35" text-anchor="middle" font-weight="bold">${{v.value}}</text>`;
-            }});
+            values.forEach(v => {
+                svgContent += `<text x="${v.x}" y="${-v.y}" font-size="0.35" text-anchor="middle" font-weight="bold">${v.value}</text>`;
+            });
 
             svgContent += '</svg>';
             document.getElementById(elementId).innerHTML = svgContent;
-        }} else {{
+        } else {
             document.getElementById(elementId).innerHTML = '<div class="graph-error">[지원하지 않는 그래프 유형]</div>';
-        }}
-    }} catch (e) {{
+        }
+    } catch (e) {
         console.error('Graph render error:', e);
         document.getElementById(elementId).innerHTML = '<div class="graph-error">[그래프 렌더링 오류]</div>';
-    }}
-}}
+    }
+}
 </script>
 </body>
 </html>
 '''
 
-    return html
+
+# ==================== 조각 캐시 / 복수 유형 ====================
+# 문항 내용(해시)이 같으면 수식/해설/그래프 변환 결과를 재사용하고,
+# 유형(A/B/C형)마다 문항 번호와 선택지 순서만 새로 조립합니다.
+
+FRAGMENT_CACHE_SIZE = 2048
+FORM_LABELS = 'ABCDE'
+CIRCLED_NUMBERS = '①②③④⑤⑥⑦⑧⑨⑩'
+
+_FRAGMENT_FIELDS = (
+    'question_text', 'has_passage', 'passage', 'choices', 'has_figure', 'figure_description',
+    'answer', 'explanation', 'graph_info', 'points'
+)
+
+_GRAPH_TEMPLATE = '''
+<div class="graph-container">
+    <div id="{graph_id}" class="graph-plot" data-graph='{graph_json}'></div>
+</div>
+'''
+
+PreparedQuestion = namedtuple('PreparedQuestion', [
+    'key', 'passage', 'text', 'figure', 'choice_labels', 'choice_texts',
+    'answer', 'explanation', 'graph_json', 'points'
+])
+
+_fragment_cache = OrderedDict()
+_fragment_lock = threading.Lock()
+_fragment_stats = {'hits': 0, 'misses': 0}
+
+
+def _content_key(q: dict) -> str:
+    payload = json.dumps({k: q.get(k) for k in _FRAGMENT_FIELDS}, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def prepare_question(q: dict) -> PreparedQuestion:
+    """문항의 번호/선택지 순서와 무관한 조각을 만듭니다. (내용 해시로 캐시)"""
+    key = _content_key(q)
+    with _fragment_lock:
+        prepared = _fragment_cache.get(key)
+        if prepared is not None:
+            _fragment_cache.move_to_end(key)
+            _fragment_stats['hits'] += 1
+            return prepared
+        _fragment_stats['misses'] += 1
+
+    passage_html = ""
+    if q.get('has_passage') and q.get('passage'):
+        passage_html = _PASSAGE_TEMPLATE.format(passage=format_math_text(q.get('passage')))
+
+    figure_html = ""
+    if q.get('has_figure') and q.get('figure_description'):
+        figure_html = _FIGURE_TEMPLATE.format(description=escape_html(q.get('figure_description')))
+
+    graph_info = q.get('graph_info', {})
+    graph_json = None
+    if graph_info and graph_info.get('type') != 'none':
+        graph_json = graph_payload(graph_info)
+
+    choices = q.get('choices', [])
+    answer = q.get('answer', '')
+    explanation = q.get('explanation', '')
+    prepared = PreparedQuestion(
+        key=key,
+        passage=passage_html,
+        text=format_math_text(q.get('question_text', '')),
+        figure=figure_html,
+        choice_labels=tuple(c.get('number', '') for c in choices),
+        choice_texts=tuple(format_math_text(c.get('text', '')) for c in choices),
+        answer=answer if answer else '-',
+        explanation=format_explanation(explanation) if explanation else "",
+        graph_json=graph_json,
+        points=q.get('points', 3)
+    )
+    with _fragment_lock:
+        _fragment_cache[key] = prepared
+        while len(_fragment_cache) > FRAGMENT_CACHE_SIZE:
+            _fragment_cache.popitem(last=False)
+    return prepared
+
+
+def fragment_cache_stats() -> dict:
+    with _fragment_lock:
+        return dict(_fragment_stats, size=len(_fragment_cache))
+
+
+def _answer_index(labels: tuple, answer: str):
+    """정답이 몇 번째 선택지인지 (①/1 형식 모두), 알 수 없으면 None"""
+    answer = str(answer).strip()
+    if answer in labels:
+        return labels.index(answer)
+    if answer.isdigit() and 1 <= int(answer) <= len(CIRCLED_NUMBERS):
+        circled = CIRCLED_NUMBERS[int(answer) - 1]
+        if circled in labels:
+            return labels.index(circled)
+    return None
+
+
+class FormItem:
+    """유형 하나에 배치된 문항 (선택지 순서와 바뀐 정답 번호)"""
+    __slots__ = ('prepared', 'order', 'answer', 'relabel')
+
+    def __init__(self, prepared: PreparedQuestion, order=None):
+        self.prepared = prepared
+        self.order = order
+        self.answer = prepared.answer
+        self.relabel = None
+        if order is not None:
+            labels = prepared.choice_labels
+            new_pos = {orig: pos for pos, orig in enumerate(order)}
+            self.answer = labels[new_pos[_answer_index(labels, prepared.answer)]]
+            # 해설에 나오는 ①~⑤도 바뀐 번호로 치환
+            self.relabel = str.maketrans({
+                labels[i]: labels[new_pos[i]] for i in range(len(labels))
+                if len(labels[i]) == 1 and labels[i] in CIRCLED_NUMBERS
+            })
+
+
+def _shuffled_order(prepared: PreparedQuestion, rng):
+    """선택지를 섞을 수 있으면 새 순서, 정답 번호를 알 수 없으면 None (원래 순서 유지)"""
+    labels = prepared.choice_labels
+    if len(labels) < 2 or len(set(labels)) != len(labels) or _answer_index(labels, prepared.answer) is None:
+        return None
+    order = list(range(len(labels)))
+    rng.shuffle(order)
+    return order
+
+
+def build_forms(questions: list, forms: int = 1, seed=None) -> list:
+    """A/B/C... 유형별 문항 배치를 만듭니다.
+
+    A형은 원래 순서 그대로, 나머지는 같은 배점끼리 문항 순서를 섞고 선택지 순서도 섞습니다.
+    (배점 순으로 나열된 난이도 흐름은 유지)
+
+    Returns:
+        [(유형 라벨, [FormItem, ...]), ...]
+    """
+    if not 1 <= forms <= len(FORM_LABELS):
+        raise ValueError(f"유형 수는 1~{len(FORM_LABELS)} 사이여야 합니다.")
+    valid_questions = [q for q in questions if q.get('question_text', '').strip()]
+    prepared = [prepare_question(q) for q in valid_questions]
+
+    result = [(FORM_LABELS[0], [FormItem(p) for p in prepared])]
+    if seed is None:
+        # 시드가 없으면 호출마다 새 기준 시드 (유형별 배치가 매번 같지 않도록)
+        seed = random.SystemRandom().getrandbits(64)
+    for form_idx in range(1, forms):
+        rng = random.Random(f"{seed}:{form_idx}")
+        # 연속된 같은 배점 구간 안에서만 순서 섞기
+        blocks, start = [], 0
+        for i in range(1, len(prepared) + 1):
+            if i == len(prepared) or prepared[i].points != prepared[start].points:
+                block = prepared[start:i]
+                rng.shuffle(block)
+                blocks.extend(block)
+                start = i
+        result.append((FORM_LABELS[form_idx], [FormItem(p, _shuffled_order(p, rng)) for p in blocks]))
+    return result
+
+
+def render_question(q_num: int, item: FormItem) -> str:
+    """문항 하나의 HTML 조각 (번호와 선택지 순서만 조립)"""
+    p = item.prepared
+    if p.choice_labels:
+        order = item.order if item.order is not None else range(len(p.choice_labels))
+        choices_html = '<div class="choices">' + ''.join(
+            _CHOICE_TEMPLATE.format(num=p.choice_labels[pos], text=p.choice_texts[orig])
+            for pos, orig in enumerate(order)
+        ) + '</div>'
+    else:
+        choices_html = '<div class="answer-blank"></div>'
+
+    return _QUESTION_TEMPLATE.format(
+        num=q_num,
+        points=p.points,
+        passage=p.passage,
+        text=p.text,
+        figure=p.figure,
+        choices=choices_html
+    )
+
+
+def render_answer(q_num: int, item: FormItem, graph_id: str = None) -> str:
+    """정답/해설 하나의 HTML 조각 (graph_id가 있으면 Function Plot 그래프 포함)"""
+    p = item.prepared
+    graph_html = _GRAPH_TEMPLATE.format(graph_id=graph_id, graph_json=p.graph_json) if graph_id else ""
+    explanation = p.explanation.translate(item.relabel) if item.relabel else p.explanation
+    return _ANSWER_TEMPLATE.format(num=q_num, answer=item.answer, graph=graph_html, explanation=explanation)
+
+
+def iter_form_html(items: list, title: str = "수학 모의고사", include_answer_sheet: bool = True):
+    """유형 하나의 문제지 HTML을 조각 단위로 생성"""
+    today = datetime.now().strftime('%Y년 %m월 %d일')
+    safe_title = escape_html(title)
+
+    yield _DOC_HEAD.format(title=safe_title)
+    yield _DOC_STYLE
+    yield _DOC_BODY_TOP.format(title=safe_title, today=today, count=len(items))
+
+    for idx, item in enumerate(items, 1):
+        yield render_question(idx, item)
+    yield _QUESTIONS_END
+
+    # 정답 및 해설
+    if include_answer_sheet and items:
+        yield _ANSWER_SHEET_START
+        graph_count = 0
+        for idx, item in enumerate(items, 1):
+            graph_id = None
+            if item.prepared.graph_json is not None:
+                graph_id = f"graph-{graph_count}"
+                graph_count += 1
+            yield render_answer(idx, item, graph_id)
+        yield _ANSWER_SHEET_END
+
+    yield _DOC_TAIL
+
+
+def iter_exam_html(questions: list, title: str = "수학 모의고사", include_answer_sheet: bool = True):
+    """수능 스타일 문제지 HTML을 조각 단위로 생성 (파일이나 HTTP 응답으로 바로 흘려보내기용)"""
+    _, items = build_forms(questions)[0]
+    return iter_form_html(items, title, include_answer_sheet)
+
+
+def generate_exam_html(questions: list, title: str = "수학 모의고사", include_answer_sheet: bool = True) -> str:
+    """수능 스타일 문제지 HTML 생성"""
+    return ''.join(iter_exam_html(questions, title, include_answer_sheet))
+
+
+def write_fragments(path: str, fragments) -> int:
+    """HTML 조각을 임시 파일에 쓰고 원자적으로 교체합니다. 쓴 문자 수를 반환."""
+    tmp_path = f'{path}.{uuid.uuid4().hex[:8]}.tmp'
+    size = 0
+    try:
+        with open(tmp_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            for fragment in fragments:
+                size += f.write(fragment)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return size
+
+
+def write_exam_file(path: str, questions: list, title: str = "수학 모의고사", include_answer_sheet: bool = True) -> int:
+    """문제지 HTML을 조각 단위로 파일에 씁니다."""
+    return write_fragments(path, iter_exam_html(questions, title, include_answer_sheet))
+
+
+def write_exam_forms(path_for_form, questions: list, forms: int, title: str = "수학 모의고사",
+                     include_answer_sheet: bool = True, seed=None) -> list:
+    """A/B/C... 유형별 문제지를 파일로 씁니다.
+
+    Args:
+        path_for_form: 유형 라벨 → 저장 경로 함수
+
+    Returns:
+        [{"form": "A", "path": ..., "answers": [...]}, ...]
+    """
+    results = []
+    for label, items in build_forms(questions, forms, seed):
+        path = path_for_form(label)
+        form_title = f"{title} ({label}형)" if forms > 1 else title
+        write_fragments(path, iter_form_html(items, form_title, include_answer_sheet))
+        results.append({'form': label, 'path': path, 'answers': [item.answer for item in items]})
+    return results
+
+
+def _benchmark_questions(n: int) -> list:
+    sample = {
+        'question_text': '함수 $f(x) = x^2 - 4x + 3$에 대하여 $f(a) = 0.19999999999999998$을 만족하는 <실수> $a$의 값의 합은?',
+        'choices': [{'number': f'{k}', 'text': f'${k} + \\frac{{1}}{{2}}$'} for k in '①②③④⑤'],
+        'answer': '③',
+        'explanation': '[1단계] 근과 계수의 관계\n$a_1 + a_2 = 4$\n\n**정리**\n- 따라서 답은 $4$이다.',
+        'points': 3,
+    }
+    return [dict(sample, question_text=f"{sample['question_text']} ({i})") for i in range(n)]
+
+
+def _measure(fn):
+    """(소요 시간 ms, 최대 추적 메모리 KB) - 시간은 tracemalloc 없이 따로 측정"""
+    import time
+    import tracemalloc
+
+    format_math_text.cache_clear()
+    _fragment_cache.clear()
+    start = time.perf_counter()
+    fn()
+    elapsed = (time.perf_counter() - start) * 1000
+
+    format_math_text.cache_clear()
+    _fragment_cache.clear()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+if __name__ == '__main__':
+    # 처리량 측정: python generate_exam.py
+    import tempfile
+    import time
+
+    print(f"{'문항':>6} | {'문자열(ms)':>10} | {'최대메모리(KB)':>14} | {'파일쓰기(ms)':>12} | {'최대메모리(KB)':>14} | {'문항/초':>8} | {'3개 유형(ms)':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in (10, 100, 1000):
+            questions = _benchmark_questions(n)
+            string_ms, string_peak = _measure(lambda: generate_exam_html(questions))
+            file_ms, file_peak = _measure(lambda: write_exam_file(os.path.join(tmp, f'exam_{n}.html'), questions))
+
+            # 3개 유형: 조각 캐시가 채워진 상태에서 번호/선택지 순서만 다시 조립
+            start = time.perf_counter()
+            write_exam_forms(lambda label: os.path.join(tmp, f'exam_{n}_{label}.html'), questions, 3, seed=1)
+            forms_ms = (time.perf_counter() - start) * 1000
+
+            print(f"{n:>6} | {string_ms:>10.1f} | {string_peak:>14.0f} | {file_ms:>12.1f} | {file_peak:>14.0f} | "
+                  f"{n / file_ms * 1000:>8.0f} | {forms_ms:>12.1f}")
@@ -8,11 +8,19 @@ import os
 import json
 import re
 import base64
-import io
+import hashlib
 import time
+import uuid
 import google.generativeai as genai
 from datetime import datetime
 from llm_tracker import tracker
+from utils.tracing import span, traced
+from utils.model_router import get_model
+from utils.graph_renderer import get_renderer
+from utils import render_cache, svg_graph
+from utils.render_pool import RenderPool, JOB_TIMEOUT
+from utils.figure_ir import figure_from_graph
+from utils.sampling import adaptive_sample, sample_function, point_at
 
 
 def format_number(value) -> str:
@@ -205,6 +213,7 @@ VARIANT_PROMPT = """당신은 교육 전문가입니다. 주어진 원본 문제
 ### 지원하는 그래프 유형
 1. **function**: 함수 그래프 (일차함수, 이차함수, 삼각함수, 지수/로그 등)
    - function: 파이썬 numpy 문법 (예: "2*x + 1", "x**2 - 3*x + 2", "sin(x)", "exp(x)")
+     구간별 함수는 "x**2 if x < 0 else 2*x" 또는 "piecewise((x**2, x < 0), (2*x, x >= 0))"
    - x_range, y_range: 범위 지정
    - points: 강조할 점들 [[x, y], ...]
    - asymptotes: 점근선 [x값, ...] 또는 {{horizontal: y값, vertical: [x값]}}
@@ -336,7 +345,7 @@ VERIFY_PROMPT = """다음 수학/과학 문제를 직접 풀어서 정답을 검
 
 def solve_original_question(question_data: dict) -> dict:
     """원본 문제를 LLM으로 풀이하여 정답과 풀이 과정을 생성합니다."""
-    model_name = 'gemini-2.0-flash'
+    model_name = get_model('solve_original', 'gemini-2.0-flash')
 
     generation_config = {
         "response_mime_type": "application/json",
@@ -409,7 +418,7 @@ def solve_original_question(question_data: dict) -> dict:
 
 def verify_answer(question_text: str, choices: list, claimed_answer: str, claimed_explanation: str) -> dict:
     """LLM을 사용하여 정답을 검증합니다."""
-    model_name = 'gemini-2.0-flash'
+    model_name = get_model('verify_answer', 'gemini-2.0-flash')
 
     # JSON 모드 설정
     generation_config = {
@@ -469,32 +478,132 @@ def verify_answer(question_text: str, choices: list, claimed_answer: str, claime
         }
 
 
-def generate_graph(graph_info: dict, output_path: str = None, variant_id: str = None) -> str:
+GRAPH_MIME_TYPES = {'png': 'image/png', 'svg': 'image/svg+xml'}
+# HTML 리포트의 그래프 형식 (auto: 단순 유형은 SVG, 나머지는 PNG)
+REPORT_GRAPH_FORMAT = os.environ.get('REPORT_GRAPH_FORMAT', 'auto').lower()
+# 서버가 만드는 리포트의 그래프 배치 (files: 리포트 옆 파일 + URL 참조, inline: base64 단일 파일)
+REPORT_GRAPH_MODE = os.environ.get('REPORT_GRAPH_MODE', 'files').lower()
+
+
+def _graph_output(data: bytes, fmt: str, output_path: str = None) -> str:
+    if output_path:
+        with open(output_path, 'wb') as f:
+            f.write(data)
+        return output_path
+    return f"data:{GRAPH_MIME_TYPES[fmt]};base64,{base64.b64encode(data).decode('utf-8')}"
+
+
+@traced('graph.render')
+def generate_graph(graph_info: dict, output_path: str = None, variant_id: str = None, fmt: str = 'png') -> str:
     """그래프를 생성하고 base64 또는 파일 경로를 반환합니다.
 
+    같은 graph_info는 렌더 캐시(메모리 → 디스크)에서 바로 가져오고, 없을 때만 렌더링합니다.
+
     Args:
         graph_info: 그래프 정보 딕셔너리
         output_path: 파일 저장 경로 (지정하면 파일로 저장, 없으면 base64 반환)
         variant_id: 변형 문제 ID (선택, 현재 미사용)
+        fmt: 'png' (matplotlib PNG), 'svg' (단순 유형은 순수 SVG, 나머지는 matplotlib SVG),
+             'auto' (단순 유형은 순수 SVG, 나머지는 PNG)
 
     Returns:
         base64 데이터 URI 또는 저장된 파일 경로
     """
+    data, fmt = render_graph_bytes(graph_info, fmt)
+    if data is None:
+        return None
+    return _graph_output(data, fmt, output_path)
+
+
+def render_graph_bytes(graph_info: dict, fmt: str = 'png'):
+    """그래프를 렌더링해서 (bytes, 실제 형식)을 반환합니다. 그릴 수 없으면 (None, None).
+
+    fmt='auto'면 실제 형식은 'svg' 또는 'png'로 정해집니다.
+    """
+    result = render_graphs([graph_info], fmt)[0]
+    if not result or not result['ok']:
+        return None, None
+    return result['data'], result['fmt']
+
+
+def _warm_render_worker():
+    """렌더 워커 시작 시 matplotlib/폰트 초기화를 미리 해둠"""
+    with get_renderer().figure():
+        pass
+
+
+_render_pool = RenderPool(initializer=_warm_render_worker)
+
+
+def render_graphs(graph_infos: list, fmt: str = 'png', timeout: float = JOB_TIMEOUT) -> list:
+    """여러 그래프를 한 번에 렌더링합니다.
+
+    SVG 변환과 렌더 캐시 조회는 현재 프로세스에서, 캐시에 없는 matplotlib 렌더링은
+    프로세스 풀에서 병렬로 처리합니다. 같은 그래프는 한 번만 렌더링합니다.
+
+    Returns:
+        입력 순서대로 None(그래프 없음) 또는
+        {'ok': bool, 'data': bytes, 'fmt': 'svg'|'png', 'error': str, 'elapsed_ms': float}
+    """
+    fmt = (fmt or 'png').lower()
+    if fmt not in ('png', 'svg', 'auto'):
+        raise ValueError(f"지원하지 않는 그래프 형식입니다: {fmt}")
+
+    results = [None] * len(graph_infos)
+    pending = {}  # 캐시 키 → (graph_info, 형식, [결과 인덱스])
+    renderer = get_renderer()
+    cache = render_cache.get_cache()
+    for i, graph_info in enumerate(graph_infos):
+        if not isinstance(graph_info, dict) or graph_info.get('type', 'none') == 'none' or not graph_info.get('plot_data'):
+            continue
+
+        # 수직선/좌표/수열/단순 도형은 matplotlib 없이 바로 SVG로
+        job_fmt = fmt
+        if fmt in ('svg', 'auto'):
+            svg = svg_graph.render_svg(graph_info)
+            if svg is not None:
+                results[i] = {'ok': True, 'data': svg.encode('utf-8'), 'fmt': 'svg', 'error': None, 'elapsed_ms': 0}
+                continue
+            if fmt == 'auto':
+                job_fmt = 'png'
+
+        key = render_cache.cache_key(graph_info, fmt=job_fmt, dpi=renderer.dpi, figsize=list(renderer.figsize))
+        with span('graph.cache') as record:
+            data = cache.get(key, job_fmt)
+            if record is not None:
+                record['attrs']['hit'] = data is not None
+        if data is not None:
+            results[i] = {'ok': True, 'data': data, 'fmt': job_fmt, 'error': None, 'elapsed_ms': 0}
+            continue
+        pending.setdefault(key, (graph_info, job_fmt, []))[2].append(i)
+
+    if pending:
+        with span('graph.render_pool', jobs=len(pending)):
+            outcomes = _render_pool.map(_render_graph, [(g, f) for g, f, _ in pending.values()], timeout)
+        for (key, (_, job_fmt, indexes)), outcome in zip(pending.items(), outcomes):
+            data = outcome.get('value')
+            if data is not None:
+                cache.put(key, data, job_fmt)
+            result = {
+                'ok': data is not None,
+                'data': data,
+                'fmt': job_fmt,
+                'error': None if data is not None else (outcome.get('error') or '그래프 렌더링 실패'),
+                'elapsed_ms': outcome.get('elapsed_ms'),
+            }
+            for i in indexes:
+                results[i] = result
+    return results
+
+
+def _render_graph(graph_info: dict, fmt: str = 'png'):
+    """graph_info를 matplotlib으로 그려 PNG/SVG bytes로 반환합니다. 실패하면 None."""
     try:
-        import matplotlib
-        matplotlib.use('Agg')  # 백엔드 설정
-        import matplotlib.pyplot as plt
         import matplotlib.patches as patches
+        from matplotlib.artist import setp
         from matplotlib.patches import FancyArrowPatch, Arc, Circle, Polygon
         import numpy as np
 
-        # LaTeX 수식 렌더링 설정
-        plt.rcParams['font.family'] = ['DejaVu Sans', 'Arial Unicode MS', 'sans-serif']
-        plt.rcParams['axes.unicode_minus'] = False
-        plt.rcParams['mathtext.fontset'] = 'dejavusans'  # 수학 폰트 설정
-        plt.rcParams['text.usetex'] = False  # LaTeX 엔진 사용 안함 (호환성)
-        plt.rcParams['font.size'] = 11
-
         graph_type = graph_info.get('type', 'none')
         if graph_type == 'none':
             return None
@@ -503,499 +612,463 @@ def generate_graph(graph_info: dict, output_path: str = None, variant_id: str =
         if not plot_data:
             return None
 
-        fig, ax = plt.subplots(figsize=(6, 5))
-        plot_success = False
-
-        # 수능 스타일: 흑백/회색 톤만 사용
-        CURVE_COLOR = 'black'
-        SHADE_COLOR = 'gray'
-        SHADE_ALPHA = 0.3
-        POINT_COLOR = 'black'
-        DASHED_COLOR = 'black'
-
-        if graph_type == 'function':
-            # 함수 그래프
-            func_str = plot_data.get('function', '')
-            x_range = plot_data.get('x_range', [-10, 10])
-            y_range = plot_data.get('y_range', None)
-
-            if func_str:
-                x = np.linspace(x_range[0], x_range[1], 400)
-                try:
-                    safe_dict = {
-                        'x': x, 'np': np, 'sin': np.sin, 'cos': np.cos,
-                        'tan': np.tan, 'exp': np.exp, 'log': np.log,
-                        'sqrt': np.sqrt, 'abs': np.abs, 'pi': np.pi,
-                        'e': np.e, 'log10': np.log10, 'log2': np.log2,
-                        'arcsin': np.arcsin, 'arccos': np.arccos, 'arctan': np.arctan,
-                        'sinh': np.sinh, 'cosh': np.cosh, 'tanh': np.tanh,
-                        'floor': np.floor, 'ceil': np.ceil,
-                        'where': np.where, 'maximum': np.maximum, 'minimum': np.minimum
-                    }
-                    eval_func_str = func_str
-                    if '=' in eval_func_str:
-                        eval_func_str = eval_func_str.split('=')[1].strip()
-                    eval_func_str = eval_func_str.replace('^', '**')
-                    if 'if' not in eval_func_str and '?' not in eval_func_str:
-                        y = eval(eval_func_str, {"__builtins__": {}}, safe_dict)
-                        if np.isscalar(y):
-                            y = np.full_like(x, y)
+        # 프로세스 공용 렌더러의 Figure를 빌려서 그림 (rcParams/폰트는 최초 1회만 설정)
+        renderer = get_renderer()
+        with renderer.figure() as (fig, ax):
+            plot_success = False
+
+            # 수능 스타일: 흑백/회색 톤만 사용
+            CURVE_COLOR = 'black'
+            SHADE_COLOR = 'gray'
+            SHADE_ALPHA = 0.3
+            POINT_COLOR = 'black'
+            DASHED_COLOR = 'black'
+
+            if graph_type == 'function':
+                # 함수 그래프
+                # 수식은 Figure IR에서 한 번만 파싱/검증 (JSXGraph, Function Plot 출력과 공유)
+                figure = figure_from_graph(graph_info)
+                curve = figure.curves[0] if figure.curves else None
+                func_str = curve.source if curve else ''
+                x_range = figure.x_range
+                y_range = figure.y_range
+
+                if func_str:
+                    try:
+                        if curve.expr is None:
+                            raise ValueError(curve.error)
+                        # 곡률이 큰 곳만 촘촘히 샘플링하고 점근선/불연속에서는 선을 끊음
+                        sample = sample_function(curve.expr, x_range[0], x_range[1], y_limits=y_range)
+                        x, y = sample.x, sample.ys[0]
                         # 수식 레이블 생성
                         display_func = func_str.replace('**', '^').replace('*', '')
                         display_func = display_func.replace('sqrt', r'\sqrt')
                         display_func = display_func.replace('pi', r'\pi')
                         ax.plot(x, y, color=CURVE_COLOR, linewidth=1.5)
                         # 곡선에 직접 레이블 표시 (수능 스타일: 심플하게)
-                        label_x_idx = int(len(x) * 0.8)
-                        label_x, label_y = x[label_x_idx], y[label_x_idx]
-                        ax.annotate(f'$y=f(x)$', (label_x, label_y),
-                                   textcoords="offset points", xytext=(5, 5),
-                                   fontsize=11, color=CURVE_COLOR)
+                        label_point = point_at(x, y, 0.8)
+                        if label_point:
+                            ax.annotate(f'$y=f(x)$', label_point,
+                                       textcoords="offset points", xytext=(5, 5),
+                                       fontsize=11, color=CURVE_COLOR)
+                        # 점근선 근처의 큰 값에 y축이 끌려가지 않도록 표시 범위 고정
+                        if sample.breaks and not y_range:
+                            ax.set_ylim(sample.y_limits)
                         plot_success = True
-                except Exception as e:
-                    print(f"함수 그래프 오류: {e}")
-
-            # 점근선 (수능 스타일: 검정 점선)
-            asymptotes = plot_data.get('asymptotes', {})
-            if isinstance(asymptotes, dict):
-                for v_line in asymptotes.get('vertical', []):
-                    ax.axvline(x=v_line, color=DASHED_COLOR, linestyle='--', linewidth=1)
-                if 'horizontal' in asymptotes:
-                    h_val = asymptotes['horizontal']
-                    ax.axhline(y=h_val, color=DASHED_COLOR, linestyle='--', linewidth=1)
-            elif isinstance(asymptotes, list):
-                for v_line in asymptotes:
-                    ax.axvline(x=v_line, color=DASHED_COLOR, linestyle='--', linewidth=1)
-
-            # 점 표시 (수능 스타일: 검정 점)
-            points = plot_data.get('points', [])
-            labels = plot_data.get('labels', [])
-            for i, point in enumerate(points):
-                if len(point) >= 2:
-                    ax.plot(point[0], point[1], 'ko', markersize=5, zorder=5)
-                    label = labels[i] if i < len(labels) else f'({point[0]}, {point[1]})'
-                    ax.annotate(label, (point[0], point[1]), textcoords="offset points",
-                               xytext=(5, 5), fontsize=10, color=POINT_COLOR)
-                    plot_success = True
+                    except Exception as e:
+                        print(f"함수 그래프 오류: {e}")
+
+                # 점근선 (수능 스타일: 검정 점선)
+                asymptotes = plot_data.get('asymptotes', {})
+                if isinstance(asymptotes, dict):
+                    for v_line in asymptotes.get('vertical', []):
+                        ax.axvline(x=v_line, color=DASHED_COLOR, linestyle='--', linewidth=1)
+                    if 'horizontal' in asymptotes:
+                        h_val = asymptotes['horizontal']
+                        ax.axhline(y=h_val, color=DASHED_COLOR, linestyle='--', linewidth=1)
+                elif isinstance(asymptotes, list):
+                    for v_line in asymptotes:
+                        ax.axvline(x=v_line, color=DASHED_COLOR, linestyle='--', linewidth=1)
 
-            if y_range:
-                ax.set_ylim(y_range)
-
-        elif graph_type == 'geometry':
-            # 기하 도형 (수능 스타일: 검정선, 회색 음영)
-            shapes = plot_data.get('shapes', [])
-
-            # 기존 points 형식 호환성
-            if not shapes and plot_data.get('points'):
-                shapes = [{"type": "polygon", "points": plot_data['points'], "labels": plot_data.get('labels', [])}]
-
-            for shape in shapes:
-                shape_type = shape.get('type', 'polygon')
-
-                if shape_type == 'polygon':
-                    points = shape.get('points', [])
-                    labels = shape.get('labels', [])
-                    if points:
-                        xs = [p[0] for p in points] + [points[0][0]]
-                        ys = [p[1] for p in points] + [points[0][1]]
-                        ax.plot(xs, ys, color=CURVE_COLOR, linewidth=1.5)
-                        ax.fill(xs, ys, alpha=SHADE_ALPHA, color=SHADE_COLOR)
-                        for i, point in enumerate(points):
-                            ax.plot(point[0], point[1], 'ko', markersize=4)
-                            label = labels[i] if i < len(labels) else f'P{i+1}'
-                            ax.annotate(label, (point[0], point[1]), textcoords="offset points",
+                # 점 표시 (수능 스타일: 검정 점)
+                points = plot_data.get('points', [])
+                labels = plot_data.get('labels', [])
+                for i, point in enumerate(points):
+                    if len(point) >= 2:
+                        ax.plot(point[0], point[1], 'ko', markersize=5, zorder=5)
+                        label = labels[i] if i < len(labels) else f'({point[0]}, {point[1]})'
+                        ax.annotate(label, (point[0], point[1]), textcoords="offset points",
+                                   xytext=(5, 5), fontsize=10, color=POINT_COLOR)
+                        plot_success = True
+
+                if y_range:
+                    ax.set_ylim(y_range)
+
+            elif graph_type == 'geometry':
+                # 기하 도형 (수능 스타일: 검정선, 회색 음영)
+                shapes = plot_data.get('shapes', [])
+
+                # 기존 points 형식 호환성
+                if not shapes and plot_data.get('points'):
+                    shapes = [{"type": "polygon", "points": plot_data['points'], "labels": plot_data.get('labels', [])}]
+
+                for shape in shapes:
+                    shape_type = shape.get('type', 'polygon')
+
+                    if shape_type == 'polygon':
+                        points = shape.get('points', [])
+                        labels = shape.get('labels', [])
+                        if points:
+                            xs = [p[0] for p in points] + [points[0][0]]
+                            ys = [p[1] for p in points] + [points[0][1]]
+                            ax.plot(xs, ys, color=CURVE_COLOR, linewidth=1.5)
+                            ax.fill(xs, ys, alpha=SHADE_ALPHA, color=SHADE_COLOR)
+                            for i, point in enumerate(points):
+                                ax.plot(point[0], point[1], 'ko', markersize=4)
+                                label = labels[i] if i < len(labels) else f'P{i+1}'
+                                ax.annotate(label, (point[0], point[1]), textcoords="offset points",
+                                           xytext=(5, 5), fontsize=11, color=POINT_COLOR)
+                            plot_success = True
+
+                    elif shape_type == 'circle':
+                        center = shape.get('center', [0, 0])
+                        radius = shape.get('radius', 1)
+                        label = shape.get('label', '')
+                        circle = Circle(center, radius, fill=False, color=CURVE_COLOR, linewidth=1.5)
+                        ax.add_patch(circle)
+                        ax.plot(center[0], center[1], 'ko', markersize=3)
+                        if label:
+                            ax.annotate(label, center, textcoords="offset points",
                                        xytext=(5, 5), fontsize=11, color=POINT_COLOR)
                         plot_success = True
 
-                elif shape_type == 'circle':
-                    center = shape.get('center', [0, 0])
-                    radius = shape.get('radius', 1)
-                    label = shape.get('label', '')
-                    circle = Circle(center, radius, fill=False, color=CURVE_COLOR, linewidth=1.5)
-                    ax.add_patch(circle)
-                    ax.plot(center[0], center[1], 'ko', markersize=3)
-                    if label:
-                        ax.annotate(label, center, textcoords="offset points",
-                                   xytext=(5, 5), fontsize=11, color=POINT_COLOR)
+                    elif shape_type == 'line':
+                        start = shape.get('start', [0, 0])
+                        end = shape.get('end', [1, 1])
+                        label = shape.get('label', '')
+                        ax.plot([start[0], end[0]], [start[1], end[1]], color=CURVE_COLOR, linewidth=1.5)
+                        if label:
+                            mid_x = (start[0] + end[0]) / 2
+                            mid_y = (start[1] + end[1]) / 2
+                            ax.annotate(label, (mid_x, mid_y), textcoords="offset points",
+                                       xytext=(0, 8), fontsize=10, color=POINT_COLOR)
+                        plot_success = True
+
+                    elif shape_type == 'arc':
+                        center = shape.get('center', [0, 0])
+                        radius = shape.get('radius', 1)
+                        start_angle = shape.get('start_angle', 0)
+                        end_angle = shape.get('end_angle', 90)
+                        arc = Arc(center, radius*2, radius*2, angle=0,
+                                 theta1=start_angle, theta2=end_angle, color=CURVE_COLOR, linewidth=1.5)
+                        ax.add_patch(arc)
+                        plot_success = True
+
+                # 주석 (각도, 길이 등) - 수능 스타일: 검정색
+                annotations = plot_data.get('annotations', [])
+                for ann in annotations:
+                    if ann.get('type') == 'angle':
+                        vertex = ann.get('vertex', [0, 0])
+                        value = ann.get('value', '')
+                        ax.annotate(value, vertex, textcoords="offset points",
+                                   xytext=(10, 10), fontsize=10, color=POINT_COLOR)
+
+                ax.set_aspect('equal')
+                ax.autoscale()
+
+            elif graph_type == 'statistics':
+                # 통계 그래프 (수능 스타일: 회색 계열)
+                data = plot_data.get('data', [])
+                labels = plot_data.get('labels', [])
+                chart_type = plot_data.get('chart_type', 'bar')
+                title = plot_data.get('title', '')
+                # 수능 스타일: 회색 계열 색상
+                gray_colors = ['#666666', '#888888', '#aaaaaa', '#cccccc', '#444444']
+
+                if chart_type == 'bar' and data:
+                    x_pos = range(len(data))
+                    bars = ax.bar(x_pos, data, color=gray_colors[:len(data)], edgecolor='black', linewidth=0.5)
+                    if labels:
+                        ax.set_xticks(x_pos)
+                        ax.set_xticklabels(labels, rotation=45 if len(labels) > 5 else 0)
+                    # 값 표시
+                    for bar, val in zip(bars, data):
+                        ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.5,
+                               str(val), ha='center', va='bottom', fontsize=9, color='black')
                     plot_success = True
 
-                elif shape_type == 'line':
-                    start = shape.get('start', [0, 0])
-                    end = shape.get('end', [1, 1])
-                    label = shape.get('label', '')
-                    ax.plot([start[0], end[0]], [start[1], end[1]], color=CURVE_COLOR, linewidth=1.5)
+                elif chart_type == 'pie' and data:
+                    ax.pie(data, labels=labels, autopct='%1.1f%%', colors=gray_colors[:len(data)],
+                          wedgeprops={'edgecolor': 'black', 'linewidth': 0.5})
+                    ax.axis('equal')
+                    plot_success = True
+
+                elif chart_type == 'histogram' and data:
+                    ax.hist(data, bins=plot_data.get('bins', 10), color=SHADE_COLOR, edgecolor='black')
+                    plot_success = True
+
+                elif chart_type == 'boxplot' and data:
+                    ax.boxplot(data, labels=labels if labels else None)
+                    plot_success = True
+
+                elif chart_type == 'scatter' and data:
+                    if isinstance(data[0], (list, tuple)):
+                        xs = [p[0] for p in data]
+                        ys = [p[1] for p in data]
+                        ax.scatter(xs, ys, c=POINT_COLOR, s=30)
+                        for i, (x, y) in enumerate(zip(xs, ys)):
+                            if i < len(labels):
+                                ax.annotate(labels[i], (x, y), textcoords="offset points",
+                                           xytext=(5, 5), fontsize=10, color=POINT_COLOR)
+                        plot_success = True
+
+                elif chart_type == 'line' and data:
+                    ax.plot(data, color=CURVE_COLOR, marker='o', linewidth=1.5, markersize=4)
+                    if labels:
+                        ax.set_xticks(range(len(labels)))
+                        ax.set_xticklabels(labels)
+                    plot_success = True
+
+                if title:
+                    ax.set_title(title, fontsize=12, pad=10, color='black')
+
+            elif graph_type == 'coordinate':
+                # 좌표평면 위의 점/벡터 (수능 스타일)
+                points = plot_data.get('points', [])
+                labels = plot_data.get('labels', [])
+                vectors = plot_data.get('vectors', [])
+
+                # 점 표시 (수능 스타일: 검정 점)
+                for i, point in enumerate(points):
+                    if len(point) >= 2:
+                        ax.plot(point[0], point[1], 'ko', markersize=5)
+                        label = labels[i] if i < len(labels) else f'({point[0]}, {point[1]})'
+                        ax.annotate(label, (point[0], point[1]), textcoords="offset points",
+                                   xytext=(5, 5), fontsize=11, color=POINT_COLOR)
+                        plot_success = True
+
+                # 벡터 표시 (수능 스타일: 검정 화살표)
+                for vec in vectors:
+                    start = vec.get('start', [0, 0])
+                    end = vec.get('end', [1, 1])
+                    label = vec.get('label', '')
+                    ax.annotate('', xy=end, xytext=start,
+                               arrowprops=dict(arrowstyle='->', color=CURVE_COLOR, lw=1.5))
                     if label:
                         mid_x = (start[0] + end[0]) / 2
                         mid_y = (start[1] + end[1]) / 2
                         ax.annotate(label, (mid_x, mid_y), textcoords="offset points",
-                                   xytext=(0, 8), fontsize=10, color=POINT_COLOR)
+                                   xytext=(5, 5), fontsize=10, color=POINT_COLOR)
                     plot_success = True
 
-                elif shape_type == 'arc':
-                    center = shape.get('center', [0, 0])
-                    radius = shape.get('radius', 1)
-                    start_angle = shape.get('start_angle', 0)
-                    end_angle = shape.get('end_angle', 90)
-                    arc = Arc(center, radius*2, radius*2, angle=0,
-                             theta1=start_angle, theta2=end_angle, color=CURVE_COLOR, linewidth=1.5)
-                    ax.add_patch(arc)
+                ax.set_aspect('equal')
+
+            elif graph_type == 'sequence':
+                # 수열 시각화 (수능 스타일)
+                terms = plot_data.get('terms', [])
+                formula = plot_data.get('formula', '')
+                show_sum = plot_data.get('show_sum', False)
+
+                if terms:
+                    n_values = range(1, len(terms) + 1)
+                    # 수능 스타일: 검정색 stem 플롯
+                    markerline, stemlines, baseline = ax.stem(n_values, terms, linefmt='k-', markerfmt='ko', basefmt='k-')
+                    setp(markerline, markersize=5)
+                    setp(stemlines, linewidth=1)
+                    for n, term in zip(n_values, terms):
+                        ax.annotate(f'$a_{{{n}}}={term}$', (n, term), textcoords="offset points",
+                                   xytext=(5, 8), fontsize=10, color=POINT_COLOR)
+
+                    if show_sum:
+                        cumsum = np.cumsum(terms)
+                        ax.plot(n_values, cumsum, color=CURVE_COLOR, linestyle='--', marker='s',
+                               linewidth=1, markersize=4)
+                        # 누적합 직접 레이블
+                        last_n = list(n_values)[-1]
+                        last_sum = cumsum[-1]
+                        ax.annotate(r'$S_n$', (last_n, last_sum),
+                                   textcoords="offset points", xytext=(8, 0),
+                                   fontsize=10, color=POINT_COLOR)
+
+                    # 눈금과 숫자 제거
+                    ax.set_xticks([])
+                    ax.set_yticks([])
+
+                    # 축 끝에 직접 n, a_n 레이블 표시
+                    ax.spines['top'].set_visible(False)
+                    ax.spines['right'].set_visible(False)
+                    n_lim = ax.get_xlim()
+                    a_lim = ax.get_ylim()
+                    ax.annotate('$n$', xy=(n_lim[1], 0), xytext=(n_lim[1] + 0.2, 0),
+                               fontsize=14, ha='left', va='center')
+                    ax.annotate('$a_n$', xy=(0, a_lim[1]), xytext=(0, a_lim[1] + 0.2),
+                               fontsize=14, ha='center', va='bottom')
+                    if formula:
+                        # formula가 $ 기호를 포함하지 않으면 추가
+                        if '$' not in formula:
+                            formula = f'${formula}$'
+                        ax.set_title(f'수열: {formula}', fontsize=12)
                     plot_success = True
 
-            # 주석 (각도, 길이 등) - 수능 스타일: 검정색
-            annotations = plot_data.get('annotations', [])
-            for ann in annotations:
-                if ann.get('type') == 'angle':
-                    vertex = ann.get('vertex', [0, 0])
-                    value = ann.get('value', '')
-                    ax.annotate(value, vertex, textcoords="offset points",
-                               xytext=(10, 10), fontsize=10, color=POINT_COLOR)
-
-            ax.set_aspect('equal')
-            ax.autoscale()
-
-        elif graph_type == 'statistics':
-            # 통계 그래프 (수능 스타일: 회색 계열)
-            data = plot_data.get('data', [])
-            labels = plot_data.get('labels', [])
-            chart_type = plot_data.get('chart_type', 'bar')
-            title = plot_data.get('title', '')
-            # 수능 스타일: 회색 계열 색상
-            gray_colors = ['#666666', '#888888', '#aaaaaa', '#cccccc', '#444444']
-
-            if chart_type == 'bar' and data:
-                x_pos = range(len(data))
-                bars = ax.bar(x_pos, data, color=gray_colors[:len(data)], edgecolor='black', linewidth=0.5)
-                if labels:
-                    ax.set_xticks(x_pos)
-                    ax.set_xticklabels(labels, rotation=45 if len(labels) > 5 else 0)
-                # 값 표시
-                for bar, val in zip(bars, data):
-                    ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.5,
-                           str(val), ha='center', va='bottom', fontsize=9, color='black')
-                plot_success = True
-
-            elif chart_type == 'pie' and data:
-                ax.pie(data, labels=labels, autopct='%1.1f%%', colors=gray_colors[:len(data)],
-                      wedgeprops={'edgecolor': 'black', 'linewidth': 0.5})
-                ax.axis('equal')
-                plot_success = True
+            elif graph_type == 'number_line':
+                # 수직선 (수능 스타일)
+                points_data = plot_data.get('points', [])
+                labels = plot_data.get('labels', [])
+                intervals = plot_data.get('intervals', [])
 
-            elif chart_type == 'histogram' and data:
-                ax.hist(data, bins=plot_data.get('bins', 10), color=SHADE_COLOR, edgecolor='black')
-                plot_success = True
+                # 범위 계산
+                all_points = list(points_data)
+                for interval in intervals:
+                    all_points.extend([interval.get('start', 0), interval.get('end', 1)])
 
-            elif chart_type == 'boxplot' and data:
-                ax.boxplot(data, labels=labels if labels else None)
-                plot_success = True
+                if all_points:
+                    min_val = min(all_points) - 1
+                    max_val = max(all_points) + 1
+                else:
+                    min_val, max_val = -5, 5
+
+                # 수직선 그리기 (수능 스타일: 검정 선)
+                ax.axhline(y=0, color='black', linewidth=1.5)
+                ax.set_xlim(min_val, max_val)
+                ax.set_ylim(-0.5, 0.5)
+
+                # 눈금 (수능 스타일: 검정)
+                tick_vals = range(int(min_val), int(max_val) + 1)
+                for t in tick_vals:
+                    ax.plot([t, t], [-0.08, 0.08], 'k-', linewidth=1)
+                    ax.text(t, -0.2, str(t), ha='center', fontsize=10, color='black')
+
+                # 구간 표시 (수능 스타일: 회색)
+                for interval in intervals:
+                    start = interval.get('start', 0)
+                    end = interval.get('end', 1)
+                    open_start = interval.get('open_start', False)
+                    open_end = interval.get('open_end', False)
+
+                    ax.plot([start, end], [0, 0], color=SHADE_COLOR, linewidth=3, alpha=0.6)
+                    ax.plot(start, 0, 'ko',
+                           markersize=6, markerfacecolor='black' if not open_start else 'white',
+                           markeredgecolor='black', markeredgewidth=1.5)
+                    ax.plot(end, 0, 'ko',
+                           markersize=6, markerfacecolor='black' if not open_end else 'white',
+                           markeredgecolor='black', markeredgewidth=1.5)
 
-            elif chart_type == 'scatter' and data:
-                if isinstance(data[0], (list, tuple)):
-                    xs = [p[0] for p in data]
-                    ys = [p[1] for p in data]
-                    ax.scatter(xs, ys, c=POINT_COLOR, s=30)
-                    for i, (x, y) in enumerate(zip(xs, ys)):
-                        if i < len(labels):
-                            ax.annotate(labels[i], (x, y), textcoords="offset points",
-                                       xytext=(5, 5), fontsize=10, color=POINT_COLOR)
-                    plot_success = True
+                # 점 표시 (수능 스타일: 검정 점)
+                for i, p in enumerate(points_data):
+                    ax.plot(p, 0, 'ko', markersize=5, zorder=5)
+                    label = labels[i] if i < len(labels) else str(p)
+                    ax.annotate(label, (p, 0), textcoords="offset points",
+                               xytext=(0, 12), fontsize=11, ha='center', color='black')
 
-            elif chart_type == 'line' and data:
-                ax.plot(data, color=CURVE_COLOR, marker='o', linewidth=1.5, markersize=4)
-                if labels:
-                    ax.set_xticks(range(len(labels)))
-                    ax.set_xticklabels(labels)
+                ax.set_yticks([])
+                ax.spines['top'].set_visible(False)
+                ax.spines['right'].set_visible(False)
+                ax.spines['left'].set_visible(False)
                 plot_success = True
 
-            if title:
-                ax.set_title(title, fontsize=12, pad=10, color='black')
-
-        elif graph_type == 'coordinate':
-            # 좌표평면 위의 점/벡터 (수능 스타일)
-            points = plot_data.get('points', [])
-            labels = plot_data.get('labels', [])
-            vectors = plot_data.get('vectors', [])
-
-            # 점 표시 (수능 스타일: 검정 점)
-            for i, point in enumerate(points):
-                if len(point) >= 2:
-                    ax.plot(point[0], point[1], 'ko', markersize=5)
-                    label = labels[i] if i < len(labels) else f'({point[0]}, {point[1]})'
-                    ax.annotate(label, (point[0], point[1]), textcoords="offset points",
-                               xytext=(5, 5), fontsize=11, color=POINT_COLOR)
-                    plot_success = True
-
-            # 벡터 표시 (수능 스타일: 검정 화살표)
-            for vec in vectors:
-                start = vec.get('start', [0, 0])
-                end = vec.get('end', [1, 1])
-                label = vec.get('label', '')
-                ax.annotate('', xy=end, xytext=start,
-                           arrowprops=dict(arrowstyle='->', color=CURVE_COLOR, lw=1.5))
-                if label:
-                    mid_x = (start[0] + end[0]) / 2
-                    mid_y = (start[1] + end[1]) / 2
-                    ax.annotate(label, (mid_x, mid_y), textcoords="offset points",
-                               xytext=(5, 5), fontsize=10, color=POINT_COLOR)
-                plot_success = True
+            elif graph_type == 'region':
+                # 두 곡선 사이의 영역 (수능 스타일: 검정 곡선, 회색 음영)
+                figure = figure_from_graph(graph_info)
+                x_range = figure.x_range
+                y_range = figure.y_range
+                vertical_lines = plot_data.get('vertical_lines', [])
+                fill_between_idx = plot_data.get('fill_between', [0, 1])
+                points = plot_data.get('points', [])
+
+                if figure.curves:
+                    y_limits = y_range
+                    curves = []  # 함수별 (x, y) - 곡선마다 적응형 샘플링 (전체 그래프용)
+                    exprs = []
+                    labels_list = []
+
+                    for i, curve in enumerate(figure.curves):
+                        func_str = curve.source
+                        try:
+                            expr = curve.expr
+                            if expr is None:
+                                raise ValueError(curve.error)
+                            sample = sample_function(expr, x_range[0] - 1, x_range[1] + 1, y_limits=y_limits)
+                            x_full, y_full = sample.x, sample.ys[0]
+                            curves.append((x_full, y_full))
+                            exprs.append(expr)
+
+                            # 라벨 생성: 실제 수식을 LaTeX 형식으로 변환
+                            display_func = func_str.replace('**', '^').replace('*', '')
+                            display_func = display_func.replace('sqrt', r'\sqrt')
+                            display_func = display_func.replace('pi', r'\pi')
+                            # x^2 -> x² 형태의 LaTeX
+                            labels_list.append(f'$y={display_func}$')
+
+                            # 곡선 그리기 (수능 스타일: 모두 검정)
+                            ax.plot(x_full, y_full, color=CURVE_COLOR, linewidth=1.5)
+                            plot_success = True
+                        except Exception as e:
+                            print(f"함수 {i} 오류: {e}")
+                            continue
+
+                    # 각 곡선에 직접 레이블 표시 (수능 스타일: 심플하게)
+                    # 레이블 위치를 함수별로 다르게 해서 겹침 방지
+                    label_positions = [0.85, 0.15, 0.5, 0.3, 0.7]  # 각 함수의 x 위치 비율
+                    for i, ((x_full, y_full), label_text) in enumerate(zip(curves, labels_list)):
+                        # 레이블 위치: 함수별로 다른 x 위치
+                        pos_ratio = label_positions[i % len(label_positions)]
+                        label_point = point_at(x_full, y_full, pos_ratio)
+                        if label_point:
+                            # 수능 스타일: 박스 없이 심플하게
+                            ax.annotate(label_text, label_point,
+                                       textcoords="offset points", xytext=(5, 5),
+                                       fontsize=10, color=CURVE_COLOR)
+
+                    # 두 곡선 사이 영역 채우기 (수능 스타일: 회색)
+                    # 채우기는 모든 함수를 같은 x 격자로 샘플링 (어느 한 함수라도 굽은 곳은 촘촘히)
+                    if len(exprs) >= 2:
+                        fill = adaptive_sample(exprs, x_range[0], x_range[1], detect_breaks=False, y_limits=y_limits)
+                        x_fill, y_values_fill = fill.x, fill.ys
+                        # fill_between_idx가 리스트인지 딕셔너리인지 확인
+                        if isinstance(fill_between_idx, list) and len(fill_between_idx) >= 2:
+                            idx1, idx2 = fill_between_idx[0], fill_between_idx[1]
+                        elif isinstance(fill_between_idx, dict):
+                            idx1, idx2 = fill_between_idx.get(0, 0), fill_between_idx.get(1, 1)
+                        else:
+                            idx1, idx2 = 0, 1  # 기본값
+
+                        if idx1 < len(y_values_fill) and idx2 < len(y_values_fill):
+                            ax.fill_between(x_fill, y_values_fill[idx1], y_values_fill[idx2],
+                                           alpha=SHADE_ALPHA, color=SHADE_COLOR)
+
+                    # 수직선 그리기 (수능 스타일: 검정 점선)
+                    for vline in vertical_lines:
+                        ax.axvline(x=vline, color=DASHED_COLOR, linewidth=1, linestyle='--')
+
+                    # 점 표시 (수능 스타일: 검정 점)
+                    for pt in points:
+                        if len(pt) >= 2:
+                            px, py = pt[0], pt[1]
+                            label = pt[2] if len(pt) > 2 else f'({px}, {py})'
+                            ax.plot(px, py, 'ko', markersize=5, zorder=5)
+                            ax.annotate(label, (px, py), textcoords="offset points",
+                                       xytext=(5, 5), fontsize=10, color=POINT_COLOR)
 
-            ax.set_aspect('equal')
-
-        elif graph_type == 'sequence':
-            # 수열 시각화 (수능 스타일)
-            terms = plot_data.get('terms', [])
-            formula = plot_data.get('formula', '')
-            show_sum = plot_data.get('show_sum', False)
-
-            if terms:
-                n_values = range(1, len(terms) + 1)
-                # 수능 스타일: 검정색 stem 플롯
-                markerline, stemlines, baseline = ax.stem(n_values, terms, linefmt='k-', markerfmt='ko', basefmt='k-')
-                plt.setp(markerline, markersize=5)
-                plt.setp(stemlines, linewidth=1)
-                for n, term in zip(n_values, terms):
-                    ax.annotate(f'$a_{{{n}}}={term}$', (n, term), textcoords="offset points",
-                               xytext=(5, 8), fontsize=10, color=POINT_COLOR)
-
-                if show_sum:
-                    cumsum = np.cumsum(terms)
-                    ax.plot(n_values, cumsum, color=CURVE_COLOR, linestyle='--', marker='s',
-                           linewidth=1, markersize=4)
-                    # 누적합 직접 레이블
-                    last_n = list(n_values)[-1]
-                    last_sum = cumsum[-1]
-                    ax.annotate(r'$S_n$', (last_n, last_sum),
-                               textcoords="offset points", xytext=(8, 0),
-                               fontsize=10, color=POINT_COLOR)
+                    # y 범위 설정
+                    if y_range:
+                        ax.set_ylim(y_range)
 
+            # 공통 설정 (수직선 제외)
+            if graph_type not in ['number_line', 'statistics']:
                 # 눈금과 숫자 제거
                 ax.set_xticks([])
                 ax.set_yticks([])
 
-                # 축 끝에 직접 n, a_n 레이블 표시
+                # 축 테두리 제거 (상단, 우측)
                 ax.spines['top'].set_visible(False)
                 ax.spines['right'].set_visible(False)
-                n_lim = ax.get_xlim()
-                a_lim = ax.get_ylim()
-                ax.annotate('$n$', xy=(n_lim[1], 0), xytext=(n_lim[1] + 0.2, 0),
-                           fontsize=14, ha='left', va='center')
-                ax.annotate('$a_n$', xy=(0, a_lim[1]), xytext=(0, a_lim[1] + 0.2),
-                           fontsize=14, ha='center', va='bottom')
-                if formula:
-                    # formula가 $ 기호를 포함하지 않으면 추가
-                    if '$' not in formula:
-                        formula = f'${formula}$'
-                    ax.set_title(f'수열: {formula}', fontsize=12)
-                plot_success = True
-
-        elif graph_type == 'number_line':
-            # 수직선 (수능 스타일)
-            points_data = plot_data.get('points', [])
-            labels = plot_data.get('labels', [])
-            intervals = plot_data.get('intervals', [])
-
-            # 범위 계산
-            all_points = list(points_data)
-            for interval in intervals:
-                all_points.extend([interval.get('start', 0), interval.get('end', 1)])
 
-            if all_points:
-                min_val = min(all_points) - 1
-                max_val = max(all_points) + 1
-            else:
-                min_val, max_val = -5, 5
-
-            # 수직선 그리기 (수능 스타일: 검정 선)
-            ax.axhline(y=0, color='black', linewidth=1.5)
-            ax.set_xlim(min_val, max_val)
-            ax.set_ylim(-0.5, 0.5)
-
-            # 눈금 (수능 스타일: 검정)
-            tick_vals = range(int(min_val), int(max_val) + 1)
-            for t in tick_vals:
-                ax.plot([t, t], [-0.08, 0.08], 'k-', linewidth=1)
-                ax.text(t, -0.2, str(t), ha='center', fontsize=10, color='black')
-
-            # 구간 표시 (수능 스타일: 회색)
-            for interval in intervals:
-                start = interval.get('start', 0)
-                end = interval.get('end', 1)
-                open_start = interval.get('open_start', False)
-                open_end = interval.get('open_end', False)
-
-                ax.plot([start, end], [0, 0], color=SHADE_COLOR, linewidth=3, alpha=0.6)
-                ax.plot(start, 0, 'ko',
-                       markersize=6, markerfacecolor='black' if not open_start else 'white',
-                       markeredgecolor='black', markeredgewidth=1.5)
-                ax.plot(end, 0, 'ko',
-                       markersize=6, markerfacecolor='black' if not open_end else 'white',
-                       markeredgecolor='black', markeredgewidth=1.5)
-
-            # 점 표시 (수능 스타일: 검정 점)
-            for i, p in enumerate(points_data):
-                ax.plot(p, 0, 'ko', markersize=5, zorder=5)
-                label = labels[i] if i < len(labels) else str(p)
-                ax.annotate(label, (p, 0), textcoords="offset points",
-                           xytext=(0, 12), fontsize=11, ha='center', color='black')
-
-            ax.set_yticks([])
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-            ax.spines['left'].set_visible(False)
-            plot_success = True
-
-        elif graph_type == 'region':
-            # 두 곡선 사이의 영역 (수능 스타일: 검정 곡선, 회색 음영)
-            functions = plot_data.get('functions', [])
-            x_range = plot_data.get('x_range', [0, 2])
-            y_range = plot_data.get('y_range', None)
-            vertical_lines = plot_data.get('vertical_lines', [])
-            fill_between_idx = plot_data.get('fill_between', [0, 1])
-            points = plot_data.get('points', [])
-
-            if functions and len(functions) >= 1:
-                # x 범위 생성 (전체 그래프용)
-                x_full = np.linspace(x_range[0] - 1, x_range[1] + 1, 400)
-                # 영역 채우기용 x 범위
-                x_fill = np.linspace(x_range[0], x_range[1], 200)
-
-                safe_dict = {
-                    'x': None, 'np': np, 'sin': np.sin, 'cos': np.cos,
-                    'tan': np.tan, 'exp': np.exp, 'log': np.log,
-                    'sqrt': np.sqrt, 'abs': np.abs, 'pi': np.pi,
-                    'e': np.e, 'log10': np.log10, 'log2': np.log2
-                }
+                # 화살표 축 스타일 설정
+                ax.spines['bottom'].set_position('zero')
+                ax.spines['left'].set_position('zero')
+                ax.spines['bottom'].set_color('k')
+                ax.spines['left'].set_color('k')
 
-                y_values_full = []
-                y_values_fill = []
-                labels_list = []
-
-                for i, func_str in enumerate(functions):
-                    try:
-                        # 함수식 전처리
-                        eval_func = func_str.replace('^', '**')
-
-                        # 전체 범위 계산
-                        safe_dict['x'] = x_full
-                        y_full = eval(eval_func, {"__builtins__": {}}, safe_dict)
-                        if np.isscalar(y_full):
-                            y_full = np.full_like(x_full, y_full)
-                        y_values_full.append(y_full)
-
-                        # 채우기 범위 계산
-                        safe_dict['x'] = x_fill
-                        y_fill = eval(eval_func, {"__builtins__": {}}, safe_dict)
-                        if np.isscalar(y_fill):
-                            y_fill = np.full_like(x_fill, y_fill)
-                        y_values_fill.append(y_fill)
-
-                        # 라벨 생성: 실제 수식을 LaTeX 형식으로 변환
-                        display_func = func_str.replace('**', '^').replace('*', '')
-                        display_func = display_func.replace('sqrt', r'\sqrt')
-                        display_func = display_func.replace('pi', r'\pi')
-                        # x^2 -> x² 형태의 LaTeX
-                        labels_list.append(f'$y={display_func}$')
+                # 축 끝에 직접 x, y 레이블 표시
+                x_lim = ax.get_xlim()
+                y_lim = ax.get_ylim()
+                ax.annotate('$x$', xy=(x_lim[1], 0), xytext=(x_lim[1] + 0.1, 0),
+                           fontsize=14, ha='left', va='center')
+                ax.annotate('$y$', xy=(0, y_lim[1]), xytext=(0, y_lim[1] + 0.2),
+                           fontsize=14, ha='center', va='bottom')
 
-                        # 곡선 그리기 (수능 스타일: 모두 검정)
-                        ax.plot(x_full, y_full, color=CURVE_COLOR, linewidth=1.5)
-                        plot_success = True
-                    except Exception as e:
-                        print(f"함수 {i} 오류: {e}")
-                        continue
-
-                # 각 곡선에 직접 레이블 표시 (수능 스타일: 심플하게)
-                # 레이블 위치를 함수별로 다르게 해서 겹침 방지
-                label_positions = [0.85, 0.15, 0.5, 0.3, 0.7]  # 각 함수의 x 위치 비율
-                for i, (y_full, label_text) in enumerate(zip(y_values_full, labels_list)):
-                    # 레이블 위치: 함수별로 다른 x 위치
-                    pos_ratio = label_positions[i % len(label_positions)]
-                    label_x_idx = int(len(x_full) * pos_ratio)
-                    label_x = x_full[label_x_idx]
-                    label_y = y_full[label_x_idx]
-                    # 수능 스타일: 박스 없이 심플하게
-                    ax.annotate(label_text, (label_x, label_y),
-                               textcoords="offset points", xytext=(5, 5),
-                               fontsize=10, color=CURVE_COLOR)
-
-                # 두 곡선 사이 영역 채우기 (수능 스타일: 회색)
-                if len(y_values_fill) >= 2:
-                    # fill_between_idx가 리스트인지 딕셔너리인지 확인
-                    if isinstance(fill_between_idx, list) and len(fill_between_idx) >= 2:
-                        idx1, idx2 = fill_between_idx[0], fill_between_idx[1]
-                    elif isinstance(fill_between_idx, dict):
-                        idx1, idx2 = fill_between_idx.get(0, 0), fill_between_idx.get(1, 1)
-                    else:
-                        idx1, idx2 = 0, 1  # 기본값
-
-                    if idx1 < len(y_values_fill) and idx2 < len(y_values_fill):
-                        ax.fill_between(x_fill, y_values_fill[idx1], y_values_fill[idx2],
-                                       alpha=SHADE_ALPHA, color=SHADE_COLOR)
-
-                # 수직선 그리기 (수능 스타일: 검정 점선)
-                for vline in vertical_lines:
-                    ax.axvline(x=vline, color=DASHED_COLOR, linewidth=1, linestyle='--')
+                # 그리드 제거
+            elif graph_type == 'statistics' and plot_data.get('chart_type') not in ['pie']:
+                ax.grid(True, alpha=0.3, axis='y')
 
-                # 점 표시 (수능 스타일: 검정 점)
-                for pt in points:
-                    if len(pt) >= 2:
-                        px, py = pt[0], pt[1]
-                        label = pt[2] if len(pt) > 2 else f'({px}, {py})'
-                        ax.plot(px, py, 'ko', markersize=5, zorder=5)
-                        ax.annotate(label, (px, py), textcoords="offset points",
-                                   xytext=(5, 5), fontsize=10, color=POINT_COLOR)
+            title = graph_info.get('description', '')
+            if title and graph_type != 'number_line':
+                # 제목에 수식 표시 지원
+                ax.set_title(title, fontsize=13, pad=10)
 
-                # y 범위 설정
-                if y_range:
-                    ax.set_ylim(y_range)
+            # 범례는 곡선에 직접 레이블로 표시하므로 사용하지 않음
 
-        # 공통 설정 (수직선 제외)
-        if graph_type not in ['number_line', 'statistics']:
-            # 눈금과 숫자 제거
-            ax.set_xticks([])
-            ax.set_yticks([])
-
-            # 축 테두리 제거 (상단, 우측)
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-
-            # 화살표 축 스타일 설정
-            ax.spines['bottom'].set_position('zero')
-            ax.spines['left'].set_position('zero')
-            ax.spines['bottom'].set_color('k')
-            ax.spines['left'].set_color('k')
-
-            # 축 끝에 직접 x, y 레이블 표시
-            x_lim = ax.get_xlim()
-            y_lim = ax.get_ylim()
-            ax.annotate('$x$', xy=(x_lim[1], 0), xytext=(x_lim[1] + 0.1, 0),
-                       fontsize=14, ha='left', va='center')
-            ax.annotate('$y$', xy=(0, y_lim[1]), xytext=(0, y_lim[1] + 0.2),
-                       fontsize=14, ha='center', va='bottom')
-
-            # 그리드 제거
-        elif graph_type == 'statistics' and plot_data.get('chart_type') not in ['pie']:
-            ax.grid(True, alpha=0.3, axis='y')
-
-        title = graph_info.get('description', '')
-        if title and graph_type != 'number_line':
-            # 제목에 수식 표시 지원
-            ax.set_title(title, fontsize=13, pad=10)
-
-        # 범례는 곡선에 직접 레이블로 표시하므로 사용하지 않음
-
-        # 파일로 저장하거나 base64로 반환
-        if output_path:
-            # 파일로 저장
-            plt.savefig(output_path, format='png', dpi=120, bbox_inches='tight', facecolor='white')
-            plt.close(fig)
-            return output_path
-        else:
-            # base64로 변환
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png', dpi=120, bbox_inches='tight', facecolor='white')
-            buf.seek(0)
-            img_base64 = base64.b64encode(buf.read()).decode('utf-8')
-            plt.close(fig)
-            return f"data:image/png;base64,{img_base64}"
+            return renderer.save(fig, fmt=fmt)
 
     except Exception as e:
         print(f"그래프 생성 오류: {e}")
@@ -1078,7 +1151,7 @@ Python 코드만 출력하세요. 마크다운 코드 블록 없이 순수 코
 
 def generate_variant_code(question_data: dict) -> str:
     """원본 문제를 분석하여 변형 문제 생성 Python 코드를 생성합니다."""
-    model_name = 'gemini-2.0-flash'
+    model_name = get_model('generate_variant_code', 'gemini-2.0-flash')
 
     # 코드 생성이므로 text 모드 사용
     generation_config = {
@@ -1279,7 +1352,8 @@ def generate_variants_via_code(question_data: dict, max_retries: int = 3, progre
         report_progress('code_gen', 10 + retry * 5, f'Python 코드 생성 중... (시도 {retry + 1}/{max_retries})', {'retry': retry + 1, 'max_retries': max_retries})
 
         # 1. 변형 문제 생성 코드 생성
-        code = generate_variant_code(question_data)
+        with span('variants.code_gen', attempt=retry + 1):
+            code = generate_variant_code(question_data)
         report_progress('code_gen', 20, f'코드 생성 완료 ({len(code)} bytes)', {'code_length': len(code)})
 
         # 2. 코드 실행하여 변형 문제 생성
@@ -1289,22 +1363,23 @@ def generate_variants_via_code(question_data: dict, max_retries: int = 3, progre
 
         variant_id = 1
         total_count = sum(count for _, count in difficulties)
-        for difficulty, count in difficulties:
-            for i in range(count):
-                variant = execute_variant_code(code, difficulty, variant_id)
-                variants.append(variant)
-                if variant.get('error'):
-                    error_count += 1
-                    last_error = variant.get('error')
-                variant_id += 1
-                # 각 변형 생성마다 진행률 업데이트
-                progress = 25 + int((variant_id / total_count) * 15)
-                report_progress('exec_code', progress, f'변형 문제 생성 중... ({variant_id}/{total_count})', {
-                    'current': variant_id,
-                    'total': total_count,
-                    'difficulty': difficulty,
-                    'errors': error_count
-                })
+        with span('variants.exec_code', attempt=retry + 1):
+            for difficulty, count in difficulties:
+                for i in range(count):
+                    variant = execute_variant_code(code, difficulty, variant_id)
+                    variants.append(variant)
+                    if variant.get('error'):
+                        error_count += 1
+                        last_error = variant.get('error')
+                    variant_id += 1
+                    # 각 변형 생성마다 진행률 업데이트
+                    progress = 25 + int((variant_id / total_count) * 15)
+                    report_progress('exec_code', progress, f'변형 문제 생성 중... ({variant_id}/{total_count})', {
+                        'current': variant_id,
+                        'total': total_count,
+                        'difficulty': difficulty,
+                        'errors': error_count
+                    })
 
         # 오류 비율 확인 (50% 이상 오류면 재시도)
         error_rate = error_count / len(variants) if variants else 1
@@ -1320,7 +1395,8 @@ def generate_variants_via_code(question_data: dict, max_retries: int = 3, progre
 
     # 3. 원본 문제 풀이 생성
     report_progress('solve_original', 45, '원본 문제 풀이 생성 중...', {})
-    original_solution = solve_original_question(question_data)
+    with span('variants.solve_original'):
+        original_solution = solve_original_question(question_data)
     report_progress('solve_original', 50, '원본 문제 풀이 완료', {})
 
     original = {
@@ -1341,154 +1417,155 @@ def generate_variants_via_code(question_data: dict, max_retries: int = 3, progre
     }
 
     # 4. 정답 검증 - 코드 방식은 로컬 검증 먼저 수행 후 필요시 LLM 검증
-    report_progress('verify', 55, '정답 검증 시작...', {'method': '로컬 검증 + LLM'})
-    TARGET_VERIFIED_COUNT = 10  # 목표 검증된 문제 수
-    MAX_TOTAL_ATTEMPTS = 20  # 최대 총 시도 횟수 (무한 루프 방지)
-
-    def quick_verify(variant):
-        """정답이 선택지에 포함되어 있는지 빠르게 확인"""
-        answer = str(variant.get('answer', '')).strip()
-        choices = variant.get('choices', [])
-
-        if not answer or not choices:
-            return None  # 확인 불가
-
-        # 정답이 ①②③④⑤ 형태인 경우
-        for choice in choices:
-            choice_num = choice.get('number', '')
-            if answer == choice_num:
-                return True
-
-        # 정답이 선택지 텍스트와 일치하는 경우
-        for choice in choices:
-            choice_text = str(choice.get('text', '')).strip()
-            if answer == choice_text:
-                return True
-
-        return None  # LLM 검증 필요
-
-    verified_variants = []
-    discarded_count = 0
-    llm_verified_count = 0
-    total_attempts = 0
-    variant_id_counter = len(variants) + 1
-
-    # 기존 생성된 변형들 먼저 검증
-    for i, variant in enumerate(variants):
-        if len(verified_variants) >= TARGET_VERIFIED_COUNT:
-            break
-
-        total_attempts += 1
-        progress = 55 + int((len(verified_variants) / TARGET_VERIFIED_COUNT) * 30)
+    with span('variants.verify'):
+        report_progress('verify', 55, '정답 검증 시작...', {'method': '로컬 검증 + LLM'})
+        TARGET_VERIFIED_COUNT = 10  # 목표 검증된 문제 수
+        MAX_TOTAL_ATTEMPTS = 20  # 최대 총 시도 횟수 (무한 루프 방지)
+
+        def quick_verify(variant):
+            """정답이 선택지에 포함되어 있는지 빠르게 확인"""
+            answer = str(variant.get('answer', '')).strip()
+            choices = variant.get('choices', [])
+
+            if not answer or not choices:
+                return None  # 확인 불가
+
+            # 정답이 ①②③④⑤ 형태인 경우
+            for choice in choices:
+                choice_num = choice.get('number', '')
+                if answer == choice_num:
+                    return True
+
+            # 정답이 선택지 텍스트와 일치하는 경우
+            for choice in choices:
+                choice_text = str(choice.get('text', '')).strip()
+                if answer == choice_text:
+                    return True
+
+            return None  # LLM 검증 필요
+
+        verified_variants = []
+        discarded_count = 0
+        llm_verified_count = 0
+        total_attempts = 0
+        variant_id_counter = len(variants) + 1
+
+        # 기존 생성된 변형들 먼저 검증
+        for i, variant in enumerate(variants):
+            if len(verified_variants) >= TARGET_VERIFIED_COUNT:
+                break
 
-        if variant.get('error'):
-            report_progress('verify', progress, f'변형 {i+1}: 코드 실행 오류 - 폐기', {'variant_id': i+1, 'status': 'error'})
-            discarded_count += 1
-            continue
+            total_attempts += 1
+            progress = 55 + int((len(verified_variants) / TARGET_VERIFIED_COUNT) * 30)
 
-        if not variant.get('answer') or not variant.get('choices'):
-            report_progress('verify', progress, f'변형 {i+1}: 정답/선택지 없음 - 폐기', {'variant_id': i+1, 'status': 'invalid'})
-            discarded_count += 1
-            continue
+            if variant.get('error'):
+                report_progress('verify', progress, f'변형 {i+1}: 코드 실행 오류 - 폐기', {'variant_id': i+1, 'status': 'error'})
+                discarded_count += 1
+                continue
 
-        # 1단계: 로컬 검증
-        local_result = quick_verify(variant)
-        if local_result is True:
-            # 정답이 선택지에 있음 - 로컬 검증 통과
-            variant['verification'] = {
-                "is_correct": True,
-                "verified_answer": variant.get('answer'),
-                "verification_steps": "로컬 검증: 정답이 선택지에 포함됨",
-                "confidence": "high"
-            }
-            verified_variants.append(variant)
-            report_progress('verify', progress, f'변형 {i+1}: 로컬 검증 통과 ({len(verified_variants)}/{TARGET_VERIFIED_COUNT})', {
-                'variant_id': i+1, 'status': 'local_pass', 'verified': len(verified_variants), 'target': TARGET_VERIFIED_COUNT
-            })
-            continue
+            if not variant.get('answer') or not variant.get('choices'):
+                report_progress('verify', progress, f'변형 {i+1}: 정답/선택지 없음 - 폐기', {'variant_id': i+1, 'status': 'invalid'})
+                discarded_count += 1
+                continue
 
-        # 2단계: LLM 검증 (로컬 검증 불가한 경우)
-        report_progress('verify', progress, f'변형 {i+1}: LLM 검증 중...', {'variant_id': i+1, 'status': 'llm_verifying'})
-        llm_verified_count += 1
-        verification = verify_answer(
-            variant.get('question_text', ''),
-            variant.get('choices', []),
-            variant.get('answer', ''),
-            variant.get('explanation', '')
-        )
-        variant['verification'] = verification
-
-        # 검증 성공 (is_correct가 True 또는 False - null이 아님)
-        if verification.get('is_correct') is not None:
-            verified_variants.append(variant)
-            report_progress('verify', progress, f'변형 {i+1}: LLM 검증 완료 ({len(verified_variants)}/{TARGET_VERIFIED_COUNT})', {
-                'variant_id': i+1, 'status': 'llm_pass', 'verified': len(verified_variants), 'target': TARGET_VERIFIED_COUNT
-            })
-        else:
-            report_progress('verify', progress, f'변형 {i+1}: 검증 불가 - 폐기', {'variant_id': i+1, 'status': 'llm_fail'})
-            discarded_count += 1
-
-    # 목표 개수에 미달하면 추가 생성
-    while len(verified_variants) < TARGET_VERIFIED_COUNT and total_attempts < MAX_TOTAL_ATTEMPTS:
-        total_attempts += 1
-        needed = TARGET_VERIFIED_COUNT - len(verified_variants)
-        print(f"  📝 추가 문제 생성 필요: {needed}개 (시도 {total_attempts}/{MAX_TOTAL_ATTEMPTS})")
-
-        # 난이도 균형 맞추기
-        difficulty_counts = {"쉬움": 0, "보통": 0, "어려움": 0}
-        for v in verified_variants:
-            d = v.get('difficulty', '보통')
-            if d in difficulty_counts:
-                difficulty_counts[d] += 1
-
-        # 가장 부족한 난이도 선택
-        target_counts = {"쉬움": 3, "보통": 4, "어려움": 3}
-        difficulty = "보통"
-        max_deficit = 0
-        for d, target in target_counts.items():
-            deficit = target - difficulty_counts[d]
-            if deficit > max_deficit:
-                max_deficit = deficit
-                difficulty = d
-
-        # 새 문제 생성
-        new_variant = execute_variant_code(code, difficulty, variant_id_counter)
-        variant_id_counter += 1
-
-        if new_variant.get('error') or not new_variant.get('answer') or not new_variant.get('choices'):
-            print(f"    ❌ 문제 생성 실패 - 재시도")
-            discarded_count += 1
-            continue
+            # 1단계: 로컬 검증
+            local_result = quick_verify(variant)
+            if local_result is True:
+                # 정답이 선택지에 있음 - 로컬 검증 통과
+                variant['verification'] = {
+                    "is_correct": True,
+                    "verified_answer": variant.get('answer'),
+                    "verification_steps": "로컬 검증: 정답이 선택지에 포함됨",
+                    "confidence": "high"
+                }
+                verified_variants.append(variant)
+                report_progress('verify', progress, f'변형 {i+1}: 로컬 검증 통과 ({len(verified_variants)}/{TARGET_VERIFIED_COUNT})', {
+                    'variant_id': i+1, 'status': 'local_pass', 'verified': len(verified_variants), 'target': TARGET_VERIFIED_COUNT
+                })
+                continue
 
-        # 로컬 검증 먼저
-        local_result = quick_verify(new_variant)
-        if local_result is True:
-            new_variant['verification'] = {
-                "is_correct": True,
-                "verified_answer": new_variant.get('answer'),
-                "verification_steps": "로컬 검증: 정답이 선택지에 포함됨",
-                "confidence": "high"
-            }
-            print(f"    ✅ 로컬 검증 통과")
-            verified_variants.append(new_variant)
-            continue
+            # 2단계: LLM 검증 (로컬 검증 불가한 경우)
+            report_progress('verify', progress, f'변형 {i+1}: LLM 검증 중...', {'variant_id': i+1, 'status': 'llm_verifying'})
+            llm_verified_count += 1
+            verification = verify_answer(
+                variant.get('question_text', ''),
+                variant.get('choices', []),
+                variant.get('answer', ''),
+                variant.get('explanation', '')
+            )
+            variant['verification'] = verification
+
+            # 검증 성공 (is_correct가 True 또는 False - null이 아님)
+            if verification.get('is_correct') is not None:
+                verified_variants.append(variant)
+                report_progress('verify', progress, f'변형 {i+1}: LLM 검증 완료 ({len(verified_variants)}/{TARGET_VERIFIED_COUNT})', {
+                    'variant_id': i+1, 'status': 'llm_pass', 'verified': len(verified_variants), 'target': TARGET_VERIFIED_COUNT
+                })
+            else:
+                report_progress('verify', progress, f'변형 {i+1}: 검증 불가 - 폐기', {'variant_id': i+1, 'status': 'llm_fail'})
+                discarded_count += 1
+
+        # 목표 개수에 미달하면 추가 생성
+        while len(verified_variants) < TARGET_VERIFIED_COUNT and total_attempts < MAX_TOTAL_ATTEMPTS:
+            total_attempts += 1
+            needed = TARGET_VERIFIED_COUNT - len(verified_variants)
+            print(f"  📝 추가 문제 생성 필요: {needed}개 (시도 {total_attempts}/{MAX_TOTAL_ATTEMPTS})")
+
+            # 난이도 균형 맞추기
+            difficulty_counts = {"쉬움": 0, "보통": 0, "어려움": 0}
+            for v in verified_variants:
+                d = v.get('difficulty', '보통')
+                if d in difficulty_counts:
+                    difficulty_counts[d] += 1
+
+            # 가장 부족한 난이도 선택
+            target_counts = {"쉬움": 3, "보통": 4, "어려움": 3}
+            difficulty = "보통"
+            max_deficit = 0
+            for d, target in target_counts.items():
+                deficit = target - difficulty_counts[d]
+                if deficit > max_deficit:
+                    max_deficit = deficit
+                    difficulty = d
+
+            # 새 문제 생성
+            new_variant = execute_variant_code(code, difficulty, variant_id_counter)
+            variant_id_counter += 1
+
+            if new_variant.get('error') or not new_variant.get('answer') or not new_variant.get('choices'):
+                print(f"    ❌ 문제 생성 실패 - 재시도")
+                discarded_count += 1
+                continue
 
-        # LLM 검증
-        llm_verified_count += 1
-        verification = verify_answer(
-            new_variant.get('question_text', ''),
-            new_variant.get('choices', []),
-            new_variant.get('answer', ''),
-            new_variant.get('explanation', '')
-        )
-        new_variant['verification'] = verification
+            # 로컬 검증 먼저
+            local_result = quick_verify(new_variant)
+            if local_result is True:
+                new_variant['verification'] = {
+                    "is_correct": True,
+                    "verified_answer": new_variant.get('answer'),
+                    "verification_steps": "로컬 검증: 정답이 선택지에 포함됨",
+                    "confidence": "high"
+                }
+                print(f"    ✅ 로컬 검증 통과")
+                verified_variants.append(new_variant)
+                continue
 
-        if verification.get('is_correct') is not None:
-            print(f"    ✅ LLM 검증 완료!")
-            verified_variants.append(new_variant)
-        else:
-            print(f"    ❌ 검증 불가 - 폐기")
-            discarded_count += 1
+            # LLM 검증
+            llm_verified_count += 1
+            verification = verify_answer(
+                new_variant.get('question_text', ''),
+                new_variant.get('choices', []),
+                new_variant.get('answer', ''),
+                new_variant.get('explanation', '')
+            )
+            new_variant['verification'] = verification
+
+            if verification.get('is_correct') is not None:
+                print(f"    ✅ LLM 검증 완료!")
+                verified_variants.append(new_variant)
+            else:
+                print(f"    ❌ 검증 불가 - 폐기")
+                discarded_count += 1
 
     result['variants'] = verified_variants
     result['discarded_count'] = discarded_count
@@ -1504,10 +1581,97 @@ def generate_variants_via_code(question_data: dict, max_retries: int = 3, progre
     return result
 
 
-def generate_html_report(original_question: dict, variants_data: dict, output_path: str) -> str:
-    """변형 문제를 HTML 리포트로 생성합니다."""
+# files 모드 리포트 그래프 파일명: {리포트 이름}_g{내용 해시 12자}.{svg|png}
+REPORT_GRAPH_SRC_RE = re.compile(r'src="([^"/\\]+_g[0-9a-f]{12}\.(svg|png))"')
+
+
+def report_graph_prefix(html_path: str) -> str:
+    return os.path.splitext(os.path.basename(html_path))[0] + '_g'
+
+
+def report_graph_files(html_path: str) -> list:
+    """리포트 옆에 저장된 그래프 파일 경로 목록 (artifact 기록/삭제용)"""
+    folder = os.path.dirname(html_path) or '.'
+    prefix = report_graph_prefix(html_path)
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return []
+    return [
+        os.path.join(folder, name) for name in sorted(names)
+        if name.startswith(prefix) and name.endswith(('.svg', '.png')) and not name.endswith('.tmp')
+    ]
+
+
+def embed_report_graphs(html: str, folder: str) -> str:
+    """files 모드 리포트의 그래프 참조를 data URI로 바꿔 단일 파일로 만듭니다."""
+    def replace(match):
+        try:
+            with open(os.path.join(folder, match.group(1)), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return match.group(0)
+        return f'src="{_graph_output(data, match.group(2))}"'
+    return REPORT_GRAPH_SRC_RE.sub(replace, html)
+
+
+class _ReportGraphs:
+    """리포트 그래프 참조를 만듭니다.
+
+    - inline: base64 data URI (단일 파일 내보내기용)
+    - files: 리포트 옆에 내용 해시 이름으로 저장하고 상대 URL로 참조 (같은 그래프는 파일 하나)
+    """
+
+    def __init__(self, output_path: str, mode: str = 'inline'):
+        if mode not in ('inline', 'files'):
+            raise ValueError(f"지원하지 않는 그래프 모드입니다: {mode}")
+        self.mode = mode
+        self.folder = os.path.dirname(output_path) or '.'
+        self.prefix = report_graph_prefix(output_path)
+        self.img_attrs = ' loading="lazy" decoding="async"' if mode == 'files' else ''
+        self.written = set()
+        self._rendered = {}  # id(graph_info) → render_graphs 결과
+
+    def prefetch(self, graph_infos: list):
+        """리포트의 그래프를 프로세스 풀에서 한 번에 렌더링해 둡니다."""
+        graph_infos = [g for g in graph_infos if isinstance(g, dict)]
+        for graph_info, result in zip(graph_infos, render_graphs(graph_infos, REPORT_GRAPH_FORMAT)):
+            self._rendered[id(graph_info)] = result
+            if result and not result['ok']:
+                print(f"⚠️ 그래프 렌더링 실패: {result['error']}")
+
+    def src(self, graph_info: dict):
+        if id(graph_info) in self._rendered:
+            result = self._rendered[id(graph_info)]
+        else:
+            result = render_graphs([graph_info], REPORT_GRAPH_FORMAT)[0]
+        if not result or not result['ok']:
+            return None
+        data, fmt = result['data'], result['fmt']
+        if self.mode == 'inline':
+            return _graph_output(data, fmt)
+        name = f"{self.prefix}{hashlib.sha256(data).hexdigest()[:12]}.{fmt}"
+        if name not in self.written:
+            path = os.path.join(self.folder, name)
+            tmp_path = f'{path}.{uuid.uuid4().hex[:8]}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self.written.add(name)
+        return name
+
+
+@traced('variants.report')
+def generate_html_report(original_question: dict, variants_data: dict, output_path: str,
+                         graph_mode: str = 'inline') -> str:
+    """변형 문제를 HTML 리포트로 생성합니다.
+
+    graph_mode: 'inline'이면 그래프를 base64로 넣은 단일 파일,
+                'files'면 리포트 옆에 그래프 파일을 쓰고 URL로 참조 (loading="lazy")
+    """
 
     output_folder = os.path.dirname(output_path)
+    graphs = _ReportGraphs(output_path, graph_mode)
 
     html_template = """<!DOCTYPE html>
 <html lang="ko">
@@ -1810,14 +1974,16 @@ def generate_html_report(original_question: dict, variants_data: dict, output_pa
     original_graph_html = ""
     original_question_graph_html = ""
     original_graph_info = original_data.get('graph_info', {})
+    # 원본 + 변형 문제 그래프를 한꺼번에 병렬 렌더링
+    graphs.prefetch([original_graph_info] + [v.get('graph_info') for v in variants_data.get('variants', [])])
     # graph_info가 딕셔너리인지 확인
     if isinstance(original_graph_info, dict) and original_graph_info.get('type') and original_graph_info.get('type') != 'none':
-        graph_base64 = generate_graph(original_graph_info, None, 'original')
-        if graph_base64:
+        graph_src = graphs.src(original_graph_info)
+        if graph_src:
             graph_html_content = f'''
             <div class="graph-container">
                 <p><strong>📊 {original_graph_info.get('description', '시각화')}:</strong></p>
-                <img src="{graph_base64}" alt="그래프">
+                <img src="{graph_src}" alt="그래프"{graphs.img_attrs}>
             </div>
             '''
             # show_in_question이 true면 문제 영역에도 표시
@@ -1915,13 +2081,13 @@ def generate_html_report(original_question: dict, variants_data: dict, output_pa
             graph_info = variant.get('graph_info', {})
             # graph_info가 딕셔너리인지 확인
             if isinstance(graph_info, dict) and graph_info.get('type') and graph_info.get('type') != 'none':
-                graph_base64 = generate_graph(graph_info, None, str(vid))
-                if graph_base64:
+                graph_src = graphs.src(graph_info)
+                if graph_src:
                     graph_desc = graph_info.get('description', '시각화')
                     graph_content = f'''
                     <div class="graph-container">
                         <p><strong>📊 {graph_desc}:</strong></p>
-                        <img src="{graph_base64}" alt="그래프">
+                        <img src="{graph_src}" alt="그래프"{graphs.img_attrs}>
                     </div>
                     '''
                     # show_in_question이 true면 문제 영역에도 표시
@@ -86,6 +86,7 @@ class UsageStats:
     calls_by_model: dict = field(default_factory=dict)
     calls_by_operation: dict = field(default_factory=dict)
     call_history: list = field(default_factory=list)
+    routing: dict = field(default_factory=dict)
     session_start: str = field(default_factory=lambda: datetime.now().isoformat())
 
 
@@ -126,6 +127,7 @@ class LLMTracker:
                         calls_by_model=data.get('calls_by_model', {}),
                         calls_by_operation=data.get('calls_by_operation', {}),
                         call_history=data.get('call_history', [])[-100:],  # 최근 100개만
+                        routing=data.get('routing', {}),
                         session_start=data.get('first_call', datetime.now().isoformat())
                     )
                     print(f"📊 LLM 통계 로드 완료: 총 {stats.total_calls}회 호출, ${stats.total_cost:.6f}")
@@ -150,6 +152,7 @@ class LLMTracker:
                 'calls_by_model': self.stats.calls_by_model,
                 'calls_by_operation': self.stats.calls_by_operation,
                 'call_history': self.stats.call_history[-100:],  # 최근 100개만
+                'routing': self.stats.routing,
                 'first_call': self.stats.session_start,
                 'last_updated': datetime.now().isoformat()
             }
@@ -272,6 +275,64 @@ class LLMTracker:
 
         return call
 
+    def track_routing(
+        self,
+        operation: str,
+        chain: list,
+        model_used: str,
+        attempts: list,
+        reasons: list = None
+    ) -> dict:
+        """모델 라우팅 결정과 절감 효과를 기록합니다.
+
+        Args:
+            operation: 작업 이름
+            chain: 시도 가능한 모델 체인 (마지막이 최종 에스컬레이션 모델)
+            model_used: 최종 결과를 낸 모델
+            attempts: 시도별 APICall 목록
+            reasons: 에스컬레이션을 유발한 휴리스틱 실패 목록
+        """
+        reasons = reasons or []
+        baseline_model = chain[-1] if chain else model_used
+        actual_cost = sum(a.total_cost for a in attempts)
+        actual_latency = sum(a.latency_ms for a in attempts)
+        # 처음부터 최종 모델을 썼다면 들었을 비용 (마지막 시도의 토큰 기준)
+        if attempts:
+            last = attempts[-1]
+            _, _, baseline_cost = self.calculate_cost(baseline_model, last.input_tokens, last.output_tokens)
+        else:
+            baseline_cost = 0.0
+        saved_cost = baseline_cost - actual_cost
+        escalated = len(attempts) > 1
+
+        decision = {
+            "timestamp": datetime.now().isoformat(),
+            "operation": operation,
+            "model_used": model_used,
+            "models_tried": [a.model for a in attempts],
+            "escalated": escalated,
+            "reasons": reasons,
+            "saved_cost": saved_cost,
+            "latency_ms": actual_latency
+        }
+
+        with self._call_lock:
+            entry = self.stats.routing.setdefault(operation, {
+                "requests": 0, "escalations": 0, "accepted_by_model": {},
+                "escalation_reasons": {}, "saved_cost": 0.0, "recent": []
+            })
+            entry["requests"] += 1
+            if escalated:
+                entry["escalations"] += 1
+            entry["accepted_by_model"][model_used] = entry["accepted_by_model"].get(model_used, 0) + 1
+            for reason in reasons:
+                entry["escalation_reasons"][reason] = entry["escalation_reasons"].get(reason, 0) + 1
+            entry["saved_cost"] += saved_cost
+            entry["recent"] = (entry["recent"] + [decision])[-20:]
+            self._save_stats()
+
+        return decision
+
     def get_stats(self) -> dict:
         """현재 사용량 통계를 반환합니다"""
         with self._call_lock:
@@ -287,7 +348,11 @@ class LLMTracker:
                 "total_cost_krw": round(self.stats.total_cost * 1350, 2),  # 대략적인 환율
                 "by_model": dict(self.stats.calls_by_model),
                 "by_operation": dict(self.stats.calls_by_operation),
-                "recent_calls": self.stats.call_history[-10:]  # 최근 10개 호출
+                "recent_calls": self.stats.call_history[-10:],  # 최근 10개 호출
+                "routing": {
+                    op: {k: v for k, v in data.items() if k != 'recent'}
+                    for op, data in self.stats.routing.items()
+                }
             }
 
     def reset_stats(self):
@@ -319,6 +384,12 @@ class LLMTracker:
         for op, data in stats['by_operation'].items():
             lines.append(f"  • {op}: {data['calls']}회, {data['input_tokens'] + data['output_tokens']:,} 토큰")
 
+        if stats['routing']:
+            lines.append("")
+            lines.append("🔀 모델 라우팅:")
+            for op, data in stats['routing'].items():
+                lines.append(f"  • {op}: {data['requests']}회 중 에스컬레이션 {data['escalations']}회, 절감 ${data['saved_cost']:.6f}")
+
         return "\n".join(lines)
 
 
@@ -1,13 +1,83 @@
 # utils 패키지
 from .json_parser import fix_json_escape, fix_latex_in_json, parse_gemini_json
-from .image import crop_image_by_bbox
+from .image import crop_image_by_bbox, generate_thumbnails, get_thumbnail, thumbnail_version
 from .llm import ask_llm_to_fix_error, ask_llm_to_fix_json_error
+from .tracing import Trace, current_trace, span, traced, save_trace, load_traces
+from .model_router import get_model_chain, get_model, check_analysis_result
+from .session_catalog import SessionCatalog
+from .storage import atomic_write_json, read_json, session_lock, write_versioned_json, VersionConflict
+from .blob_store import BlobStore
+from .variant_store import write_variant_set, read_variant_set, read_header, read_variants
+from .variant_manifest import load_manifest, update_manifest, rebuild_manifest, list_entries
+from .variant_pool import VariantPool, get_pool
+from .graph_renderer import GraphRenderer, get_renderer
+from .render_cache import RenderCache
+from .svg_graph import render_svg
+from .render_pool import RenderPool
+from .expression import compile_expression, ExpressionError
+from .sampling import adaptive_sample, sample_function
+from .figure_ir import figure_from_graph, figure_from_elements, to_function_plot
+from .jobs import JobStream, JobExecutor, start_job
+from .artifacts import send_artifact, record_artifact, record_artifacts
+from .http_cache import directory_validator, version_validator, not_modified, with_validator, paginate
 
 __all__ = [
     'fix_json_escape',
     'fix_latex_in_json',
     'parse_gemini_json',
     'crop_image_by_bbox',
+    'generate_thumbnails',
+    'get_thumbnail',
+    'thumbnail_version',
     'ask_llm_to_fix_error',
     'ask_llm_to_fix_json_error',
+    'Trace',
+    'current_trace',
+    'span',
+    'traced',
+    'save_trace',
+    'load_traces',
+    'get_model_chain',
+    'get_model',
+    'check_analysis_result',
+    'SessionCatalog',
+    'directory_validator',
+    'version_validator',
+    'not_modified',
+    'with_validator',
+    'paginate',
+    'send_artifact',
+    'record_artifact',
+    'record_artifacts',
+    'atomic_write_json',
+    'read_json',
+    'session_lock',
+    'write_versioned_json',
+    'VersionConflict',
+    'BlobStore',
+    'write_variant_set',
+    'read_variant_set',
+    'read_header',
+    'read_variants',
+    'load_manifest',
+    'update_manifest',
+    'rebuild_manifest',
+    'list_entries',
+    'VariantPool',
+    'get_pool',
+    'GraphRenderer',
+    'get_renderer',
+    'RenderCache',
+    'render_svg',
+    'RenderPool',
+    'compile_expression',
+    'ExpressionError',
+    'adaptive_sample',
+    'sample_function',
+    'figure_from_graph',
+    'figure_from_elements',
+    'to_function_plot',
+    'JobStream',
+    'JobExecutor',
+    'start_job',
 ]
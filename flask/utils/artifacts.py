@@ -0,0 +1,186 @@
+# utils/artifacts.py
+"""생성 산출물(이미지, 그래프, HTML 리포트, 문제지) 전송 유틸리티
+
+- 파일을 쓸 때 SHA-256 해시를 계산해서 폴더별 .manifest.json에 기록
+- 전송 시 manifest의 해시를 강한 ETag로 사용 (요청마다 다시 계산하지 않음)
+- 내용 해시나 고유 id가 들어간 파일명만 immutable 캐시, 나머지는 no-cache + ETag 재검증
+- Range 요청과 If-None-Match/If-Modified-Since 처리는 send_file(conditional=True)에 위임
+- manifest는 파일 stat(mtime/크기/inode)이 같으면 메모리에 캐시된 것을 사용 (요청마다 JSON 파싱하지 않음)
+- manifest 쓰기는 폴더별 .manifest.lock 파일 잠금으로 다른 워커 프로세스와도 배제
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from flask import send_file
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+
+try:
+    import fcntl
+except ImportError:  # Windows 등 fcntl이 없는 환경은 프로세스 내 잠금만 사용
+    fcntl = None
+
+MANIFEST_FILENAME = '.manifest.json'
+MANIFEST_LOCK_FILENAME = '.manifest.lock'
+# 메모리에 캐시할 manifest 폴더 수
+MANIFEST_CACHE_SIZE = 256
+
+# 다시 쓰이지 않는 파일명: 리포트 그래프 q1_..._g{내용 해시 12자}.svg,
+# 문제지 exam_20240101_120000_{uuid 8자}(_A).html
+# (초 단위 타임스탬프만 있는 q1_20240101_120000.html 등은 같은 이름으로 다시 쓰일 수 있음)
+IMMUTABLE_NAME_RE = re.compile(r'(_g[0-9a-f]{12}|\d{8}_\d{6}_[0-9a-f]{8}(_[A-Za-z0-9]+)?)\.\w+$')
+
+# immutable 산출물 캐시 유지 시간 (1년)
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+_manifest_lock = threading.Lock()
+_cache_lock = threading.Lock()
+# 폴더 → (manifest 파일 stat 키, manifest)
+_manifest_cache = OrderedDict()
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _stat_key(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def _cache_put(directory: str, key, manifest: dict):
+    with _cache_lock:
+        _manifest_cache[directory] = (key, manifest)
+        _manifest_cache.move_to_end(directory)
+        while len(_manifest_cache) > MANIFEST_CACHE_SIZE:
+            _manifest_cache.popitem(last=False)
+
+
+def load_manifest(directory: str) -> dict:
+    """폴더의 manifest를 읽습니다. (없거나 손상되었으면 빈 dict)
+    파일이 바뀌지 않았으면 캐시된 dict를 반환하므로 수정하지 말 것
+    """
+    path = os.path.join(directory, MANIFEST_FILENAME)
+    key = _stat_key(path)
+    if key is None:
+        return {}
+    with _cache_lock:
+        cached = _manifest_cache.get(directory)
+    if cached and cached[0] == key:
+        return cached[1]
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    manifest = manifest if isinstance(manifest, dict) else {}
+    _cache_put(directory, key, manifest)
+    return manifest
+
+
+@contextmanager
+def _locked(directory: str):
+    """manifest 쓰기 잠금 (같은 프로세스의 스레드 + 다른 워커 프로세스)"""
+    with _manifest_lock:
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(directory, MANIFEST_LOCK_FILENAME), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _save_manifest(directory: str, manifest: dict):
+    # 지워진 파일의 항목은 정리 (항목마다 stat하지 않고 목록 한 번으로 확인)
+    existing = set(os.listdir(directory))
+    manifest = {name: entry for name, entry in manifest.items() if name in existing}
+    path = os.path.join(directory, MANIFEST_FILENAME)
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    _cache_put(directory, _stat_key(path), manifest)
+
+
+def _entry_for(path: str) -> dict:
+    st = os.stat(path)
+    return {'sha256': file_sha256(path), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def _is_fresh(entry, path: str) -> bool:
+    """manifest 항목이 현재 파일과 같은지 (크기/mtime 비교)"""
+    if not entry:
+        return False
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    return entry.get('size') == st.st_size and entry.get('mtime_ns') == st.st_mtime_ns
+
+
+def record_artifact(path: str) -> dict:
+    """파일을 쓴 직후 호출해서 해시를 manifest에 기록합니다."""
+    directory, filename = os.path.split(path)
+    entry = _entry_for(path)
+    with _locked(directory):
+        manifest = dict(load_manifest(directory))
+        manifest[filename] = entry
+        _save_manifest(directory, manifest)
+    return entry
+
+
+def record_artifacts(*paths):
+    """여러 파일을 기록합니다. 존재하지 않는 경로는 건너뜁니다."""
+    for path in paths:
+        if path and os.path.exists(path):
+            record_artifact(path)
+
+
+def get_artifact_entry(directory: str, filename: str) -> dict:
+    """manifest 항목을 반환합니다. 기록이 없거나 파일이 바뀌었으면 다시 계산합니다."""
+    path = os.path.join(directory, filename)
+    entry = load_manifest(directory).get(filename)
+    if _is_fresh(entry, path):
+        return entry
+    return record_artifact(path)
+
+
+def send_artifact(directory: str, filename: str, mimetype: str = None):
+    """산출물을 강한 ETag, 캐시 헤더, Range 지원과 함께 전송합니다."""
+    if filename.startswith('.'):
+        # 매니페스트, 캐시 색인 등 내부 파일은 제공하지 않음
+        raise NotFound()
+    path = safe_join(directory, filename)
+    if path is None or not os.path.isfile(path):
+        raise NotFound()
+
+    entry = get_artifact_entry(directory, filename)
+    immutable = bool(IMMUTABLE_NAME_RE.search(filename))
+    response = send_file(
+        path,
+        mimetype=mimetype,
+        etag=entry['sha256'],
+        conditional=True,
+        max_age=IMMUTABLE_MAX_AGE if immutable else None
+    )
+    if immutable:
+        response.cache_control.immutable = True
+    else:
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
@@ -0,0 +1,195 @@
+# utils/blob_store.py
+"""SHA-256 기반 콘텐츠 주소 블롭 저장소
+
+- 업로드 이미지, 크롭 이미지, 그래프 등을 내용 해시(blob id)로 한 번만 저장
+- 세션 메타데이터는 파일명 → blob id 매핑만 보관
+- SQLite 참조 카운트로 마지막 참조가 사라지면 파일 삭제
+- 여러 워커 프로세스가 동시에 써도 되도록 변경은 BEGIN IMMEDIATE 트랜잭션 안에서 수행
+"""
+
+import hashlib
+import mimetypes
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+
+from flask import send_file
+from werkzeug.exceptions import NotFound
+
+from .artifacts import IMMUTABLE_MAX_AGE
+
+BLOB_ID_RE = re.compile(r'^[0-9a-f]{64}$')
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS blobs (
+    id TEXT PRIMARY KEY,
+    ext TEXT,
+    size INTEGER,
+    refcount INTEGER NOT NULL DEFAULT 0,
+    created_at REAL
+);
+'''
+
+
+def _sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class BlobStore:
+    """콘텐츠 주소 블롭 저장소 (root/ab/abcdef...)"""
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.db_path = os.path.join(root, 'blobs.db')
+        self._local = threading.local()
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """스레드별 연결 (트랜잭션은 직접 관리)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        return conn
+
+    def path(self, blob_id: str) -> str:
+        if not BLOB_ID_RE.match(blob_id or ''):
+            raise ValueError(f"잘못된 blob id입니다: {blob_id}")
+        return os.path.join(self.root, blob_id[:2], blob_id)
+
+    def exists(self, blob_id: str) -> bool:
+        return BLOB_ID_RE.match(blob_id or '') is not None and os.path.exists(self.path(blob_id))
+
+    def info(self, blob_id: str):
+        row = self._connect().execute(
+            'SELECT id, ext, size, refcount, created_at FROM blobs WHERE id = ?', (blob_id,)
+        ).fetchone()
+        if not row:
+            return None
+        return dict(zip(('id', 'ext', 'size', 'refcount', 'created_at'), row))
+
+    def put_file(self, src_path: str, ext: str = None, move: bool = False) -> str:
+        """파일을 저장소에 넣고 참조 카운트를 1 올립니다.
+
+        Args:
+            src_path: 원본 파일 경로
+            ext: 확장자 (mimetype 추정용, 기본: 원본 파일 확장자)
+            move: True면 원본 파일을 옮김 (임시 파일용)
+
+        Returns:
+            blob id (SHA-256 hex)
+        """
+        blob_id = _sha256_file(src_path)
+        ext = (ext or os.path.splitext(src_path)[1].lstrip('.')).lower() or None
+        dest = self.path(blob_id)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+
+        # 트랜잭션 밖에서 같은 폴더의 임시 파일로 준비해두고, 안에서는 rename만 수행
+        staged = None
+        if not os.path.exists(dest):
+            staged = f"{dest}.{uuid.uuid4().hex[:8]}.tmp"
+            if move:
+                shutil.move(src_path, staged)
+            else:
+                shutil.copyfile(src_path, staged)
+
+        conn = self._transaction()
+        try:
+            if staged:
+                os.replace(staged, dest)
+                staged = None
+            elif not os.path.exists(dest):
+                # 준비하는 사이 다른 프로세스가 마지막 참조를 지운 경우 (드묾)
+                shutil.copyfile(src_path, dest)
+            conn.execute(
+                'INSERT INTO blobs (id, ext, size, refcount, created_at) VALUES (?, ?, ?, 1, ?) '
+                'ON CONFLICT(id) DO UPDATE SET refcount = refcount + 1',
+                (blob_id, ext, os.path.getsize(dest), time.time())
+            )
+            conn.execute('COMMIT')
+        except (sqlite3.Error, OSError):
+            conn.execute('ROLLBACK')
+            if staged and os.path.exists(staged):
+                os.remove(staged)
+            raise
+        if move and os.path.exists(src_path):
+            os.remove(src_path)
+        return blob_id
+
+    def incref(self, blob_id: str):
+        conn = self._transaction()
+        try:
+            cur = conn.execute('UPDATE blobs SET refcount = refcount + 1 WHERE id = ?', (blob_id,))
+            if not cur.rowcount:
+                raise ValueError(f"존재하지 않는 blob입니다: {blob_id}")
+            conn.execute('COMMIT')
+        except (sqlite3.Error, ValueError):
+            conn.execute('ROLLBACK')
+            raise
+
+    def decref(self, blob_id: str) -> bool:
+        """참조 카운트를 1 내립니다. 0이 되면 파일을 지우고 True를 반환합니다."""
+        conn = self._transaction()
+        try:
+            conn.execute('UPDATE blobs SET refcount = refcount - 1 WHERE id = ? AND refcount > 0', (blob_id,))
+            row = conn.execute('SELECT refcount FROM blobs WHERE id = ?', (blob_id,)).fetchone()
+            freed = row is not None and row[0] <= 0
+            if freed:
+                conn.execute('DELETE FROM blobs WHERE id = ?', (blob_id,))
+                try:
+                    os.remove(self.path(blob_id))
+                except FileNotFoundError:
+                    pass
+            conn.execute('COMMIT')
+        except (sqlite3.Error, OSError):
+            conn.execute('ROLLBACK')
+            raise
+        return freed
+
+    def release_all(self, blob_ids):
+        """여러 blob의 참조를 해제합니다. (세션 삭제 시)"""
+        for blob_id in blob_ids:
+            try:
+                self.decref(blob_id)
+            except (sqlite3.Error, OSError, ValueError) as e:
+                print(f"⚠️ blob 참조 해제 실패 ({blob_id}): {e}")
+
+    def stats(self) -> dict:
+        row = self._connect().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(size * refcount), 0) FROM blobs'
+        ).fetchone()
+        return {'blob_count': row[0], 'stored_bytes': row[1], 'referenced_bytes': row[2]}
+
+    def send(self, blob_id: str, immutable: bool = True, download_name: str = None):
+        """blob을 send_file로 전송합니다. (blob id를 강한 ETag로 사용)"""
+        if not self.exists(blob_id):
+            raise NotFound()
+        info = self.info(blob_id) or {}
+        ext = info.get('ext')
+        mimetype = mimetypes.guess_type(f"blob.{ext}")[0] if ext else None
+        response = send_file(
+            self.path(blob_id),
+            mimetype=mimetype or 'application/octet-stream',
+            etag=blob_id,
+            conditional=True,
+            download_name=download_name,
+            max_age=IMMUTABLE_MAX_AGE if immutable else None
+        )
+        if immutable:
+            response.cache_control.immutable = True
+        return response
@@ -0,0 +1,459 @@
+# utils/expression.py
+"""그래프용 수식 컴파일러 (eval 없이 화이트리스트 AST → numpy 벡터 함수)
+
+- 수식 문자열을 한 번만 파싱/검증하고, 같은 문자열은 컴파일 결과를 재사용 (LRU)
+- 허용: 변수 x, 상수 pi/e, 사칙연산/거듭제곱(^ 또는 **), 비교, and/or/not,
+  화이트리스트 함수(sin, sqrt, log ...), np./math. 접두사
+- 조건식: "a if 조건 else b", "조건 ? a : b", where(조건, a, b) → np.where
+- 구간별 함수: piecewise((식, 조건), ..., 기본식) / Piecewise((식, 조건), (식, True)) → np.piecewise
+- "y = ...", "f(x) = ..." 처럼 좌변이 있으면 우변만 사용
+- to_js(): 같은 AST에서 JavaScript 식을 만듦 (JSXGraph 등 브라우저 렌더러용)
+"""
+
+import ast
+import re
+from functools import lru_cache
+
+CACHE_SIZE = 512
+MAX_LENGTH = 500
+MAX_NODES = 300
+
+# 함수 이름 → numpy 함수 이름
+FUNCTIONS = {
+    'sin': 'sin', 'cos': 'cos', 'tan': 'tan',
+    'arcsin': 'arcsin', 'arccos': 'arccos', 'arctan': 'arctan',
+    'asin': 'arcsin', 'acos': 'arccos', 'atan': 'arctan',
+    'sinh': 'sinh', 'cosh': 'cosh', 'tanh': 'tanh',
+    'exp': 'exp', 'log': 'log', 'ln': 'log', 'log10': 'log10', 'log2': 'log2',
+    'sqrt': 'sqrt', 'cbrt': 'cbrt', 'abs': 'abs', 'fabs': 'abs', 'sign': 'sign',
+    'floor': 'floor', 'ceil': 'ceil', 'round': 'round',
+    'maximum': 'maximum', 'minimum': 'minimum', 'max': 'maximum', 'min': 'minimum',
+}
+# 함수별 인자 개수 (최소, 최대 - None이면 제한 없음). 목록에 없으면 인자 1개
+ARITY = {'maximum': (2, None), 'minimum': (2, None)}
+CONSTANTS = {'pi': 'pi', 'e': 'e', 'inf': 'inf'}
+MODULE_PREFIXES = ('np', 'numpy', 'math')
+VARIABLES = ('x',)
+
+_LHS_RE = re.compile(r'^\s*(?:y|f\s*\(\s*x\s*\)|[a-zA-Z]\s*\(\s*x\s*\))\s*=(?!=)')
+
+
+class ExpressionError(ValueError):
+    """허용되지 않거나 해석할 수 없는 수식"""
+
+
+def _convert_ternary(text: str) -> str:
+    """C 스타일 '조건 ? a : b'를 파이썬 'a if 조건 else b'로 바꿉니다. (괄호 안쪽도 재귀 변환)"""
+    depth = 0
+    question = None
+    for i, ch in enumerate(text):
+        if ch in '([':
+            depth += 1
+        elif ch in ')]':
+            depth -= 1
+        elif ch == '?' and depth == 0:
+            question = i
+            break
+
+    if question is None:
+        # 최상위에 '?'가 없으면 괄호 그룹 안쪽만 변환
+        if '?' not in text:
+            return text
+        out, i = [], 0
+        while i < len(text):
+            if text[i] in '([':
+                close, depth = i, 0
+                for j in range(i, len(text)):
+                    if text[j] in '([':
+                        depth += 1
+                    elif text[j] in ')]':
+                        depth -= 1
+                        if depth == 0:
+                            close = j
+                            break
+                else:
+                    raise ExpressionError("괄호가 닫히지 않았습니다.")
+                out.append(text[i] + _convert_ternary(text[i + 1:close]) + text[close])
+                i = close + 1
+            else:
+                out.append(text[i])
+                i += 1
+        return ''.join(out)
+
+    # '?'에 짝이 맞는 ':' 찾기 (중첩된 ?: 는 건너뜀)
+    depth = nested = 0
+    colon = None
+    for i in range(question + 1, len(text)):
+        ch = text[i]
+        if ch in '([':
+            depth += 1
+        elif ch in ')]':
+            depth -= 1
+        elif depth == 0 and ch == '?':
+            nested += 1
+        elif depth == 0 and ch == ':':
+            if nested == 0:
+                colon = i
+                break
+            nested -= 1
+    if colon is None:
+        raise ExpressionError("'?'에 대응하는 ':'가 없습니다.")
+
+    cond = _convert_ternary(text[:question])
+    then = _convert_ternary(text[question + 1:colon])
+    other = _convert_ternary(text[colon + 1:])
+    return f'(({then}) if ({cond}) else ({other}))'
+
+
+def normalize(text: str) -> str:
+    """좌변 제거, ^ → **, 삼항 연산자 변환"""
+    if not isinstance(text, str) or not text.strip():
+        raise ExpressionError("수식이 비어 있습니다.")
+    if len(text) > MAX_LENGTH:
+        raise ExpressionError(f"수식이 너무 깁니다. ({len(text)}자)")
+    text = _LHS_RE.sub('', text, count=1).strip()
+    text = text.replace('^', '**').replace('&&', ' and ').replace('||', ' or ')
+    return _convert_ternary(text)
+
+
+class _Compiler:
+    """검증된 AST를 numpy 클로저로 바꿉니다. 각 클로저는 x 배열을 받아 값을 반환."""
+
+    def __init__(self, np):
+        self.np = np
+        self.nodes = 0
+
+    def build(self, node):
+        self.nodes += 1
+        if self.nodes > MAX_NODES:
+            raise ExpressionError("수식이 너무 복잡합니다.")
+        method = getattr(self, f'_{type(node).__name__}', None)
+        if method is None:
+            raise ExpressionError(f"허용되지 않는 구문입니다: {type(node).__name__}")
+        return method(node)
+
+    def _Expression(self, node):
+        return self.build(node.body)
+
+    def _Constant(self, node):
+        value = node.value
+        if isinstance(value, bool):
+            return lambda x: value
+        if not isinstance(value, (int, float)):
+            raise ExpressionError(f"허용되지 않는 상수입니다: {value!r}")
+        value = float(value)
+        return lambda x: value
+
+    def _Name(self, node):
+        if node.id in VARIABLES:
+            return lambda x: x
+        if node.id in CONSTANTS:
+            value = getattr(self.np, CONSTANTS[node.id])
+            return lambda x: value
+        if node.id in ('True', 'False'):
+            value = node.id == 'True'
+            return lambda x: value
+        raise ExpressionError(f"허용되지 않는 이름입니다: {node.id}")
+
+    def _Attribute(self, node):
+        # np.pi, math.e 같은 상수
+        if isinstance(node.value, ast.Name) and node.value.id in MODULE_PREFIXES and node.attr in CONSTANTS:
+            value = getattr(self.np, CONSTANTS[node.attr])
+            return lambda x: value
+        raise ExpressionError(f"허용되지 않는 속성입니다: {ast.unparse(node)}")
+
+    _BINARY = {
+        ast.Add: 'add', ast.Sub: 'subtract', ast.Mult: 'multiply', ast.Div: 'true_divide',
+        ast.Pow: 'power', ast.Mod: 'mod', ast.FloorDiv: 'floor_divide',
+        ast.BitAnd: 'logical_and', ast.BitOr: 'logical_or',
+    }
+
+    def _BinOp(self, node):
+        name = self._BINARY.get(type(node.op))
+        if name is None:
+            raise ExpressionError(f"허용되지 않는 연산자입니다: {type(node.op).__name__}")
+        left, right = self.build(node.left), self.build(node.right)
+        if name == 'power':
+            # 정수 배열 ** 음수 오류를 피하려고 실수로 계산
+            fn = self.np.float_power
+        else:
+            fn = getattr(self.np, name)
+        return lambda x: fn(left(x), right(x))
+
+    def _UnaryOp(self, node):
+        operand = self.build(node.operand)
+        if isinstance(node.op, ast.USub):
+            return lambda x: -operand(x)
+        if isinstance(node.op, ast.UAdd):
+            return operand
+        if isinstance(node.op, (ast.Not, ast.Invert)):
+            fn = self.np.logical_not
+            return lambda x: fn(operand(x))
+        raise ExpressionError(f"허용되지 않는 연산자입니다: {type(node.op).__name__}")
+
+    _COMPARE = {
+        ast.Lt: 'less', ast.LtE: 'less_equal', ast.Gt: 'greater', ast.GtE: 'greater_equal',
+        ast.Eq: 'equal', ast.NotEq: 'not_equal',
+    }
+
+    def _Compare(self, node):
+        # 0 <= x < 1 처럼 이어진 비교는 logical_and로 연결
+        operands = [self.build(node.left)] + [self.build(c) for c in node.comparators]
+        pairs = []
+        for i, op in enumerate(node.ops):
+            name = self._COMPARE.get(type(op))
+            if name is None:
+                raise ExpressionError(f"허용되지 않는 비교입니다: {type(op).__name__}")
+            pairs.append((getattr(self.np, name), operands[i], operands[i + 1]))
+        logical_and = self.np.logical_and
+
+        def compare(x):
+            result = True
+            for fn, left, right in pairs:
+                result = logical_and(result, fn(left(x), right(x)))
+            return result
+        return compare
+
+    def _BoolOp(self, node):
+        fn = self.np.logical_and if isinstance(node.op, ast.And) else self.np.logical_or
+        values = [self.build(v) for v in node.values]
+
+        def combine(x):
+            result = values[0](x)
+            for value in values[1:]:
+                result = fn(result, value(x))
+            return result
+        return combine
+
+    def _IfExp(self, node):
+        cond, then, other = self.build(node.test), self.build(node.body), self.build(node.orelse)
+        where = self.np.where
+        return lambda x: where(cond(x), then(x), other(x))
+
+    def _Call(self, node):
+        func = node.func
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id in MODULE_PREFIXES:
+            name = func.attr
+        elif isinstance(func, ast.Name):
+            name = func.id
+        else:
+            raise ExpressionError(f"허용되지 않는 함수 호출입니다: {ast.unparse(func)}")
+        if node.keywords:
+            raise ExpressionError(f"키워드 인자는 지원하지 않습니다: {name}")
+
+        if name in ('piecewise', 'Piecewise'):
+            return self._piecewise(node.args)
+        if name == 'where':
+            if len(node.args) != 3:
+                raise ExpressionError("where(조건, 참일 때, 거짓일 때) 형식이어야 합니다.")
+            return self._IfExp(ast.IfExp(test=node.args[0], body=node.args[1], orelse=node.args[2]))
+        if name not in FUNCTIONS:
+            raise ExpressionError(f"허용되지 않는 함수입니다: {name}")
+
+        # log(x, 2)처럼 인자 개수가 맞지 않으면 계산 시점이 아니라 컴파일 시점에 거부
+        low, high = ARITY.get(FUNCTIONS[name], (1, 1))
+        if len(node.args) < low or (high is not None and len(node.args) > high):
+            expected = f'{low}개' if low == high else f'{low}개 이상'
+            raise ExpressionError(f"{name}의 인자 개수가 맞지 않습니다. (필요: {expected}, 입력: {len(node.args)}개)")
+        fn = getattr(self.np, FUNCTIONS[name])
+        args = [self.build(a) for a in node.args]
+        if FUNCTIONS[name] in ('maximum', 'minimum') and len(args) > 2:
+            # max(a, b, c) → maximum(maximum(a, b), c)
+            def reduce_args(x):
+                result = args[0](x)
+                for a in args[1:]:
+                    result = fn(result, a(x))
+                return result
+            return reduce_args
+        return lambda x: fn(*(a(x) for a in args))
+
+    def _piecewise(self, args):
+        """piecewise((식, 조건), ..., [기본식]) → np.piecewise (각 식은 자기 구간에서만 계산)"""
+        conds, funcs = [], []
+        default = None
+        for i, arg in enumerate(args):
+            if isinstance(arg, ast.Tuple) and len(arg.elts) == 2:
+                expr, cond = arg.elts
+                if isinstance(cond, ast.Constant) and cond.value is True or isinstance(cond, ast.Name) and cond.id == 'True':
+                    default = self.build(expr)
+                    continue
+                funcs.append(self.build(expr))
+                conds.append(self.build(cond))
+            elif i == len(args) - 1 and not isinstance(arg, ast.Tuple):
+                default = self.build(arg)
+            else:
+                raise ExpressionError("piecewise 인자는 (식, 조건) 쌍이어야 합니다.")
+        if not conds:
+            if default is None:
+                raise ExpressionError("piecewise에 구간이 없습니다.")
+            return default
+
+        np = self.np
+        nan = np.nan
+
+        def branch(fn):
+            # np.piecewise는 구간에 해당하는 x만 넘겨줌 → 스칼라 결과도 배열 길이에 맞춤
+            return lambda xs: np.broadcast_to(fn(xs), np.shape(xs))
+        funclist = [branch(f) for f in funcs] + [branch(default) if default else nan]
+
+        def piecewise(x):
+            x = np.asarray(x, dtype=float)
+            # np.piecewise는 겹치는 구간에서 마지막 조건을 쓰므로, sympy Piecewise/to_js처럼
+            # 앞 조건이 우선하도록 각 조건에서 앞 조건들을 제외
+            condlist = []
+            taken = np.zeros(x.shape, dtype=bool)
+            for c in conds:
+                cond = np.broadcast_to(np.asarray(c(x), dtype=bool), x.shape)
+                condlist.append(cond & ~taken)
+                taken = taken | cond
+            return np.piecewise(x, condlist, funclist)
+        return piecewise
+
+
+class Expression:
+    """컴파일된 수식. expr(x) → x와 같은 모양의 float 배열"""
+    __slots__ = ('text', 'source', 'tree', '_fn', '_np')
+
+    def __init__(self, text: str, source: str, tree, fn, np):
+        self.text = text
+        self.source = source
+        self.tree = tree
+        self._fn = fn
+        self._np = np
+
+    def __call__(self, x):
+        np = self._np
+        x = np.asarray(x, dtype=float)
+        with np.errstate(all='ignore'):
+            y = self._fn(x)
+        y = np.asarray(y, dtype=float)
+        if y.shape != x.shape:
+            y = np.broadcast_to(y, x.shape).copy()
+        return y
+
+    def __repr__(self):
+        return f'Expression({self.source!r})'
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_expression(text: str) -> Expression:
+    """수식 문자열을 검증하고 numpy 벡터 함수로 컴파일합니다. (같은 문자열은 캐시)
+
+    Raises:
+        ExpressionError: 문법 오류 또는 허용되지 않는 이름/구문
+    """
+    import numpy as np
+
+    source = normalize(text)
+    try:
+        tree = ast.parse(source, mode='eval')
+    except SyntaxError as e:
+        raise ExpressionError(f"수식 문법 오류: {e.msg}") from None
+    fn = _Compiler(np).build(tree)
+    return Expression(text, source, tree, fn, np)
+
+
+def evaluate(text: str, x):
+    """compile_expression(text)(x)의 축약"""
+    return compile_expression(text)(x)
+
+
+# numpy 함수 이름 → JavaScript
+_JS_FUNCTIONS = {
+    'sin': 'Math.sin', 'cos': 'Math.cos', 'tan': 'Math.tan',
+    'arcsin': 'Math.asin', 'arccos': 'Math.acos', 'arctan': 'Math.atan',
+    'sinh': 'Math.sinh', 'cosh': 'Math.cosh', 'tanh': 'Math.tanh',
+    'exp': 'Math.exp', 'log': 'Math.log', 'log10': 'Math.log10', 'log2': 'Math.log2',
+    'sqrt': 'Math.sqrt', 'cbrt': 'Math.cbrt', 'abs': 'Math.abs', 'sign': 'Math.sign',
+    'floor': 'Math.floor', 'ceil': 'Math.ceil', 'round': 'Math.round',
+    'maximum': 'Math.max', 'minimum': 'Math.min',
+}
+_JS_CONSTANTS = {'pi': 'Math.PI', 'e': 'Math.E', 'inf': 'Infinity'}
+_JS_BINARY = {
+    ast.Add: '+', ast.Sub: '-', ast.Mult: '*', ast.Div: '/',
+    ast.BitAnd: '&&', ast.BitOr: '||',
+}
+_JS_COMPARE = {
+    ast.Lt: '<', ast.LtE: '<=', ast.Gt: '>', ast.GtE: '>=', ast.Eq: '===', ast.NotEq: '!==',
+}
+
+
+def _js_number(value) -> str:
+    value = float(value)
+    if value != value:
+        return 'NaN'
+    if value in (float('inf'), float('-inf')):
+        return 'Infinity' if value > 0 else '(-Infinity)'
+    return str(int(value)) if value.is_integer() and abs(value) < 1e15 else repr(value)
+
+
+def _emit_js(node) -> str:
+    """검증된 AST 노드를 JavaScript 식으로 (모든 하위 식을 괄호로 감싸 우선순위 문제를 피함)"""
+    if isinstance(node, ast.Expression):
+        return _emit_js(node.body)
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, bool):
+            return 'true' if node.value else 'false'
+        return _js_number(node.value)
+    if isinstance(node, ast.Name):
+        if node.id in VARIABLES:
+            return node.id
+        if node.id in ('True', 'False'):
+            return node.id.lower()
+        return _JS_CONSTANTS[CONSTANTS[node.id]]
+    if isinstance(node, ast.Attribute):
+        return _JS_CONSTANTS[CONSTANTS[node.attr]]
+    if isinstance(node, ast.BinOp):
+        left, right = _emit_js(node.left), _emit_js(node.right)
+        if isinstance(node.op, ast.Pow):
+            return f'Math.pow({left}, {right})'
+        if isinstance(node.op, ast.FloorDiv):
+            return f'Math.floor({left} / {right})'
+        if isinstance(node.op, ast.Mod):
+            # numpy.mod는 나누는 수의 부호를 따름 (JS %와 다름)
+            return f'({left} - {right} * Math.floor({left} / {right}))'
+        return f'({left} {_JS_BINARY[type(node.op)]} {right})'
+    if isinstance(node, ast.UnaryOp):
+        operand = _emit_js(node.operand)
+        if isinstance(node.op, (ast.Not, ast.Invert)):
+            return f'(!{operand})'
+        return f'(-{operand})' if isinstance(node.op, ast.USub) else operand
+    if isinstance(node, ast.Compare):
+        values = [_emit_js(node.left)] + [_emit_js(c) for c in node.comparators]
+        parts = [f'({values[i]} {_JS_COMPARE[type(op)]} {values[i + 1]})' for i, op in enumerate(node.ops)]
+        return parts[0] if len(parts) == 1 else '(' + ' && '.join(parts) + ')'
+    if isinstance(node, ast.BoolOp):
+        op = ' && ' if isinstance(node.op, ast.And) else ' || '
+        return '(' + op.join(_emit_js(v) for v in node.values) + ')'
+    if isinstance(node, ast.IfExp):
+        return f'({_emit_js(node.test)} ? {_emit_js(node.body)} : {_emit_js(node.orelse)})'
+    if isinstance(node, ast.Call):
+        func = node.func
+        name = func.attr if isinstance(func, ast.Attribute) else func.id
+        args = node.args
+        if name in ('piecewise', 'Piecewise'):
+            # 앞 조건부터 차례로 검사하는 삼항 연산자 사슬, 해당 구간이 없으면 NaN
+            default = 'NaN'
+            pairs = []
+            for i, arg in enumerate(args):
+                if isinstance(arg, ast.Tuple):
+                    expr, cond = arg.elts
+                    if isinstance(cond, ast.Constant) and cond.value is True or isinstance(cond, ast.Name) and cond.id == 'True':
+                        default = _emit_js(expr)
+                    else:
+                        pairs.append((_emit_js(cond), _emit_js(expr)))
+                else:
+                    default = _emit_js(arg)
+            out = default
+            for cond, expr in reversed(pairs):
+                out = f'({cond} ? {expr} : {out})'
+            return out
+        if name == 'where':
+            return f'({_emit_js(args[0])} ? {_emit_js(args[1])} : {_emit_js(args[2])})'
+        return f"{_JS_FUNCTIONS[FUNCTIONS[name]]}({', '.join(_emit_js(a) for a in args)})"
+    raise ExpressionError(f"JavaScript로 바꿀 수 없는 구문입니다: {type(node).__name__}")
+
+
+def to_js(expr: Expression) -> str:
+    """컴파일된 수식을 같은 의미의 JavaScript 식으로 바꿉니다. (변수 x)"""
+    return _emit_js(expr.tree)
@@ -0,0 +1,168 @@
+# utils/figure_ir.py
+"""그래프/도형의 공통 중간 표현 (Figure IR)
+
+같은 그림이 세 가지 출력으로 그려짐:
+- matplotlib (generate_variants._render_graph)
+- JSXGraph (analyze_question.generate_jsxgraph_code)
+- Function Plot (generate_exam 문제지, 브라우저)
+
+graph_info(plot_data) / elements를 한 번 파싱해서 수식 검증·컴파일까지 마친 FigureIR로 만들고,
+각 출력은 FigureIR에서 코드를 만듦. 같은 입력은 정규화된 JSON 키로 캐시되어 다시 파싱하지 않음.
+"""
+
+import json
+from collections import namedtuple
+from functools import lru_cache
+
+from .expression import compile_expression, to_js, ExpressionError
+from .sampling import sample_function
+
+CACHE_SIZE = 256
+# Function Plot 폴리라인 좌표의 유효 숫자 (문제지 HTML 크기 제한)
+POINT_DIGITS = 5
+FUNCTION_PLOT_EVALS = 240
+
+# expr: 컴파일된 Expression (실패하면 None), js: JavaScript 식, error: 컴파일 오류 메시지
+Curve = namedtuple('Curve', ['source', 'expr', 'js', 'domain', 'label', 'color', 'error'])
+# elements: JSXGraph용 원본 요소 (함수/구간별 함수는 curves로 옮겨지고 나머지만 남음)
+FigureIR = namedtuple('FigureIR', ['kind', 'x_range', 'y_range', 'curves', 'elements'])
+
+
+def _range(value, default):
+    if isinstance(value, (list, tuple)) and len(value) == 2:
+        try:
+            return float(value[0]), float(value[1])
+        except (TypeError, ValueError):
+            pass
+    return default
+
+
+def make_curve(source, domain=None, label=None, color=None) -> Curve:
+    """수식 하나를 컴파일해서 Curve로. 오류는 예외 대신 error에 기록."""
+    source = str(source)
+    try:
+        expr = compile_expression(source)
+        return Curve(source, expr, to_js(expr), _range(domain, None), label, color, None)
+    except (ExpressionError, SyntaxError) as e:
+        return Curve(source, None, None, _range(domain, None), label, color, str(e))
+
+
+def _graph_curves(graph_type: str, plot_data: dict) -> list:
+    """plot_data에서 곡선 목록 추출.
+    변형 문제 형식(function: 문자열, functions: [문자열])과
+    문제지 형식(functions: [{expression, color}])을 모두 받음
+    """
+    sources = []
+    if graph_type == 'function' and plot_data.get('function'):
+        sources.append(plot_data['function'])
+    if graph_type in ('function', 'region'):
+        sources.extend(plot_data.get('functions') or [])
+
+    curves = []
+    for item in sources:
+        if isinstance(item, dict):
+            text = item.get('expression') or item.get('expr') or item.get('function')
+            if text:
+                curves.append(make_curve(text, item.get('domain'), item.get('label'), item.get('color')))
+        elif item:
+            curves.append(make_curve(item))
+    return curves
+
+
+def _build_graph(graph_info: dict) -> FigureIR:
+    graph_type = graph_info.get('type', 'none')
+    plot_data = graph_info.get('plot_data') or {}
+    default_x = (0.0, 2.0) if graph_type == 'region' else (-10.0, 10.0)
+    return FigureIR(
+        kind=graph_type,
+        x_range=_range(plot_data.get('x_range'), default_x),
+        y_range=_range(plot_data.get('y_range'), None),
+        curves=tuple(_graph_curves(graph_type, plot_data)),
+        elements=(),
+    )
+
+
+def _build_elements(elements: list) -> FigureIR:
+    curves = []
+    rest = []
+    for elem in elements:
+        elem_type = elem.get('type', '')
+        if elem_type == 'function':
+            expr = elem.get('expr', 'x')
+            curves.append(make_curve(expr, elem.get('domain'), elem.get('label', f'y = {expr}'),
+                                     elem.get('color', '#1a1a1a')))
+        elif elem_type == 'piecewise':
+            colors = ['#1a1a1a', '#cc0000', '#006600', '#660099', '#cc6600']
+            for i, piece in enumerate(elem.get('pieces', [])):
+                expr = piece.get('expr', 'x')
+                curves.append(make_curve(expr, piece.get('domain', [-6, 6]),
+                                         piece.get('label', f'y = {expr}'),
+                                         piece.get('color', colors[i % len(colors)])))
+        else:
+            rest.append(elem)
+    return FigureIR('elements', (-6.0, 6.0), (-6.0, 6.0), tuple(curves), tuple(rest))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _figure_from_key(kind: str, key: str) -> FigureIR:
+    data = json.loads(key)
+    return _build_elements(data) if kind == 'elements' else _build_graph(data)
+
+
+def _key(data) -> str:
+    return json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def figure_from_graph(graph_info: dict) -> FigureIR:
+    """graph_info → FigureIR (같은 내용이면 캐시된 IR 재사용)"""
+    return _figure_from_key('graph', _key(graph_info or {}))
+
+
+def figure_from_elements(elements: list) -> FigureIR:
+    """JSXGraph elements → FigureIR (같은 내용이면 캐시된 IR 재사용)"""
+    return _figure_from_key('elements', _key(elements or []))
+
+
+def _round(value: float) -> float:
+    return float(f'{value:.{POINT_DIGITS}g}')
+
+
+def to_function_plot(ir: FigureIR):
+    """Function Plot 설정 (xAxis/yAxis 범위와 data). 그릴 곡선이 없으면 None.
+
+    브라우저에서 수식을 다시 해석하지 않도록 서버의 적응형 샘플링 결과를 폴리라인으로 넘김.
+    점근선/불연속(NaN)에서는 폴리라인을 나눔.
+    """
+    import math
+
+    curves = [c for c in ir.curves if c.expr is not None]
+    if not curves:
+        return None
+
+    data = []
+    limits = []
+    for curve in curves:
+        x_min, x_max = curve.domain or ir.x_range
+        sample = sample_function(curve.expr, x_min, x_max, FUNCTION_PLOT_EVALS, y_limits=ir.y_range)
+        limits.append(sample.y_limits)
+        segment = []
+        for x, y in zip(sample.x.tolist(), sample.ys[0].tolist()):
+            if math.isfinite(y):
+                segment.append([_round(x), _round(y)])
+                continue
+            if len(segment) >= 2:
+                data.append({'points': segment, 'fnType': 'points', 'graphType': 'polyline',
+                             'color': curve.color or 'black'})
+            segment = []
+        if len(segment) >= 2:
+            data.append({'points': segment, 'fnType': 'points', 'graphType': 'polyline',
+                         'color': curve.color or 'black'})
+    # y 범위를 지정하지 않았으면 모든 곡선의 표시 범위를 합침
+    y_limits = ir.y_range or (min(lo for lo, _ in limits), max(hi for _, hi in limits))
+    if not data:
+        return None
+    return {
+        'xAxis': {'domain': list(ir.x_range)},
+        'yAxis': {'domain': [_round(y_limits[0]), _round(y_limits[1])]},
+        'data': data,
+    }
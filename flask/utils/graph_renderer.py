@@ -0,0 +1,136 @@
+# utils/graph_renderer.py
+"""프로세스당 한 번 초기화되는 matplotlib 그래프 렌더러
+
+- matplotlib import, Agg 백엔드 선택, rcParams 설정, 폰트/mathtext 워밍업은 최초 1회만
+- pyplot 없이 Figure + FigureCanvasAgg를 직접 만들어 재사용 (렌더 사이에는 clear만)
+- Figure/Agg 상태는 스레드 안전하지 않으므로 렌더 전체를 잠금으로 직렬화
+"""
+
+import io
+import threading
+import time
+from contextlib import contextmanager
+
+FIGSIZE = (6, 5)
+DPI = 120
+
+RC_PARAMS = {
+    'font.family': ['DejaVu Sans', 'Arial Unicode MS', 'sans-serif'],
+    'axes.unicode_minus': False,
+    'mathtext.fontset': 'dejavusans',  # 수학 폰트 설정
+    'text.usetex': False,  # LaTeX 엔진 사용 안함 (호환성)
+    'font.size': 11,
+}
+
+
+class GraphRenderer:
+    """재사용 가능한 Agg Figure 하나를 가진 렌더러"""
+
+    def __init__(self, figsize=FIGSIZE, dpi=DPI):
+        self.figsize = figsize
+        self.dpi = dpi
+        self._lock = threading.RLock()
+        self._fig = None
+        self.render_count = 0
+
+    def _init(self):
+        """최초 사용 시 matplotlib 초기화 (잠금 안에서 호출)"""
+        start = time.perf_counter()
+        import matplotlib
+        matplotlib.use('Agg')
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        matplotlib.rcParams.update(RC_PARAMS)
+        fig = Figure(figsize=self.figsize)
+        FigureCanvasAgg(fig)
+
+        # 폰트 캐시와 mathtext 파서 워밍업
+        fig.text(0.5, 0.5, r'$y=f(x)$ $\sqrt{x}$ $a_{n}$')
+        fig.canvas.draw()
+        fig.clear()
+
+        self._fig = fig
+        print(f"📈 그래프 렌더러 초기화 ({(time.perf_counter() - start) * 1000:.0f}ms)")
+
+    @contextmanager
+    def figure(self):
+        """깨끗한 (fig, ax)를 빌려줍니다. with 블록이 끝날 때까지 다른 렌더는 대기."""
+        with self._lock:
+            if self._fig is None:
+                self._init()
+            fig = self._fig
+            fig.clear()
+            fig.set_size_inches(self.figsize)
+            fig.set_dpi(self.dpi)
+            ax = fig.add_subplot(111)
+            try:
+                yield fig, ax
+            finally:
+                # 아티스트 참조를 바로 놓아줌
+                fig.clear()
+                self.render_count += 1
+
+    def save(self, fig, output=None, fmt: str = 'png') -> bytes:
+        """figure를 저장합니다. output(경로 또는 파일 객체)이 없으면 bytes를 반환."""
+        target = output if output is not None else io.BytesIO()
+        fig.savefig(target, format=fmt, dpi=self.dpi, bbox_inches='tight', facecolor='white')
+        if output is None:
+            return target.getvalue()
+        return None
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def get_renderer() -> GraphRenderer:
+    """프로세스 공용 렌더러"""
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = GraphRenderer()
+    return _renderer
+
+
+def _draw_sample(ax):
+    import numpy as np
+    x = np.linspace(-5, 5, 400)
+    ax.plot(x, x ** 2 - 4 * x + 3, color='black', linewidth=1.5)
+    ax.annotate('$y=f(x)$', (x[320], x[320] ** 2 - 4 * x[320] + 3), fontsize=11)
+    ax.set_title(r'$f(x)=x^2-4x+3$', fontsize=13, pad=10)
+
+
+if __name__ == '__main__':
+    # 기존 방식(매번 pyplot 설정/생성)과 비교: python -m utils.graph_renderer
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    runs = 30
+
+    def legacy():
+        plt.rcParams.update(RC_PARAMS)
+        fig, ax = plt.subplots(figsize=FIGSIZE)
+        _draw_sample(ax)
+        buf = io.BytesIO()
+        plt.savefig(buf, format='png', dpi=DPI, bbox_inches='tight', facecolor='white')
+        plt.close(fig)
+
+    renderer = GraphRenderer()
+
+    def reused():
+        with renderer.figure() as (fig, ax):
+            _draw_sample(ax)
+            renderer.save(fig)
+
+    for name, fn in (('pyplot 매번 생성', legacy), ('재사용 렌더러', reused)):
+        start = time.perf_counter()
+        fn()
+        first = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        for _ in range(runs):
+            fn()
+        avg = (time.perf_counter() - start) * 1000 / runs
+        print(f"{name:<14} 첫 렌더 {first:7.1f}ms | 이후 평균 {avg:6.1f}ms")
@@ -0,0 +1,130 @@
+# utils/http_cache.py
+"""목록 API용 조건부 GET과 커서 페이지네이션
+
+- 디렉토리 mtime 또는 카탈로그 버전으로 ETag/Last-Modified 검증자 생성
+- If-None-Match / If-Modified-Since가 일치하면 목록을 만들기 전에 304 반환
+- 정렬 키 기반 커서(keyset) 페이지네이션
+"""
+
+import base64
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+from flask import request, Response
+
+
+class Validator:
+    """응답 검증자 (약한 ETag + Last-Modified)"""
+
+    def __init__(self, etag: str, last_modified: float = None):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def last_modified_dt(self):
+        if self.last_modified is None:
+            return None
+        # HTTP 날짜는 초 단위
+        return datetime.fromtimestamp(int(self.last_modified), tz=timezone.utc)
+
+
+def _make_etag(parts) -> str:
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+
+
+def directory_validator(*paths) -> Validator:
+    """디렉토리(또는 파일)들의 mtime으로 검증자를 만듭니다.
+
+    디렉토리 mtime은 항목이 추가/삭제/이름 변경될 때 바뀝니다.
+    """
+    parts = []
+    latest = None
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            parts.append([path, None])
+            continue
+        parts.append([path, st.st_mtime_ns])
+        latest = st.st_mtime if latest is None else max(latest, st.st_mtime)
+    return Validator(_make_etag(parts), latest)
+
+
+def version_validator(name: str, version, last_modified: float = None) -> Validator:
+    """버전 카운터(예: 세션 카탈로그)로 검증자를 만듭니다."""
+    return Validator(_make_etag([name, version]), last_modified)
+
+
+def not_modified(validator: Validator):
+    """요청 헤더가 검증자와 일치하면 304 응답을, 아니면 None을 반환합니다."""
+    if request.if_none_match:
+        matched = request.if_none_match.contains_weak(validator.etag)
+    elif request.if_modified_since and validator.last_modified_dt:
+        matched = validator.last_modified_dt <= request.if_modified_since
+    else:
+        matched = False
+    if not matched:
+        return None
+    return with_validator(Response(status=304), validator)
+
+
+def with_validator(response, validator: Validator):
+    """응답에 ETag/Last-Modified와 재검증 캐시 헤더를 붙입니다."""
+    response.set_etag(validator.etag, weak=True)
+    if validator.last_modified_dt:
+        response.last_modified = validator.last_modified_dt
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def encode_cursor(key) -> str:
+    raw = json.dumps(list(key), ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    """커서 문자열을 정렬 키(tuple)로 복원합니다. 잘못된 커서면 ValueError."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f'잘못된 커서입니다: {cursor}') from e
+    if not isinstance(key, list):
+        raise ValueError(f'잘못된 커서입니다: {cursor}')
+    return tuple(key)
+
+
+def get_page_args():
+    """요청의 limit/cursor 파라미터. limit이 없으면 전체 목록 (하위 호환)"""
+    limit = request.args.get('limit', type=int)
+    if limit is not None and limit <= 0:
+        raise ValueError('limit은 1 이상이어야 합니다.')
+    cursor = request.args.get('cursor') or None
+    return limit, (decode_cursor(cursor) if cursor else None)
+
+
+def paginate(items: list, sort_key, limit: int = None, after=None) -> tuple:
+    """정렬 키 오름차순으로 정렬한 뒤 after 다음부터 limit개를 잘라냅니다.
+
+    Args:
+        items: 항목 목록
+        sort_key: 항목 → 정렬 키(tuple). 내림차순 필드는 음수 등으로 뒤집어서 반환
+        limit: 페이지 크기 (None이면 전체)
+        after: 이전 페이지의 마지막 정렬 키
+
+    Returns:
+        (페이지 항목 목록, 다음 커서 또는 None)
+    """
+    keyed = sorted(((tuple(sort_key(item)), item) for item in items), key=lambda x: x[0])
+    if after is not None:
+        try:
+            keyed = [pair for pair in keyed if pair[0] > after]
+        except TypeError as e:
+            raise ValueError('커서가 현재 정렬 기준과 맞지 않습니다.') from e
+    if limit is None or len(keyed) <= limit:
+        return [item for _, item in keyed], None
+    page = keyed[:limit]
+    return [item for _, item in page], encode_cursor(page[-1][0])
@@ -1,7 +1,26 @@
 # utils/image.py
 """이미지 처리 유틸리티"""
 
+import hashlib
+import os
+import uuid
 
+from PIL import Image, features
+
+from .tracing import traced
+
+# 썸네일 크기 (긴 변 기준 픽셀)
+THUMBNAIL_SIZES = {'sm': 160, 'md': 480, 'lg': 1024}
+THUMBNAIL_QUALITY = int(os.environ.get('THUMBNAIL_QUALITY', '80'))
+# webp 또는 jpeg (Pillow에 WebP 지원이 없으면 jpeg 사용)
+THUMBNAIL_FORMAT = os.environ.get('THUMBNAIL_FORMAT', 'webp').lower()
+if THUMBNAIL_FORMAT == 'webp' and not features.check('webp'):
+    THUMBNAIL_FORMAT = 'jpeg'
+THUMBNAIL_EXT = 'webp' if THUMBNAIL_FORMAT == 'webp' else 'jpg'
+THUMBS_DIRNAME = 'thumbs'
+
+
+@traced('image.crop')
 def crop_image_by_bbox(img, bounding_box):
     """bounding_box 좌표(0-1 비율)를 사용하여 이미지를 크롭합니다.
 
@@ -44,3 +63,64 @@ def crop_image_by_bbox(img, bounding_box):
         return img
 
     return img.crop((left, top, right, bottom))
+
+
+def get_thumbnail_filename(size: str) -> str:
+    """썸네일 파일명 (세션 폴더의 thumbs/ 기준)"""
+    return f"{size}.{THUMBNAIL_EXT}"
+
+
+def thumbnail_version(image_version) -> str:
+    """썸네일 URL의 ?v= 값. 원본 이미지 버전과 썸네일 설정(형식/품질/크기)이 바뀌면 달라짐"""
+    key = f"{image_version}|{THUMBNAIL_FORMAT}|{THUMBNAIL_QUALITY}|{sorted(THUMBNAIL_SIZES.items())}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+
+
+@traced('image.thumbnail')
+def generate_thumbnails(img, session_path, sizes=None):
+    """세션 폴더의 thumbs/ 에 크기별 썸네일을 생성합니다.
+
+    Args:
+        img: PIL Image 객체 또는 이미지 파일 경로
+        session_path: 세션 폴더 경로
+        sizes: 생성할 크기 이름 목록 (기본: 전체)
+
+    Returns:
+        {크기 이름: 썸네일 파일 경로}
+    """
+    if isinstance(img, str):
+        with Image.open(img) as opened:
+            opened.load()
+            return generate_thumbnails(opened, session_path, sizes)
+
+    thumbs_folder = os.path.join(session_path, THUMBS_DIRNAME)
+    os.makedirs(thumbs_folder, exist_ok=True)
+
+    # JPEG는 알파 채널을 지원하지 않음
+    if THUMBNAIL_FORMAT == 'jpeg':
+        source = img.convert('RGB') if img.mode != 'RGB' else img
+    else:
+        source = img.convert('RGBA') if img.mode not in ('RGB', 'RGBA') else img
+
+    paths = {}
+    for size in sizes or THUMBNAIL_SIZES:
+        max_px = THUMBNAIL_SIZES[size]
+        thumb = source.copy()
+        thumb.thumbnail((max_px, max_px), Image.LANCZOS)
+        path = os.path.join(thumbs_folder, get_thumbnail_filename(size))
+        # 동시 요청에 대비해 임시 파일에 쓴 뒤 교체
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        thumb.save(tmp_path, format=THUMBNAIL_FORMAT.upper(), quality=THUMBNAIL_QUALITY)
+        os.replace(tmp_path, path)
+        paths[size] = path
+    return paths
+
+
+def get_thumbnail(session_path, image_path, size):
+    """썸네일 경로를 반환합니다. 없거나 원본보다 오래되었으면 생성합니다."""
+    if size not in THUMBNAIL_SIZES:
+        raise ValueError(f"지원하지 않는 썸네일 크기입니다: {size} (가능: {', '.join(THUMBNAIL_SIZES)})")
+    path = os.path.join(session_path, THUMBS_DIRNAME, get_thumbnail_filename(size))
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(image_path):
+        generate_thumbnails(image_path, session_path, [size])
+    return path
@@ -0,0 +1,173 @@
+# utils/jobs.py
+"""오래 걸리는 작업(변형 문제 생성, 문항 분석)의 공용 실행기와 SSE 전달
+
+- 요청마다 스레드를 만들지 않고 크기가 정해진 스레드 풀(JOB_WORKERS)에서 실행
+  → 동시 스트림이 많아도 스레드 수는 상한을 넘지 않고, 넘치는 작업은 대기열에서 기다림
+- 작업 → SSE 제너레이터 전달은 Condition 기반: 이벤트가 올 때만 깨어남 (0.5초 폴링 없음)
+- 이벤트가 없으면 HEARTBEAT_INTERVAL마다 SSE 주석(": keep-alive")을 보내 프록시 연결 유지
+- 진행 이벤트는 같은 step끼리 합침: 전송 전이면 최신 것으로 교체하고,
+  COALESCE_INTERVAL 안에 몰린 이벤트는 모아서 한 번에 보냄 (complete/error 등은 즉시)
+- 대기열에 있는 동안 클라이언트 연결이 끊기면 작업을 취소 (워커 슬롯/Gemini 호출을 쓰지 않음)
+"""
+
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 8))
+HEARTBEAT_INTERVAL = float(os.environ.get('SSE_HEARTBEAT_INTERVAL', 15))
+COALESCE_INTERVAL = 0.25
+# 합치지 않고 바로 보내는 step
+URGENT_STEPS = ('complete', 'error')
+
+HEARTBEAT = ': keep-alive\n\n'
+
+
+def sse_event(data: dict) -> str:
+    return f"data: {json.dumps(data)}\n\n"
+
+
+class JobStream:
+    """작업 스레드가 보내는 이벤트를 SSE 제너레이터로 전달하는 채널"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending = OrderedDict()  # 합침 키 → 이벤트 (전송 대기 중)
+        self._seq = itertools.count()
+        self._urgent = False
+        self._done = False
+        self._closed = False
+        self._result = None
+        self._error = None
+        self._future = None  # JobExecutor가 채움 (시작 전 연결이 끊기면 취소)
+
+    def emit(self, event: dict, coalesce: bool = True):
+        """이벤트를 보냅니다. coalesce이면 아직 전송되지 않은 같은 step 이벤트를 대체."""
+        urgent = not coalesce or event.get('step') in URGENT_STEPS
+        key = ('step', event.get('step')) if not urgent else ('seq', next(self._seq))
+        with self._cond:
+            if self._closed:
+                return  # 클라이언트 연결이 끊김
+            # 다시 들어온 step은 맨 뒤로 (전송 순서 = 최신 이벤트 순서)
+            self._pending.pop(key, None)
+            self._pending[key] = event
+            self._urgent = self._urgent or urgent
+            self._cond.notify_all()
+
+    def progress_callback(self, step, progress, message, details=None):
+        """analyze_question / generate_variants_via_code의 progress_callback 형식"""
+        self.emit({'step': step, 'progress': progress, 'message': message, **(details or {})})
+
+    def finish(self, result=None, error=None):
+        with self._cond:
+            self._result = result
+            self._error = error
+            self._done = True
+            self._cond.notify_all()
+
+    def result(self):
+        """작업 결과. 작업에서 예외가 났으면 그 예외를 다시 발생시킴."""
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def sse(self, heartbeat: float = HEARTBEAT_INTERVAL):
+        """작업이 끝날 때까지 이벤트를 SSE 문자열로 내보내는 제너레이터.
+        끝나면 남은 이벤트까지 보내고 종료 (결과는 result()로 확인)
+        """
+        last_flush = 0.0
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._pending or self._done, timeout=heartbeat)
+                    wait = COALESCE_INTERVAL - (time.monotonic() - last_flush)
+                    if self._pending and not self._done and not self._urgent and wait > 0:
+                        # 방금 보냈으면 조금 더 모아서 같은 step은 최신 것만 보냄
+                        self._cond.wait_for(lambda: self._done or self._urgent, timeout=wait)
+                    events = list(self._pending.values())
+                    self._pending.clear()
+                    self._urgent = False
+                    done = self._done
+
+                if not events and not done:
+                    yield HEARTBEAT
+                    continue
+                for event in events:
+                    yield sse_event(event)
+                last_flush = time.monotonic()
+                if done:
+                    return
+        finally:
+            with self._cond:
+                self._closed = True
+                self._pending.clear()
+            # 아직 대기열에 있으면 취소 (이미 실행 중이면 cancel()은 아무것도 하지 않음)
+            if self._future is not None and not self._done and self._future.cancel():
+                print("🛑 클라이언트 연결 종료로 대기 중인 작업 취소")
+
+
+class JobExecutor:
+    """크기가 정해진 공용 스레드 풀 (지연 생성)"""
+
+    def __init__(self, max_workers: int = JOB_WORKERS):
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._active = 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+                print(f"🧵 작업 스레드 풀 시작 (최대 {self.max_workers}개)")
+            return self._executor
+
+    def start(self, fn, *args, **kwargs) -> JobStream:
+        """fn(*args, stream=..., **kwargs)를 풀에서 실행하고 JobStream을 반환합니다.
+        fn은 stream 키워드 인자로 진행 이벤트를 보낼 수 있음. 현재 컨텍스트(트레이스)를 이어받음.
+        """
+        stream = JobStream()
+        context = contextvars.copy_context()
+
+        def run():
+            try:
+                stream.finish(result=context.run(fn, *args, stream=stream, **kwargs))
+            except BaseException as e:
+                stream.finish(error=e)
+
+        def release(_future):
+            # 실행이 끝났거나 시작 전에 취소됨
+            with self._lock:
+                self._active -= 1
+
+        with self._lock:
+            self._active += 1
+            queued = self._active - self.max_workers
+        if queued > 0:
+            stream.emit({'step': 'queued', 'message': f'작업 대기 중... (앞에 {queued}개)'})
+        future = self._get_executor().submit(run)
+        future.add_done_callback(release)
+        stream._future = future
+        return stream
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'max_workers': self.max_workers, 'active': min(self._active, self.max_workers),
+                    'queued': max(0, self._active - self.max_workers)}
+
+
+_executor = JobExecutor()
+
+
+def get_executor() -> JobExecutor:
+    return _executor
+
+
+def start_job(fn, *args, **kwargs) -> JobStream:
+    """공용 실행기에서 작업을 시작합니다. (get_executor().start의 축약)"""
+    return _executor.start(fn, *args, **kwargs)
@@ -6,11 +6,12 @@ import re
 import time
 import google.generativeai as genai
 from llm_tracker import tracker
+from utils.model_router import get_model
 
 
 def ask_llm_to_fix_error(error_message: str, error_context: str, original_data: dict) -> dict:
     """LLM에게 오류 수정을 요청합니다."""
-    model_name = 'gemini-2.0-flash'
+    model_name = get_model('fix_error', 'gemini-2.0-flash')
     model = genai.GenerativeModel(model_name)
 
     fix_prompt = f"""다음 오류가 발생했습니다. 문제 데이터를 수정하여 오류를 해결해주세요.
@@ -87,7 +88,7 @@ def ask_llm_to_fix_error(error_message: str, error_context: str, original_data:
 
 def ask_llm_to_fix_json_error(error_message: str, raw_response: str) -> dict:
     """LLM에게 JSON 파싱 오류 수정을 요청합니다."""
-    model_name = 'gemini-2.0-flash'
+    model_name = get_model('fix_json', 'gemini-2.0-flash')
     model = genai.GenerativeModel(model_name)
 
     fix_prompt = f"""다음 JSON 파싱 오류를 수정해주세요.
@@ -0,0 +1,173 @@
+# utils/model_router.py
+"""작업별 Gemini 모델 라우팅
+
+- 작업(operation)마다 모델 체인을 지정 (앞쪽이 빠른 모델, 마지막이 최종 에스컬레이션 모델)
+- 빠른 모델 결과를 로컬 휴리스틱으로 검사해서 실패할 때만 다음 모델로 에스컬레이션
+- 설정 우선순위: MODEL_ROUTES 환경변수(JSON) > config/model_routes.json > 기본값
+- 설정은 파일 mtime과 환경변수 값이 바뀔 때만 다시 읽음 (get_model마다 파싱하지 않음)
+"""
+
+import json
+import os
+import re
+
+# 작업별 기본 모델 체인
+DEFAULT_MODEL_ROUTES = {
+    'analyze_image': ['gemini-2.5-flash', 'gemini-2.5-pro'],
+    'fix_error': ['gemini-2.0-flash'],
+    'fix_json': ['gemini-2.0-flash'],
+    'solve_original': ['gemini-2.0-flash'],
+    'verify_answer': ['gemini-2.0-flash'],
+    'generate_variant_code': ['gemini-2.0-flash'],
+    'analyze_figure_needs': ['gemini-2.5-flash'],
+    'generate_figure_params': ['gemini-2.5-flash'],
+    'generate_figure_from_description': ['gemini-2.5-flash'],
+}
+
+ROUTES_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'model_routes.json')
+
+# 여러 문항일 때 bounding_box 면적 합이 이 값을 넘으면 겹침으로 판단
+MAX_BBOX_AREA_SUM = 1.3
+
+# (설정 파일 mtime, MODEL_ROUTES 값) → 합쳐진 라우팅
+_routes_cache = (None, None)
+
+
+def _routes_key():
+    try:
+        mtime = os.stat(ROUTES_FILE).st_mtime_ns
+    except OSError:
+        mtime = None
+    return mtime, os.environ.get('MODEL_ROUTES')
+
+
+def load_model_routes() -> dict:
+    """기본값에 설정 파일과 환경변수 설정을 덮어써서 반환합니다.
+    설정 파일 mtime과 MODEL_ROUTES가 그대로면 캐시된 결과를 반환 (수정하지 말 것)
+    """
+    global _routes_cache
+    key = _routes_key()
+    cached_key, cached = _routes_cache
+    if cached is not None and cached_key == key:
+        return cached
+
+    routes = dict(DEFAULT_MODEL_ROUTES)
+    sources = []
+    if key[0] is not None:
+        try:
+            with open(ROUTES_FILE, 'r', encoding='utf-8') as f:
+                sources.append(json.load(f))
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ 모델 라우팅 설정 파일 로드 실패: {e}")
+    env_routes = key[1]
+    if env_routes:
+        try:
+            sources.append(json.loads(env_routes))
+        except json.JSONDecodeError as e:
+            print(f"⚠️ MODEL_ROUTES 환경변수 파싱 실패: {e}")
+
+    for source in sources:
+        for operation, chain in source.items():
+            if isinstance(chain, str):
+                chain = [chain]
+            if isinstance(chain, list) and chain:
+                routes[operation] = [str(m) for m in chain]
+    _routes_cache = (key, routes)
+    return routes
+
+
+def get_model_chain(operation: str, default: str = None) -> list:
+    """작업의 모델 체인 (빠른 모델 → 에스컬레이션 모델 순)"""
+    chain = load_model_routes().get(operation)
+    if chain:
+        return list(chain)
+    return [default] if default else []
+
+
+def get_model(operation: str, default: str) -> str:
+    """에스컬레이션 없이 단일 모델만 쓰는 작업의 모델 이름"""
+    chain = get_model_chain(operation, default)
+    return chain[0] if chain else default
+
+
+def _latex_problems(text: str) -> list:
+    """텍스트의 LaTeX 구문 문제를 찾습니다."""
+    if not text or not isinstance(text, str):
+        return []
+    problems = []
+    # 이스케이프되지 않은 $ 개수가 홀수면 수식 구분자가 깨진 것
+    dollars = len(re.findall(r'(?<!\\)\$', text))
+    if dollars % 2 == 1:
+        problems.append('latex_unbalanced_dollar')
+    for math in re.findall(r'\$\$[\s\S]*?\$\$|\$[^$]+?\$', text):
+        depth = 0
+        for i, c in enumerate(math):
+            if c in '{}' and i > 0 and math[i - 1] == '\\':
+                continue
+            if c == '{':
+                depth += 1
+            elif c == '}':
+                depth -= 1
+                if depth < 0:
+                    break
+        if depth != 0:
+            problems.append('latex_unbalanced_braces')
+            break
+    # JSON 이스케이프가 손상되어 제어 문자가 남은 경우
+    if re.search(r'[\x00-\x08\x0b\x0c\x0e-\x1f]', text):
+        problems.append('latex_control_char')
+    return problems
+
+
+def check_analysis_result(result) -> list:
+    """이미지 분석 결과를 로컬 휴리스틱으로 검사합니다.
+
+    Returns:
+        실패한 검사 이름 목록 (빈 리스트면 통과)
+    """
+    if not isinstance(result, dict):
+        return ['invalid_result']
+    questions = result.get('questions')
+    if not isinstance(questions, list) or not questions:
+        return ['no_questions']
+
+    reasons = []
+    bbox_area_sum = 0.0
+    for q in questions:
+        if not isinstance(q, dict):
+            reasons.append('invalid_question')
+            continue
+        if not str(q.get('question_text') or '').strip():
+            reasons.append('empty_question_text')
+        choices = q.get('choices') or []
+        if any(not str((c or {}).get('text', '')).strip() for c in choices if isinstance(c, dict)):
+            reasons.append('empty_choice')
+
+        texts = [q.get('question_text'), q.get('passage')]
+        texts += [c.get('text') for c in choices if isinstance(c, dict)]
+        for text in texts:
+            reasons.extend(_latex_problems(text))
+
+        # 문항 수와 bounding_box 커버리지 비교
+        bbox = q.get('bounding_box')
+        if len(questions) > 1:
+            if not isinstance(bbox, dict):
+                reasons.append('missing_bbox')
+                continue
+            try:
+                x, y = float(bbox.get('x', 0)), float(bbox.get('y', 0))
+                w, h = float(bbox.get('width', 1)), float(bbox.get('height', 1))
+            except (TypeError, ValueError):
+                reasons.append('invalid_bbox')
+                continue
+            if w >= 1 and h >= 1:
+                reasons.append('bbox_full_page')
+            if x < 0 or y < 0 or x + w > 1.05 or y + h > 1.05 or w <= 0 or h <= 0:
+                reasons.append('bbox_out_of_range')
+            bbox_area_sum += max(w, 0) * max(h, 0)
+
+    if len(questions) > 1 and bbox_area_sum > MAX_BBOX_AREA_SUM:
+        reasons.append('bbox_overlap')
+
+    # 중복 제거 (순서 유지)
+    return list(dict.fromkeys(reasons))
@@ -0,0 +1,162 @@
+# utils/render_cache.py
+"""그래프 렌더 결과 캐시 (내용 해시 → 이미지 bytes)
+
+- 키: graph_info + 렌더 옵션을 정렬된 JSON으로 만든 뒤 SHA-256
+- 메모리 계층: 최근 사용 항목을 bytes로 보관 (프로세스 내 LRU)
+- 디스크 계층: root/ab/<key>.<ext>, 읽을 때 mtime을 갱신해서 LRU 순서로 사용
+  용량 한도를 넘으면 mtime이 오래된 파일부터 삭제
+- 디스크 경로를 설정하지 않으면 메모리 계층만 사용
+"""
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+# 렌더링 코드가 바뀌어 결과가 달라지면 올려서 기존 캐시를 무효화
+RENDER_VERSION = 4
+
+MAX_DISK_BYTES = int(os.environ.get('GRAPH_CACHE_MAX_MB', 256)) * 1024 * 1024
+MAX_MEMORY_ITEMS = int(os.environ.get('GRAPH_CACHE_MEMORY_ITEMS', 128))
+
+
+def cache_key(graph_info: dict, **options) -> str:
+    """graph_info와 렌더 옵션의 정규화된 해시"""
+    payload = json.dumps(
+        {'v': RENDER_VERSION, 'graph': graph_info, 'options': options},
+        ensure_ascii=False, sort_keys=True, separators=(',', ':'), default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """메모리 + 디스크 2단계 LRU 캐시"""
+
+    def __init__(self, root: str = None, max_bytes: int = MAX_DISK_BYTES, memory_items: int = MAX_MEMORY_ITEMS):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = None  # 처음 필요할 때 계산
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evicted': 0}
+        if root:
+            os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str, ext: str) -> str:
+        return os.path.join(self.root, key[:2], f'{key}.{ext}')
+
+    def _remember(self, memory_key, data: bytes):
+        with self._lock:
+            self._memory[memory_key] = data
+            self._memory.move_to_end(memory_key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str, ext: str = 'png'):
+        """캐시된 bytes, 없으면 None"""
+        memory_key = (key, ext)
+        with self._lock:
+            data = self._memory.get(memory_key)
+            if data is not None:
+                self._memory.move_to_end(memory_key)
+                self.stats['memory_hits'] += 1
+                return data
+
+        if self.root:
+            path = self._path(key, ext)
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                os.utime(path)  # LRU 순서 갱신
+            except OSError:
+                data = None
+            if data is not None:
+                self.stats['disk_hits'] += 1
+                self._remember(memory_key, data)
+                return data
+
+        self.stats['misses'] += 1
+        return None
+
+    def put(self, key: str, data: bytes, ext: str = 'png'):
+        self._remember((key, ext), data)
+        if not self.root:
+            return
+        path = self._path(key, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{uuid.uuid4().hex[:8]}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ 그래프 캐시 저장 실패: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_size()
+            else:
+                self._disk_bytes += len(data)
+            over = self._disk_bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def _entries(self) -> list:
+        entries = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """디스크 사용량이 한도의 90% 아래로 내려갈 때까지 오래된 파일부터 삭제"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._disk_bytes = total
+            self.stats['evicted'] += removed
+        if removed:
+            print(f"🧹 그래프 캐시 정리: {removed}개 삭제 ({total / 1024 / 1024:.1f}MB 사용 중)")
+
+
+_cache = RenderCache()
+_cache_lock = threading.Lock()
+
+
+def configure(root: str, max_bytes: int = MAX_DISK_BYTES, memory_items: int = MAX_MEMORY_ITEMS) -> RenderCache:
+    """디스크 계층 경로를 설정합니다. (앱 시작 시 한 번)"""
+    global _cache
+    with _cache_lock:
+        _cache = RenderCache(root, max_bytes, memory_items)
+    return _cache
+
+
+def get_cache() -> RenderCache:
+    return _cache
@@ -0,0 +1,152 @@
+# utils/render_pool.py
+"""CPU 작업(그래프 렌더링)을 여러 프로세스에 나눠 실행하는 풀
+
+- matplotlib 렌더링은 GIL을 잡고 있으므로 스레드가 아니라 프로세스로 병렬화
+- 작업 함수는 모듈 최상위 함수여야 함 (spawn 방식으로 워커에서 import)
+- 작업별 시간 제한: 워커 안에서는 SIGALRM 타이머로 중단, 부모는 제한 + 여유 시간까지만 대기
+- 실패/시간 초과는 예외 대신 결과 dict로 반환 ({'ok': False, 'error': ...})
+- 워커가 응답하지 않거나 풀이 깨지면 풀을 버리고 (워커 프로세스 종료) 다음 호출에서 새로 만듦
+- 작업이 하나뿐이어도 시간 제한을 지키기 위해 워커에서 실행 (GRAPH_RENDER_WORKERS=0이면 풀 없이 현재 프로세스에서)
+"""
+
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+MAX_WORKERS = int(os.environ.get('GRAPH_RENDER_WORKERS', min(4, os.cpu_count() or 1)))
+JOB_TIMEOUT = float(os.environ.get('GRAPH_RENDER_TIMEOUT', 20))
+# 워커 타이머가 먼저 동작하도록 부모는 조금 더 기다림
+PARENT_GRACE = 2.0
+
+
+class JobTimeout(Exception):
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise JobTimeout()
+
+
+def _run_job(fn, args, timeout):
+    """워커 프로세스에서 실행: 시간 제한을 걸고 결과/오류를 dict로 반환"""
+    start = time.perf_counter()
+    use_alarm = timeout and hasattr(signal, 'setitimer')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        value = fn(*args)
+        result = {'ok': True, 'value': value}
+    except JobTimeout:
+        result = {'ok': False, 'error': f'시간 초과 ({timeout:g}초)'}
+    except Exception as e:
+        result = {'ok': False, 'error': f'{type(e).__name__}: {e}'}
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return result
+
+
+def _warmup(initializer):
+    if initializer:
+        initializer()
+
+
+class RenderPool:
+    """지연 생성되는 ProcessPoolExecutor 래퍼"""
+
+    def __init__(self, max_workers: int = MAX_WORKERS, initializer=None):
+        self.max_workers = max_workers
+        self.initializer = initializer
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_warmup,
+                    initargs=(self.initializer,),
+                )
+                print(f"🧵 렌더 프로세스 풀 시작 (워커 {self.max_workers}개)")
+            return self._executor
+
+    def _discard(self, executor):
+        """응답 없는 워커가 있는 풀을 버리고 워커 프로세스를 종료합니다.
+        같은 풀을 쓰던 다른 요청의 작업은 실패 결과(취소/워커 종료)로 돌아감
+        """
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        processes = list((getattr(executor, '_processes', None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        if processes:
+            print(f"🧹 응답 없는 렌더 프로세스 풀 정리 (워커 {len(processes)}개 종료)")
+
+    def map(self, fn, args_list, timeout: float = JOB_TIMEOUT) -> list:
+        """args_list의 각 인자로 fn을 병렬 실행합니다. 결과 순서는 입력 순서와 같음.
+
+        Returns:
+            [{'ok': bool, 'value': ..., 'error': str, 'elapsed_ms': float}]
+        """
+        args_list = [tuple(args) for args in args_list]
+        if not args_list:
+            return []
+        # 워커를 쓰지 않도록 설정했으면 (시간 제한 없이) 현재 프로세스에서 실행
+        if self.max_workers <= 0:
+            return [_run_inline(fn, args) for args in args_list]
+
+        try:
+            executor = self._get_executor()
+            futures = [executor.submit(_run_job, fn, args, timeout) for args in args_list]
+        except (BrokenProcessPool, RuntimeError, OSError) as e:
+            print(f"⚠️ 렌더 프로세스 풀 사용 불가, 현재 프로세스에서 실행: {e}")
+            return [_run_inline(fn, args) for args in args_list]
+
+        # 모든 작업이 동시에 시작되므로 마감 시각은 (대기열 길이 / 워커 수)만큼 늘려서 계산
+        rounds = -(-len(futures) // self.max_workers)
+        deadline = time.monotonic() + timeout * rounds + PARENT_GRACE
+        results = []
+        broken = False
+        for future in futures:
+            try:
+                results.append(future.result(timeout=max(0.0, deadline - time.monotonic())))
+            except FutureTimeout:
+                future.cancel()
+                broken = True
+                results.append({'ok': False, 'error': f'시간 초과 ({timeout:g}초)', 'elapsed_ms': None})
+            except BrokenProcessPool as e:
+                broken = True
+                results.append({'ok': False, 'error': f'렌더 워커 종료: {e}', 'elapsed_ms': None})
+            except CancelledError:
+                # 다른 요청이 응답 없는 풀을 버리면서 대기 중이던 작업이 취소됨
+                results.append({'ok': False, 'error': '렌더 작업 취소됨 (풀 재시작)', 'elapsed_ms': None})
+        if broken:
+            self._discard(executor)
+        return results
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_inline(fn, args):
+    start = time.perf_counter()
+    try:
+        result = {'ok': True, 'value': fn(*args)}
+    except Exception as e:
+        result = {'ok': False, 'error': f'{type(e).__name__}: {e}'}
+    result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return result
@@ -0,0 +1,181 @@
+# utils/sampling.py
+"""함수 그래프용 적응형 샘플링
+
+- 균일 격자(INITIAL_SEGMENTS)에서 시작해서, 구간 중점 값이 양 끝점의 선형 보간과
+  많이 다른 구간(곡률이 크거나 급변하는 구간)만 반으로 나눔
+- 한 라운드의 중점들은 한 번의 벡터 호출로 계산 → 평가 횟수는 필요한 곳에만 쓰임
+- 최소 폭까지 나눠도 오차가 남는 구간은 불연속(점프/점근선)으로 보고 NaN을 넣어
+  matplotlib이 그 사이를 잇지 않게 함 (1/x, tan(x)의 가짜 수직선 방지)
+- 정의역 경계(sqrt, log 등)는 유한/비유한 경계 구간을 계속 나눠서 끝점까지 그림
+- 표시 범위(y_limits) 밖에 완전히 벗어난 구간은 나누지 않음 → 점근선 근처에서 예산을 낭비하지 않음
+"""
+
+from collections import namedtuple
+
+INITIAL_SEGMENTS = 64
+MAX_EVALS = 400
+MAX_DEPTH = 12
+# 허용 오차: 표시 범위 높이 대비 비율 (500px 높이 기준 약 1px)
+TOLERANCE = 0.002
+
+Sample = namedtuple('Sample', ['x', 'ys', 'breaks', 'evaluations', 'y_limits'])
+
+
+def _call(np, f, x):
+    """f(x)를 x와 같은 모양의 float 배열로 (상수 함수 대응)"""
+    with np.errstate(all='ignore'):
+        return np.array(np.broadcast_to(np.asarray(f(x), dtype=float), x.shape))
+
+
+def _crossing(yl, yr, lo, hi):
+    """구간 양 끝이 표시 범위의 위/아래 반대편 바깥에 있는지"""
+    return ((yl > hi) & (yr < lo)) | ((yl < lo) & (yr > hi))
+
+
+def _errors(np, yl, yr, ym):
+    """중점의 선형 보간 오차. 끝점/중점 중 일부만 유한하면 정의역 경계이므로 inf."""
+    with np.errstate(all='ignore'):
+        err = np.abs(ym - (yl + yr) / 2)
+    finite = np.isfinite(yl) & np.isfinite(yr) & np.isfinite(ym)
+    none = ~np.isfinite(yl) & ~np.isfinite(yr) & ~np.isfinite(ym)
+    return np.where(finite, err, np.where(none, 0.0, np.inf))
+
+
+def adaptive_sample(funcs, x_min: float, x_max: float, max_evals: int = MAX_EVALS,
+                    detect_breaks: bool = True, y_limits=None) -> Sample:
+    """여러 함수를 같은 x 격자로 적응형 샘플링합니다.
+
+    Args:
+        funcs: x 배열 → y 배열 함수 목록 (utils.expression.Expression 등)
+        x_min, x_max: 구간
+        max_evals: 함수당 최대 평가 점 수
+        detect_breaks: 불연속 구간에 NaN을 넣을지 여부 (영역 채우기용 공통 격자는 False)
+        y_limits: 표시할 y 범위 (없으면 초기 격자 값의 분위수로 추정)
+
+    Returns:
+        Sample(x, ys, breaks, evaluations, y_limits) - ys[i]는 funcs[i]의 값,
+        breaks는 불연속 x 위치, y_limits는 표시 범위 (지정하지 않았으면 모든 함수 값으로 추정)
+    """
+    import numpy as np
+
+    x_min, x_max = float(x_min), float(x_max)
+    if x_max < x_min:
+        x_min, x_max = x_max, x_min
+    segments = min(INITIAL_SEGMENTS, max(2, max_evals // 4))
+    x = np.linspace(x_min, x_max, segments + 1)
+    ys = [_call(np, f, x) for f in funcs]
+    evaluations = x.size * len(funcs)
+    grid_ys = ys
+    given_limits = y_limits
+    if y_limits is None:
+        # 정밀도/숨김 판단용 범위는 넉넉하게 (표시 범위는 마지막에 따로 계산)
+        y_limits = robust_ylim(ys, margin=0.5) or (-1.0, 1.0)
+    lo, hi = y_limits
+    tol = TOLERANCE * (hi - lo)
+    min_width = (x_max - x_min) / segments / 2 ** MAX_DEPTH
+
+    active = np.ones(segments, dtype=bool)
+    # 불연속 구간의 중점: [(x, 함수 인덱스)]
+    breaks = []
+    max_evals *= len(funcs)
+    while active.any() and evaluations < max_evals:
+        idx = np.flatnonzero(active)
+        xm = (x[idx] + x[idx + 1]) / 2
+        yms = [_call(np, f, xm) for f in funcs]
+        evaluations += xm.size * len(funcs)
+
+        width = x[idx + 1] - x[idx]
+        need = np.zeros(idx.size, dtype=bool)
+        errors = []
+        for k, (y, ym) in enumerate(zip(ys, yms)):
+            yl, yr = y[idx], y[idx + 1]
+            err = _errors(np, yl, yr, ym)
+            # 세 점이 모두 표시 범위 위쪽(또는 아래쪽)이면 보이지 않으므로 나누지 않음
+            # 양 끝이 범위 반대편 바깥이고 중점도 바깥이면 점근선 → 더 나누지 않고 마지막에 끊음
+            with np.errstate(invalid='ignore'):
+                hidden = ((yl > hi) & (yr > hi) & (ym > hi)) | ((yl < lo) & (yr < lo) & (ym < lo))
+                pole = _crossing(yl, yr, lo, hi) & ((ym > hi) | (ym < lo))
+            err = np.where(hidden | pole, 0.0, err)
+            errors.append(err)
+            over = err > tol
+            if detect_breaks:
+                # 최소 폭까지 나눴는데도 중점이 양 끝의 중간이 아니면 점프/점근선
+                with np.errstate(all='ignore'):
+                    jump = np.abs(yr - yl)
+                stuck = over & (width <= 2 * min_width) & np.isfinite(err) & (err > 0.25 * jump)
+                breaks.extend((xm[i], k) for i in np.flatnonzero(stuck))
+            need |= over
+        need &= width > 2 * min_width
+
+        # 계산한 중점은 모두 사용 (추가 평가 없이 정확도가 올라감)
+        insert_at = idx + 1
+        x = np.insert(x, insert_at, xm)
+        ys = [np.insert(y, insert_at, ym) for y, ym in zip(ys, yms)]
+
+        # 다음 라운드: 오차가 큰 구간의 두 하위 구간만 (예산이 모자라면 오차가 큰 순서로)
+        budget = (max_evals - evaluations) // len(funcs) // 2
+        chosen = np.flatnonzero(need)
+        if chosen.size > budget:
+            worst = np.max(errors, axis=0)
+            chosen = chosen[np.argsort(-worst[chosen], kind='stable')[:max(budget, 0)]]
+        mid_pos = insert_at + np.arange(insert_at.size)  # 삽입 후 중점 위치
+        active = np.zeros(x.size - 1, dtype=bool)
+        active[mid_pos[chosen] - 1] = True
+        active[mid_pos[chosen]] = True
+
+    ys = [np.where(np.isfinite(y), y, np.nan) for y in ys]
+    if detect_breaks:
+        # 한 구간 안에서 표시 범위 위아래를 가로지르는 곳(점근선)도 끊음
+        for k, y in enumerate(ys):
+            with np.errstate(invalid='ignore'):
+                cross = np.flatnonzero(_crossing(y[:-1], y[1:], lo, hi))
+            breaks.extend(((x[i] + x[i + 1]) / 2, k) for i in cross)
+
+    break_xs = sorted({float(xb) for xb, _ in breaks})
+    if breaks:
+        # 끊을 위치에 점이 없으면 추가하고, 해당 함수의 값만 NaN으로
+        new_xs = np.array([xb for xb in break_xs if not np.isin(xb, x)])
+        if new_xs.size:
+            pos = np.searchsorted(x, new_xs)
+            x = np.insert(x, pos, new_xs)
+            ys = [np.insert(y, pos, _call(np, f, new_xs)) for f, y in zip(funcs, ys)]
+        for xb, k in breaks:
+            ys[k][np.searchsorted(x, xb)] = np.nan
+        ys = [np.where(np.isfinite(y), y, np.nan) for y in ys]
+    if given_limits is None:
+        # 표시 범위: 균일 격자 값 기준 (촘촘한 점근선 근처 값에 끌려가지 않게)
+        # 불연속이 없으면 최솟값~최댓값 전체, 있으면 2~98 분위수
+        percentiles = (2, 98) if break_xs else (0, 100)
+        display = robust_ylim(grid_ys, percentiles=percentiles) or (lo, hi)
+    else:
+        display = (lo, hi)
+    return Sample(x, ys, break_xs, evaluations, display)
+
+
+def sample_function(func, x_min: float, x_max: float, max_evals: int = MAX_EVALS, y_limits=None) -> Sample:
+    """함수 하나를 샘플링합니다. (adaptive_sample의 축약, ys[0]이 y 값)"""
+    return adaptive_sample([func], x_min, x_max, max_evals, y_limits=y_limits)
+
+
+def robust_ylim(ys, margin: float = 0.1, percentiles=(2, 98)):
+    """점근선 근처의 큰 값을 제외한 y 표시 범위 (2~98 분위수 + 여백). 값이 없으면 None."""
+    import numpy as np
+
+    finite = np.concatenate([np.asarray(y)[np.isfinite(y)] for y in ys]) if ys else np.array([])
+    if finite.size < 2:
+        return None
+    lo, hi = np.percentile(finite, percentiles)
+    pad = (hi - lo) * margin or 1.0
+    return float(lo - pad), float(hi + pad)
+
+
+def point_at(x, y, ratio: float):
+    """x 구간의 ratio 위치에 가장 가까운 유한한 점 (레이블 위치용). 없으면 None."""
+    import numpy as np
+
+    finite = np.flatnonzero(np.isfinite(y))
+    if not finite.size:
+        return None
+    target = x[0] + (x[-1] - x[0]) * ratio
+    i = finite[np.argmin(np.abs(x[finite] - target))]
+    return float(x[i]), float(y[i])
@@ -0,0 +1,197 @@
+# utils/session_catalog.py
+"""세션 카탈로그 (SQLite 인덱스)
+
+- 세션 목록 조회 시 모든 metadata.json을 읽지 않도록 요약 정보를 SQLite에 보관
+- 세션 생성/수정/재분석/삭제 시 트랜잭션으로 갱신
+- 페이지네이션, 정렬, 이름 검색 지원
+- 디스크의 세션 폴더에서 전체 재구축 가능 (마이그레이션용)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# 정렬 가능한 컬럼 (요청 파라미터 → SQL 컬럼)
+SORTABLE_COLUMNS = {
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+    'name': 'name COLLATE NOCASE',
+    'question_count': 'question_count',
+}
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    created_at TEXT,
+    updated_at TEXT,
+    question_count INTEGER DEFAULT 0,
+    image_filename TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_created_at ON sessions(created_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions(updated_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_name ON sessions(name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+'''
+
+
+def _row_from_metadata(session_id: str, metadata: dict) -> tuple:
+    return (
+        session_id,
+        metadata.get('name', session_id),
+        metadata.get('created_at') or '',
+        metadata.get('updated_at') or '',
+        int(metadata.get('question_count', 0) or 0),
+        metadata.get('image_filename'),
+    )
+
+
+class SessionCatalog:
+    """세션 요약 정보를 담는 SQLite 카탈로그"""
+
+    def __init__(self, db_path: str, sessions_folder: str):
+        self.db_path = db_path
+        self.sessions_folder = sessions_folder
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        is_new = not os.path.exists(db_path)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+        # 카탈로그가 처음 만들어졌으면 기존 세션 폴더에서 채움
+        if is_new and os.path.isdir(sessions_folder) and os.listdir(sessions_folder):
+            count = self.rebuild()
+            print(f"📇 세션 카탈로그 생성: {count}개 세션 등록")
+
+    def _connect(self) -> sqlite3.Connection:
+        """스레드별 연결을 재사용합니다."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _bump_version(self, conn):
+        """변경이 있을 때마다 카탈로그 버전을 올립니다. (같은 트랜잭션 안에서 호출)"""
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('version', '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('modified_at', ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (str(time.time()),)
+        )
+
+    def version(self) -> tuple:
+        """(버전, 마지막 변경 시각) - 목록 응답의 ETag/Last-Modified에 사용"""
+        rows = dict(self._connect().execute('SELECT key, value FROM meta').fetchall())
+        modified_at = rows.get('modified_at')
+        return int(rows.get('version', 0)), float(modified_at) if modified_at else None
+
+    def upsert(self, session_id: str, metadata: dict):
+        """세션 요약 정보를 추가하거나 갱신합니다."""
+        with self._connect() as conn:
+            conn.execute(
+                '''INSERT INTO sessions (id, name, created_at, updated_at, question_count, image_filename)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(id) DO UPDATE SET
+                       name = excluded.name,
+                       created_at = excluded.created_at,
+                       updated_at = excluded.updated_at,
+                       question_count = excluded.question_count,
+                       image_filename = excluded.image_filename''',
+                _row_from_metadata(session_id, metadata)
+            )
+            self._bump_version(conn)
+
+    def delete(self, session_id: str):
+        with self._connect() as conn:
+            cur = conn.execute('DELETE FROM sessions WHERE id = ?', (session_id,))
+            if cur.rowcount:
+                self._bump_version(conn)
+
+    def list(self, limit: int = None, offset: int = 0, sort: str = 'created_at',
+             order: str = 'desc', q: str = None, after: tuple = None) -> tuple:
+        """세션 목록을 조회합니다.
+
+        Args:
+            after: 이전 페이지의 커서 키 (정렬 기준, 방향, 정렬 값, id).
+                지정하면 offset 대신 커서 방식으로 조회. 정렬 기준/방향이 다르면 ValueError
+
+        Returns:
+            (세션 dict 목록, 필터 조건에 맞는 전체 개수, 다음 페이지 커서 키 또는 None)
+        """
+        if sort not in SORTABLE_COLUMNS:
+            sort = 'created_at'
+        sort_column = SORTABLE_COLUMNS[sort]
+        direction = 'ASC' if str(order).lower() == 'asc' else 'DESC'
+        if after is not None:
+            if len(after) != 4 or tuple(after[:2]) != (sort, direction.lower()):
+                raise ValueError('커서의 정렬 기준이 요청과 다릅니다.')
+            after = after[2:]
+
+        conditions = []
+        params = []
+        if q:
+            escaped = q.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            conditions.append("name LIKE ? ESCAPE '\\'")
+            params.append(f'%{escaped}%')
+
+        conn = self._connect()
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        total = conn.execute(f'SELECT COUNT(*) FROM sessions {where}', params).fetchone()[0]
+
+        if after is not None:
+            op = '>' if direction == 'ASC' else '<'
+            conditions.append(f'({sort_column} {op} ? OR ({sort_column} = ? AND id {op} ?))')
+            params += [after[0], after[0], after[1]]
+            where = f"WHERE {' AND '.join(conditions)}"
+
+        sql = f'SELECT * FROM sessions {where} ORDER BY {sort_column} {direction}, id {direction}'
+        if limit is not None:
+            # 다음 페이지 존재 여부를 알기 위해 하나 더 조회
+            sql += ' LIMIT ?'
+            params.append(int(limit) + 1)
+            if after is None:
+                sql += ' OFFSET ?'
+                params.append(int(offset or 0))
+        rows = [dict(row) for row in conn.execute(sql, params).fetchall()]
+
+        next_key = None
+        if limit is not None and len(rows) > limit and limit > 0:
+            rows = rows[:limit]
+            # 커서에 정렬 기준/방향을 넣어서 다른 정렬로 재사용하지 못하게 함
+            next_key = (sort, direction.lower(), rows[-1][sort], rows[-1]['id'])
+        return rows, total, next_key
+
+    def rebuild(self) -> int:
+        """세션 폴더를 스캔해서 카탈로그를 다시 만듭니다. 등록된 세션 수를 반환합니다."""
+        rows = []
+        if os.path.isdir(self.sessions_folder):
+            for session_id in os.listdir(self.sessions_folder):
+                metadata_file = os.path.join(self.sessions_folder, session_id, 'metadata.json')
+                if not os.path.isfile(metadata_file):
+                    continue
+                try:
+                    with open(metadata_file, 'r', encoding='utf-8') as f:
+                        rows.append(_row_from_metadata(session_id, json.load(f)))
+                except (OSError, json.JSONDecodeError) as e:
+                    print(f"⚠️ 메타데이터 로드 실패 ({session_id}): {e}")
+
+        with self._connect() as conn:
+            conn.execute('DELETE FROM sessions')
+            conn.executemany(
+                'INSERT INTO sessions (id, name, created_at, updated_at, question_count, image_filename) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            self._bump_version(conn)
+        return len(rows)
@@ -0,0 +1,122 @@
+# utils/storage.py
+"""세션 JSON 파일의 원자적 쓰기와 쓰기 잠금
+
+- 임시 파일에 쓴 뒤 os.replace로 교체 → 읽는 쪽은 항상 완전한 파일만 봄 (읽기는 잠금 없음)
+- 세션별 advisory lock (fcntl.flock)은 쓰기 경로에서만 사용
+  잠금 파일은 세션 폴더 밖(sessions/.locks/)에 두고, 잠근 뒤 세션 폴더가 없으면 SessionNotFound
+  → 삭제와 경합한 쓰기가 지워진 세션 폴더를 다시 만들지 않음
+- 메타데이터 version 카운터로 compare-and-swap 갱신
+"""
+
+import json
+import os
+import tempfile
+import threading
+import weakref
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows 등 fcntl이 없는 환경은 프로세스 내 잠금만 사용
+    fcntl = None
+
+LOCKS_DIRNAME = '.locks'
+
+# 사용 중인 잠금만 유지 (아무도 참조하지 않으면 자동으로 빠짐)
+_thread_locks = weakref.WeakValueDictionary()
+_thread_locks_guard = threading.Lock()
+
+
+class SessionNotFound(FileNotFoundError):
+    """잠금을 잡았을 때 세션 폴더가 없음 (삭제된 세션)"""
+
+
+class VersionConflict(Exception):
+    """compare-and-swap 갱신 시 버전이 일치하지 않을 때 발생"""
+
+    def __init__(self, expected, current):
+        super().__init__(f"버전 충돌: 요청 버전 {expected}, 현재 버전 {current}")
+        self.expected = expected
+        self.current = current
+
+
+def atomic_write_json(path: str, data, indent: int = 2):
+    """JSON을 같은 폴더의 임시 파일에 쓴 뒤 원자적으로 교체합니다."""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp_', suffix='.json', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_json(path: str, default=None):
+    """JSON 파일을 읽습니다. 파일이 없으면 default를 반환합니다."""
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _thread_lock(key: str) -> threading.Lock:
+    with _thread_locks_guard:
+        lock = _thread_locks.get(key)
+        if lock is None:
+            lock = _thread_locks[key] = threading.Lock()
+        return lock
+
+
+@contextmanager
+def session_lock(session_path: str):
+    """세션 쓰기 잠금 (같은 프로세스의 스레드 + 다른 워커 프로세스 모두 배제)
+
+    Raises:
+        SessionNotFound: 잠근 시점에 세션 폴더가 없음
+    """
+    session_path = os.path.abspath(session_path)
+    lock = _thread_lock(session_path)
+    with lock:
+        if fcntl is None:
+            _require_dir(session_path)
+            yield
+            return
+        locks_dir = os.path.join(os.path.dirname(session_path), LOCKS_DIRNAME)
+        os.makedirs(locks_dir, exist_ok=True)
+        lock_path = os.path.join(locks_dir, os.path.basename(session_path) + '.lock')
+        with open(lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                _require_dir(session_path)
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _require_dir(session_path: str):
+    if not os.path.isdir(session_path):
+        raise SessionNotFound(f"세션 폴더가 없습니다: {os.path.basename(session_path)}")
+
+
+def write_versioned_json(path: str, data: dict, expected_version: int = None) -> int:
+    """version 필드를 올려서 저장합니다. 호출하는 쪽에서 session_lock을 잡고 있어야 합니다.
+
+    Args:
+        expected_version: 지정하면 현재 파일의 version과 같을 때만 저장 (compare-and-swap)
+
+    Returns:
+        저장된 새 version
+    """
+    current = read_json(path, default={}) or {}
+    current_version = int(current.get('version', 0))
+    if expected_version is not None and int(expected_version) != current_version:
+        raise VersionConflict(expected_version, current_version)
+    data['version'] = current_version + 1
+    atomic_write_json(path, data)
+    return data['version']
@@ -0,0 +1,355 @@
+# utils/svg_graph.py
+"""단순 그래프 유형의 순수 파이썬 SVG 렌더러
+
+- number_line, coordinate, sequence, geometry(polygon/circle/line/arc)만 지원
+- matplotlib 경로와 같은 plot_data 스키마를 읽음
+- 해상도에 무관한 작은 SVG 문자열을 바로 만들어서 반환 (matplotlib 미사용)
+- 지원하지 않는 유형/도형이면 None → 호출하는 쪽에서 matplotlib으로 대체
+"""
+
+import math
+import re
+from xml.sax.saxutils import escape
+
+SUPPORTED_TYPES = ('number_line', 'coordinate', 'sequence', 'geometry')
+GEOMETRY_SHAPES = ('polygon', 'circle', 'line', 'arc')
+
+WIDTH, HEIGHT = 360, 300
+NUMBER_LINE_HEIGHT = 90
+MARGIN = 30
+MAX_TICKS = 20
+
+# 수능 스타일: 흑백/회색 톤만 사용
+INK = '#000'
+SHADE = '#808080'
+SHADE_OPACITY = 0.3
+
+_LATEX_SYMBOLS = [
+    (r'\left', ''), (r'\right', ''), (r'\times', '×'), (r'\theta', 'θ'), (r'\triangle', '△'),
+    (r'\angle', '∠'), (r'\alpha', 'α'), (r'\beta', 'β'), (r'\sqrt', '√'), (r'\cdot', '·'),
+    (r'\circ', '°'), (r'\pi', 'π'), (r'\leq', '≤'), (r'\geq', '≥'), (r'\le', '≤'), (r'\ge', '≥'),
+]
+_SUB = str.maketrans('0123456789+-n', '₀₁₂₃₄₅₆₇₈₉₊₋ₙ')
+_SUP = str.maketrans('0123456789+-n', '⁰¹²³⁴⁵⁶⁷⁸⁹⁺⁻ⁿ')
+_SUB_RE = re.compile(r'_\{([0-9n+\-]+)\}|_([0-9n])')
+_SUP_RE = re.compile(r'\^\{([0-9n+\-]+)\}|\^([0-9n])')
+
+
+def plain_text(text) -> str:
+    """간단한 LaTeX 레이블을 유니코드 텍스트로 바꾸고 XML 이스케이프합니다. ($a_{3}$ → a₃)"""
+    text = str(text).replace('$', '')
+    for command, symbol in _LATEX_SYMBOLS:
+        text = text.replace(command, symbol)
+    text = _SUB_RE.sub(lambda m: (m.group(1) or m.group(2)).translate(_SUB), text)
+    text = _SUP_RE.sub(lambda m: (m.group(1) or m.group(2)).translate(_SUP), text)
+    text = text.replace('{', '').replace('}', '').replace('\\', '')
+    return escape(text)
+
+
+def _num(value: float) -> str:
+    return f'{value:.1f}'.rstrip('0').rstrip('.')
+
+
+class _Canvas:
+    """데이터 좌표 → SVG 픽셀 좌표 변환과 요소 목록"""
+
+    def __init__(self, bounds, width=WIDTH, height=HEIGHT, equal=False):
+        xmin, xmax, ymin, ymax = bounds
+        if xmax - xmin < 1e-9:
+            xmin, xmax = xmin - 1, xmax + 1
+        if ymax - ymin < 1e-9:
+            ymin, ymax = ymin - 1, ymax + 1
+        self.width, self.height = width, height
+        sx = (width - 2 * MARGIN) / (xmax - xmin)
+        sy = (height - 2 * MARGIN) / (ymax - ymin)
+        if equal:
+            sx = sy = min(sx, sy)
+        # 남는 공간은 가운데 정렬
+        self.sx, self.sy = sx, sy
+        self.ox = (width - (xmax - xmin) * sx) / 2 - xmin * sx
+        self.oy = (height - (ymax - ymin) * sy) / 2 + ymax * sy
+        self.bounds = (xmin, xmax, ymin, ymax)
+        self.items = []
+        self.uses_arrow = False
+
+    def x(self, v) -> str:
+        return _num(self.ox + float(v) * self.sx)
+
+    def y(self, v) -> str:
+        return _num(self.oy - float(v) * self.sy)
+
+    def line(self, x1, y1, x2, y2, width=1.5, color=INK, dash=False, arrow=False, opacity=None):
+        extra = ' stroke-dasharray="4 3"' if dash else ''
+        if arrow:
+            extra += ' marker-end="url(#arrow)"'
+            self.uses_arrow = True
+        if opacity is not None:
+            extra += f' stroke-opacity="{opacity}"'
+        self.items.append(
+            f'<line x1="{self.x(x1)}" y1="{self.y(y1)}" x2="{self.x(x2)}" y2="{self.y(y2)}" '
+            f'stroke="{color}" stroke-width="{width}"{extra}/>'
+        )
+
+    def polyline(self, points, closed=False, fill=False, dash=False, width=1.5):
+        coords = ' '.join(f'{self.x(px)},{self.y(py)}' for px, py in points)
+        tag = 'polygon' if closed else 'polyline'
+        fill_attr = f'fill="{SHADE}" fill-opacity="{SHADE_OPACITY}"' if fill else 'fill="none"'
+        dash_attr = ' stroke-dasharray="4 3"' if dash else ''
+        self.items.append(f'<{tag} points="{coords}" {fill_attr} stroke="{INK}" stroke-width="{width}"{dash_attr}/>')
+
+    def dot(self, px, py, r=3, hollow=False, square=False):
+        fill = '#fff' if hollow else INK
+        if square:
+            self.items.append(
+                f'<rect x="{_num(float(self.x(px)) - r)}" y="{_num(float(self.y(py)) - r)}" '
+                f'width="{2 * r}" height="{2 * r}" fill="{fill}" stroke="{INK}"/>'
+            )
+        else:
+            self.items.append(
+                f'<circle cx="{self.x(px)}" cy="{self.y(py)}" r="{r}" fill="{fill}" stroke="{INK}" stroke-width="1.5"/>'
+            )
+
+    def circle(self, cx, cy, radius):
+        self.items.append(
+            f'<ellipse cx="{self.x(cx)}" cy="{self.y(cy)}" rx="{_num(radius * self.sx)}" ry="{_num(radius * self.sy)}" '
+            f'fill="none" stroke="{INK}" stroke-width="1.5"/>'
+        )
+
+    def arc(self, cx, cy, radius, start_deg, end_deg):
+        a0, a1 = math.radians(start_deg), math.radians(end_deg)
+        sweep = (end_deg - start_deg) % 360 or 360
+        if sweep >= 360:
+            self.circle(cx, cy, radius)
+            return
+        large = 1 if sweep > 180 else 0
+        x0, y0 = cx + radius * math.cos(a0), cy + radius * math.sin(a0)
+        x1, y1 = cx + radius * math.cos(a1), cy + radius * math.sin(a1)
+        # SVG는 y축이 아래로 향하므로 반시계 방향 = sweep-flag 0
+        self.items.append(
+            f'<path d="M{self.x(x0)} {self.y(y0)} A{_num(radius * self.sx)} {_num(radius * self.sy)} 0 {large} 0 '
+            f'{self.x(x1)} {self.y(y1)}" fill="none" stroke="{INK}" stroke-width="1.5"/>'
+        )
+
+    def text(self, px, py, label, dx=5, dy=-5, size=11, anchor='start'):
+        self.items.append(
+            f'<text x="{_num(float(self.x(px)) + dx)}" y="{_num(float(self.y(py)) + dy)}" '
+            f'font-size="{size}" text-anchor="{anchor}">{plain_text(label)}</text>'
+        )
+
+    def axes(self, x_label='x', y_label='y'):
+        """원점을 지나는 화살표 축 (범위 밖이면 가장자리)"""
+        xmin, xmax, ymin, ymax = self.bounds
+        y0 = min(max(0, ymin), ymax)
+        x0 = min(max(0, xmin), xmax)
+        self.line(xmin, y0, xmax, y0, width=1, arrow=True)
+        self.line(x0, ymin, x0, ymax, width=1, arrow=True)
+        self.text(xmax, y0, x_label, dx=8, dy=4, size=14)
+        self.text(x0, ymax, y_label, dx=0, dy=-8, size=14, anchor='middle')
+
+    def svg(self, title: str = '') -> str:
+        height = self.height + (24 if title else 0)
+        parts = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width}" height="{height}" '
+            f'viewBox="0 0 {self.width} {height}" font-family="DejaVu Sans, sans-serif">'
+        ]
+        if self.uses_arrow:
+            parts.append(
+                '<defs><marker id="arrow" viewBox="0 0 10 10" refX="9" refY="5" markerWidth="7" markerHeight="7" '
+                f'orient="auto-start-reverse"><path d="M0 0L10 5L0 10z" fill="{INK}"/></marker></defs>'
+            )
+        parts.append('<rect width="100%" height="100%" fill="#fff"/>')
+        if title:
+            parts.append(
+                f'<text x="{self.width / 2:.0f}" y="18" font-size="13" text-anchor="middle">{plain_text(title)}</text>'
+                '<g transform="translate(0 24)">'
+            )
+        parts.extend(self.items)
+        if title:
+            parts.append('</g>')
+        parts.append('</svg>')
+        return ''.join(parts)
+
+
+def _padded(xs, ys, pad=1.0):
+    return min(xs) - pad, max(xs) + pad, min(ys) - pad, max(ys) + pad
+
+
+def _number_line(plot_data: dict, title: str):
+    points = [float(p) for p in plot_data.get('points', [])]
+    labels = plot_data.get('labels', [])
+    intervals = plot_data.get('intervals', [])
+
+    all_points = list(points)
+    for interval in intervals:
+        all_points.extend([interval.get('start', 0), interval.get('end', 1)])
+    min_val, max_val = (min(all_points) - 1, max(all_points) + 1) if all_points else (-5, 5)
+
+    c = _Canvas((min_val, max_val, -0.5, 0.5), height=NUMBER_LINE_HEIGHT)
+    c.line(min_val, 0, max_val, 0)
+
+    # 눈금 (범위가 넓으면 간격을 늘림)
+    step = max(1, math.ceil((int(max_val) - int(min_val)) / MAX_TICKS))
+    for t in range(int(min_val), int(max_val) + 1, step):
+        c.line(t, -0.08, t, 0.08, width=1)
+        c.text(t, 0, str(t), dx=0, dy=18, size=10, anchor='middle')
+
+    for interval in intervals:
+        start, end = interval.get('start', 0), interval.get('end', 1)
+        c.line(start, 0, end, 0, width=3, color=SHADE, opacity=0.6)
+        c.dot(start, 0, r=4, hollow=interval.get('open_start', False))
+        c.dot(end, 0, r=4, hollow=interval.get('open_end', False))
+
+    for i, p in enumerate(points):
+        c.dot(p, 0)
+        label = labels[i] if i < len(labels) else plot_data.get('points', [])[i]
+        c.text(p, 0, label, dx=0, dy=-12, anchor='middle')
+    # 수직선은 matplotlib 경로와 같이 제목 없음
+    return c.svg()
+
+
+def _coordinate(plot_data: dict, title: str):
+    points = [p for p in plot_data.get('points', []) if len(p) >= 2]
+    labels = plot_data.get('labels', [])
+    vectors = plot_data.get('vectors', [])
+
+    xs, ys = [0], [0]
+    for p in points:
+        xs.append(p[0])
+        ys.append(p[1])
+    for vec in vectors:
+        for key in ('start', 'end'):
+            pt = vec.get(key, [0, 0] if key == 'start' else [1, 1])
+            xs.append(pt[0])
+            ys.append(pt[1])
+
+    c = _Canvas(_padded(xs, ys), equal=True)
+    c.axes()
+    for i, p in enumerate(plot_data.get('points', [])):
+        if len(p) < 2:
+            continue
+        c.dot(p[0], p[1])
+        c.text(p[0], p[1], labels[i] if i < len(labels) else f'({p[0]}, {p[1]})')
+    for vec in vectors:
+        start, end = vec.get('start', [0, 0]), vec.get('end', [1, 1])
+        c.line(start[0], start[1], end[0], end[1], arrow=True)
+        if vec.get('label'):
+            c.text((start[0] + end[0]) / 2, (start[1] + end[1]) / 2, vec['label'], size=10)
+    return c.svg(title)
+
+
+def _sequence(plot_data: dict, title: str):
+    terms = [float(t) for t in plot_data.get('terms', [])]
+    if not terms:
+        return None
+    raw_terms = plot_data.get('terms', [])
+    show_sum = plot_data.get('show_sum', False)
+    cumsum = []
+    total = 0.0
+    for t in terms:
+        total += t
+        cumsum.append(total)
+
+    values = terms + (cumsum if show_sum else []) + [0]
+    c = _Canvas((0, len(terms) + 1, min(values), max(values) + (max(values) - min(values) or 1) * 0.15))
+    c.axes('n', 'a_n')
+    for n, (term, raw) in enumerate(zip(terms, raw_terms), 1):
+        c.line(n, 0, n, term, width=1)
+        c.dot(n, term)
+        c.text(n, term, f'a_{{{n}}}={raw}', dy=-8, size=10)
+    if show_sum:
+        c.polyline(list(zip(range(1, len(terms) + 1), cumsum)), dash=True, width=1)
+        for n, s in enumerate(cumsum, 1):
+            c.dot(n, s, r=2.5, square=True)
+        c.text(len(terms), cumsum[-1], 'S_n', dx=8, dy=4, size=10)
+
+    formula = plot_data.get('formula', '')
+    if not title and formula:
+        title = f'수열: {formula}'
+    return c.svg(title)
+
+
+def _geometry(plot_data: dict, title: str):
+    shapes = plot_data.get('shapes', [])
+    # 기존 points 형식 호환성
+    if not shapes and plot_data.get('points'):
+        shapes = [{"type": "polygon", "points": plot_data['points'], "labels": plot_data.get('labels', [])}]
+    if not shapes or any(s.get('type', 'polygon') not in GEOMETRY_SHAPES for s in shapes):
+        return None
+
+    xs, ys = [], []
+    for s in shapes:
+        shape_type = s.get('type', 'polygon')
+        if shape_type == 'polygon':
+            for p in s.get('points', []):
+                xs.append(p[0])
+                ys.append(p[1])
+        elif shape_type in ('circle', 'arc'):
+            (cx, cy), r = s.get('center', [0, 0]), s.get('radius', 1)
+            xs.extend([cx - r, cx + r])
+            ys.extend([cy - r, cy + r])
+        else:
+            for key, default in (('start', [0, 0]), ('end', [1, 1])):
+                pt = s.get(key, default)
+                xs.append(pt[0])
+                ys.append(pt[1])
+    if not xs:
+        return None
+
+    c = _Canvas(_padded(xs, ys, pad=0.5), equal=True)
+    c.axes()
+    for s in shapes:
+        shape_type = s.get('type', 'polygon')
+        if shape_type == 'polygon':
+            points = s.get('points', [])
+            if not points:
+                continue
+            labels = s.get('labels', [])
+            c.polyline([(p[0], p[1]) for p in points], closed=True, fill=True)
+            for i, p in enumerate(points):
+                c.dot(p[0], p[1], r=2.5)
+                c.text(p[0], p[1], labels[i] if i < len(labels) else f'P{i + 1}')
+        elif shape_type == 'circle':
+            center, radius = s.get('center', [0, 0]), s.get('radius', 1)
+            c.circle(center[0], center[1], radius)
+            c.dot(center[0], center[1], r=2)
+            if s.get('label'):
+                c.text(center[0], center[1], s['label'])
+        elif shape_type == 'line':
+            start, end = s.get('start', [0, 0]), s.get('end', [1, 1])
+            c.line(start[0], start[1], end[0], end[1])
+            if s.get('label'):
+                c.text((start[0] + end[0]) / 2, (start[1] + end[1]) / 2, s['label'], dx=0, dy=-8, size=10, anchor='middle')
+        else:
+            center = s.get('center', [0, 0])
+            c.arc(center[0], center[1], s.get('radius', 1), s.get('start_angle', 0), s.get('end_angle', 90))
+
+    for ann in plot_data.get('annotations', []):
+        if ann.get('type') == 'angle':
+            vertex = ann.get('vertex', [0, 0])
+            c.text(vertex[0], vertex[1], ann.get('value', ''), dx=10, dy=-10, size=10)
+    return c.svg(title)
+
+
+_RENDERERS = {
+    'number_line': _number_line,
+    'coordinate': _coordinate,
+    'sequence': _sequence,
+    'geometry': _geometry,
+}
+
+
+def supports(graph_info: dict) -> bool:
+    return bool(graph_info) and graph_info.get('type') in SUPPORTED_TYPES
+
+
+def render_svg(graph_info: dict):
+    """graph_info를 SVG 문자열로 렌더링합니다. 지원하지 않거나 그릴 것이 없으면 None."""
+    render = _RENDERERS.get((graph_info or {}).get('type'))
+    plot_data = (graph_info or {}).get('plot_data')
+    if render is None or not plot_data:
+        return None
+    try:
+        return render(plot_data, graph_info.get('description', ''))
+    except (TypeError, ValueError, IndexError, KeyError) as e:
+        print(f"⚠️ SVG 그래프 렌더링 실패, matplotlib으로 대체: {e}")
+        return None
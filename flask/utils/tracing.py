@@ -0,0 +1,182 @@
+# utils/tracing.py
+"""요청 단위 경량 스팬 트레이싱
+
+- 요청(또는 백그라운드 작업)마다 Trace 하나를 만들고 contextvar로 현재 트레이스를 추적
+- span()으로 구간 시간을 측정 (트레이스가 없으면 아무 것도 하지 않음)
+- 세션 폴더의 traces/ 에 JSON으로 저장, Server-Timing 헤더 생성
+"""
+
+import contextvars
+import functools
+import json
+import os
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from threading import Lock
+
+# 세션별로 보관할 최대 트레이스 개수
+MAX_TRACES_PER_SESSION = 20
+
+_current_trace = contextvars.ContextVar('current_trace', default=None)
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+
+class Trace:
+    """하나의 요청에서 기록된 스팬 모음"""
+
+    def __init__(self, name: str):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.started_at = datetime.now().isoformat()
+        self._start = time.perf_counter()
+        self._lock = Lock()
+        self._seq = 0
+        self.spans = []
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self._start) * 1000, 2)
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """구간 시간을 측정합니다. yield된 dict의 attrs에 값을 추가할 수 있습니다."""
+        with self._lock:
+            self._seq += 1
+            span_id = self._seq
+        parent = _current_span.get()
+        record = {
+            'id': span_id,
+            'parent': parent['id'] if parent else None,
+            'name': name,
+            'start_ms': self.elapsed_ms(),
+            'duration_ms': None,
+            'attrs': attrs,
+        }
+        token = _current_span.set(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record['error'] = str(e)
+            raise
+        finally:
+            record['duration_ms'] = round((time.perf_counter() - start) * 1000, 2)
+            _current_span.reset(token)
+            with self._lock:
+                self.spans.append(record)
+
+    def summary(self) -> dict:
+        """스팬 이름별 호출 횟수와 누적 시간"""
+        totals = {}
+        with self._lock:
+            spans = list(self.spans)
+        for s in spans:
+            entry = totals.setdefault(s['name'], {'count': 0, 'total_ms': 0.0})
+            entry['count'] += 1
+            entry['total_ms'] = round(entry['total_ms'] + (s['duration_ms'] or 0), 2)
+        return totals
+
+    def server_timing(self) -> str:
+        """Server-Timing 헤더 값을 생성합니다."""
+        parts = []
+        for name, entry in self.summary().items():
+            metric = re.sub(r'[^A-Za-z0-9_.\-]', '_', name)
+            parts.append(f'{metric};dur={entry["total_ms"]};desc="x{entry["count"]}"')
+        parts.append(f'total;dur={self.elapsed_ms()}')
+        return ', '.join(parts)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s['start_ms'])
+        return {
+            'trace_id': self.trace_id,
+            'name': self.name,
+            'started_at': self.started_at,
+            'duration_ms': self.elapsed_ms(),
+            'summary': self.summary(),
+            'spans': spans,
+        }
+
+
+def current_trace():
+    """현재 컨텍스트의 트레이스 (없으면 None)"""
+    return _current_trace.get()
+
+
+def set_current(trace):
+    """현재 트레이스를 지정하고 복원용 토큰을 반환합니다."""
+    return _current_trace.set(trace)
+
+
+def reset_current(token):
+    _current_trace.reset(token)
+
+
+@contextmanager
+def activate(trace):
+    """다른 스레드에서 트레이스를 이어서 기록할 때 사용합니다."""
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """현재 트레이스에 스팬을 기록합니다. 트레이스가 없으면 None을 yield합니다."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    with trace.span(name, **attrs) as record:
+        yield record
+
+
+def traced(name: str):
+    """함수 전체를 하나의 스팬으로 기록하는 데코레이터"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def save_trace(trace, session_path: str):
+    """트레이스를 세션 폴더의 traces/ 에 저장하고 오래된 것은 정리합니다."""
+    if trace is None:
+        return None
+    traces_folder = os.path.join(session_path, 'traces')
+    os.makedirs(traces_folder, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filename = f'{timestamp}_{trace.trace_id}.json'
+    with open(os.path.join(traces_folder, filename), 'w', encoding='utf-8') as f:
+        json.dump(trace.to_dict(), f, ensure_ascii=False, indent=2)
+
+    existing = sorted(f for f in os.listdir(traces_folder) if f.endswith('.json'))
+    for old in existing[:-MAX_TRACES_PER_SESSION]:
+        try:
+            os.remove(os.path.join(traces_folder, old))
+        except OSError:
+            pass
+    return filename
+
+
+def load_traces(session_path: str, limit: int = 5) -> list:
+    """세션의 최근 트레이스를 최신순으로 반환합니다."""
+    traces_folder = os.path.join(session_path, 'traces')
+    if not os.path.exists(traces_folder):
+        return []
+    files = sorted((f for f in os.listdir(traces_folder) if f.endswith('.json')), reverse=True)
+    traces = []
+    for filename in files[:limit]:
+        try:
+            with open(os.path.join(traces_folder, filename), 'r', encoding='utf-8') as f:
+                traces.append(json.load(f))
+        except (OSError, json.JSONDecodeError):
+            continue
+    return traces
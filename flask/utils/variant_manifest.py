@@ -0,0 +1,128 @@
+# utils/variant_manifest.py
+"""세션별 변형 문제 manifest (variants/manifest.json)
+
+- 변형 문제 세트를 쓰거나 지울 때 세션 쓰기 잠금 안에서 원자적으로 갱신
+- 항목: 문항 번호, 파일명, 타임스탬프, 생성 시각, 변형 개수, 난이도 분포, 핵심 개념, 파일 크기
+- 목록 API는 파일들을 열지 않고 manifest 하나만 읽음
+- manifest가 없거나 항목 형식(MANIFEST_SCHEMA)이 예전이면 폴더를 한 번 스캔해서 다시 만듦
+"""
+
+import os
+from datetime import datetime
+
+from . import variant_store
+from .storage import atomic_write_json, read_json, session_lock
+
+MANIFEST_FILENAME = 'manifest.json'
+# 항목 필드가 늘어나면 올림 → 예전 manifest는 다음 읽기/갱신 때 다시 스캔 (2: key_concepts 추가)
+MANIFEST_SCHEMA = 2
+
+
+def _parse_filename(stored: str):
+    """q{question_num}_{timestamp}.json/.qvs → (문항 번호, 타임스탬프). 형식이 아니면 None"""
+    if not stored.startswith('q') or not variant_store.is_variant_file(stored) or stored.endswith('_code.json'):
+        return None
+    name = os.path.splitext(stored)[0]
+    parts = name.split('_')
+    return parts[0][1:], '_'.join(parts[1:]) if len(parts) > 1 else ''
+
+
+def build_entry(variants_folder: str, stored: str, header: dict = None) -> dict:
+    """저장된 변형 문제 세트 파일 하나의 manifest 항목을 만듭니다."""
+    question_num, timestamp = _parse_filename(stored)
+    path = os.path.join(variants_folder, stored)
+    if header is None:
+        header = variant_store.read_header(path)
+    json_filename = variant_store.json_name(stored)
+    st = os.stat(path)
+    return {
+        'question_number': question_num,
+        'stored_filename': stored,
+        'json_filename': json_filename,
+        'html_filename': json_filename.replace('.json', '.html'),
+        'timestamp': timestamp,
+        'created': st.st_mtime,
+        'size': st.st_size,
+        'variant_count': header.get('variant_count', 0),
+        'ids': header.get('ids', []),
+        'difficulties': header.get('difficulties', []),
+        'difficulty_counts': header.get('difficulty_counts', {}),
+        'key_concepts': header.get('key_concepts', []),
+    }
+
+
+def _scan(variants_folder: str) -> dict:
+    entries = {}
+    if os.path.isdir(variants_folder):
+        for stored in os.listdir(variants_folder):
+            if _parse_filename(stored) is None:
+                continue
+            try:
+                entries[stored] = build_entry(variants_folder, stored)
+            except Exception as e:
+                print(f"⚠️ 변형 문제 manifest 항목 생성 실패 ({stored}): {e}")
+    return entries
+
+
+def _is_current(manifest) -> bool:
+    return manifest is not None and manifest.get('schema', 1) >= MANIFEST_SCHEMA
+
+
+def _save(variants_folder: str, manifest: dict):
+    manifest['schema'] = MANIFEST_SCHEMA
+    manifest['version'] = int(manifest.get('version', 0)) + 1
+    manifest['updated_at'] = datetime.now().isoformat()
+    atomic_write_json(os.path.join(variants_folder, MANIFEST_FILENAME), manifest)
+
+
+def load_manifest(session_path: str) -> dict:
+    """세션의 변형 문제 manifest를 읽습니다. 없으면 폴더를 스캔해서 만듭니다."""
+    variants_folder = os.path.join(session_path, 'variants')
+    manifest = read_json(os.path.join(variants_folder, MANIFEST_FILENAME))
+    if _is_current(manifest):
+        return manifest
+    if not os.path.isdir(variants_folder):
+        return {'version': 0, 'entries': {}}
+    return rebuild_manifest(session_path)
+
+
+def rebuild_manifest(session_path: str) -> dict:
+    """폴더를 스캔해서 manifest를 다시 만듭니다."""
+    variants_folder = os.path.join(session_path, 'variants')
+    with session_lock(session_path):
+        current = read_json(os.path.join(variants_folder, MANIFEST_FILENAME)) or {}
+        manifest = {'version': current.get('version', 0), 'entries': _scan(variants_folder)}
+        _save(variants_folder, manifest)
+    return manifest
+
+
+def update_manifest(session_path: str, added=None, removed=None, headers=None) -> dict:
+    """파일 추가/삭제를 manifest에 반영합니다.
+
+    Args:
+        added: 새로 저장한 파일명 목록 (.json 또는 .qvs)
+        removed: 삭제한 파일명 목록
+        headers: {파일명: header} - 방금 쓴 데이터에서 만든 헤더 (파일을 다시 읽지 않도록)
+    """
+    variants_folder = os.path.join(session_path, 'variants')
+    headers = headers or {}
+    with session_lock(session_path):
+        manifest = read_json(os.path.join(variants_folder, MANIFEST_FILENAME))
+        if not _is_current(manifest):
+            manifest = {'version': (manifest or {}).get('version', 0), 'entries': _scan(variants_folder)}
+        entries = manifest.setdefault('entries', {})
+        for stored in removed or []:
+            entries.pop(stored, None)
+        for stored in added or []:
+            if _parse_filename(stored) is not None:
+                entries[stored] = build_entry(variants_folder, stored, headers.get(stored))
+        _save(variants_folder, manifest)
+    return manifest
+
+
+def list_entries(session_path: str, question_num: str = None) -> list:
+    """manifest 항목 목록 (question_num을 주면 해당 문항만)"""
+    entries = load_manifest(session_path).get('entries', {}).values()
+    if question_num is not None:
+        entries = [e for e in entries if e.get('question_number') == str(question_num)]
+    return list(entries)
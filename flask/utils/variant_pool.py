@@ -0,0 +1,143 @@
+# utils/variant_pool.py
+"""문제지 조립용 변형 문제 풀 (세션별 메모리 캐시)
+
+- 변형 문제 manifest에서 (파일, 위치, 난이도) 후보를 만들고 난이도별로 버킷 분류
+- manifest 파일 stat이 같으면 그대로 사용, version이 바뀌면 다시 만듦
+- 샘플링은 선택 개수 k에 비례 (전체 풀을 섞거나 리스트 포함 검사하지 않음)
+- 선택된 레코드만 읽고, 읽은 파일은 풀이 유효한 동안 캐시
+"""
+
+import os
+import random
+import threading
+from collections import OrderedDict
+
+from . import variant_manifest, variant_store
+
+# 메모리에 유지할 세션 풀 개수
+MAX_CACHED_POOLS = 64
+DEFAULT_DIFFICULTY = '중'
+
+
+class VariantPool:
+    """한 세션의 변형 문제 후보 인덱스"""
+
+    def __init__(self, session_path: str, manifest: dict):
+        self.session_path = session_path
+        self.variants_folder = os.path.join(session_path, 'variants')
+        self.version = manifest.get('version', 0)
+        # 후보 = (저장 파일명, 레코드 위치, 난이도, 문항 번호)
+        self.items = []
+        self.buckets = {}
+        # 저장 파일별 핵심 개념 (세트 단위)
+        self.concepts = {}
+        # 파일이 지워졌는데 manifest에 남은 항목은 건너뜀 (읽을 때 FileNotFoundError 방지)
+        try:
+            existing = set(os.listdir(self.variants_folder))
+        except OSError:
+            existing = set()
+        for stored, entry in sorted(manifest.get('entries', {}).items()):
+            if stored not in existing:
+                print(f"⚠️ manifest 항목의 파일이 없어 건너뜀: {stored}")
+                continue
+            self.concepts[stored] = entry.get('key_concepts') or []
+            for index, difficulty in enumerate(entry.get('difficulties') or []):
+                item = (stored, index, difficulty or DEFAULT_DIFFICULTY, entry.get('question_number'))
+                self.buckets.setdefault(item[2], []).append(len(self.items))
+                self.items.append(item)
+        self.manifest_stat = None
+        self._records = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.items)
+
+    def counts(self) -> dict:
+        return {difficulty: len(ids) for difficulty, ids in self.buckets.items()}
+
+    def sample(self, count: int, difficulty: str = None, rng=random) -> list:
+        """후보 위치를 count개 뽑습니다. difficulty를 주면 해당 난이도 우선, 부족하면 나머지에서 채움."""
+        count = min(count, len(self.items))
+        if difficulty is None:
+            return rng.sample(range(len(self.items)), count)
+
+        bucket = self.buckets.get(difficulty, [])
+        chosen = rng.sample(bucket, min(count, len(bucket)))
+        need = count - len(chosen)
+        if need <= 0:
+            return chosen
+
+        taken = set(chosen)
+        remaining = len(self.items) - len(taken)
+        if remaining <= 2 * need:
+            # 남은 후보가 적으면 직접 모아서 뽑음
+            rest = [i for i in range(len(self.items)) if i not in taken]
+            return chosen + rng.sample(rest, need)
+        # 남은 후보가 충분하면 거절 샘플링 (기대 O(need))
+        while need:
+            i = rng.randrange(len(self.items))
+            if i not in taken:
+                taken.add(i)
+                chosen.append(i)
+                need -= 1
+        return chosen
+
+    def _load_file(self, stored: str) -> list:
+        with self._lock:
+            cached = self._records.get(stored)
+        if cached is None:
+            cached = variant_store.read_variants(os.path.join(self.variants_folder, stored))
+            with self._lock:
+                self._records[stored] = cached
+        return cached
+
+    def get_records(self, positions: list) -> list:
+        """후보 위치 목록의 변형 문제 dict를 같은 순서로 반환합니다."""
+        records = []
+        for pos in positions:
+            stored, index = self.items[pos][:2]
+            records.append(self._load_file(stored)[index])
+        return records
+
+
+_pools = OrderedDict()
+_pools_lock = threading.Lock()
+
+
+def _manifest_stat(session_path: str):
+    try:
+        st = os.stat(os.path.join(session_path, 'variants', variant_manifest.MANIFEST_FILENAME))
+        return st.st_mtime_ns, st.st_size
+    except OSError:
+        return None
+
+
+def get_pool(session_path: str) -> VariantPool:
+    """세션의 변형 문제 풀 (manifest가 바뀌지 않았으면 캐시 재사용)"""
+    key = os.path.abspath(session_path)
+    stat = _manifest_stat(session_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        # manifest 파일이 그대로면 다시 읽지도 않음
+        if pool is not None and stat is not None and pool.manifest_stat == stat:
+            _pools.move_to_end(key)
+            return pool
+
+    manifest = variant_manifest.load_manifest(session_path)
+    if pool is not None and pool.version == manifest.get('version', 0):
+        pool.manifest_stat = _manifest_stat(session_path)
+        return pool
+
+    pool = VariantPool(session_path, manifest)
+    pool.manifest_stat = _manifest_stat(session_path)
+    with _pools_lock:
+        _pools[key] = pool
+        _pools.move_to_end(key)
+        while len(_pools) > MAX_CACHED_POOLS:
+            _pools.popitem(last=False)
+    return pool
+
+
+def invalidate(session_path: str):
+    with _pools_lock:
+        _pools.pop(os.path.abspath(session_path), None)
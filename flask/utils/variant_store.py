@@ -0,0 +1,169 @@
+# utils/variant_store.py
+"""변형 문제 세트 저장 형식
+
+- 기본: 기존과 같은 JSON (indent=2)
+- 선택: 압축 바이너리 형식 .qvs (VARIANT_STORAGE_FORMAT=qvs)
+
+.qvs 구조:
+    MAGIC(4) | header_len(uint32) | header JSON | meta 레코드 | variant 레코드...
+    레코드 = len(uint32) + zlib(JSON)
+    header = {format, variant_count, ids, difficulties, difficulty_counts, key_concepts, offsets, meta}
+
+목록 조회나 난이도별 샘플링은 헤더만 읽고, 필요한 레코드만 seek해서 읽습니다.
+read_* 함수는 .json/.qvs를 구분 없이 처리합니다.
+"""
+
+import json
+import os
+import struct
+import uuid
+import zlib
+
+MAGIC = b'QVS1'
+QVS_EXT = '.qvs'
+JSON_EXT = '.json'
+STORAGE_FORMAT = os.environ.get('VARIANT_STORAGE_FORMAT', 'json').lower()
+
+_LEN = struct.Struct('<I')
+
+
+def _pack(obj) -> bytes:
+    raw = json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    data = zlib.compress(raw, 6)
+    return _LEN.pack(len(data)) + data
+
+
+def _unpack(f, offset: int):
+    f.seek(offset)
+    (length,) = _LEN.unpack(f.read(_LEN.size))
+    return json.loads(zlib.decompress(f.read(length)).decode('utf-8'))
+
+
+def _set_concepts(data: dict) -> list:
+    """세트의 핵심 개념 (원본 풀이의 key_concepts)"""
+    return (data.get('original') or {}).get('key_concepts') or []
+
+
+def build_header(variants: list, key_concepts: list = None) -> dict:
+    """변형 문제 목록의 요약 헤더 (개수, ID, 난이도, 핵심 개념)"""
+    difficulties = [v.get('difficulty') for v in variants]
+    counts = {}
+    for d in difficulties:
+        counts[d] = counts.get(d, 0) + 1
+    # 세트 공통 개념 + 변형별 개념 (있으면), 순서 유지하며 중복 제거
+    concepts = list(key_concepts or [])
+    for v in variants:
+        concepts.extend(v.get('key_concepts') or [])
+    return {
+        'format': 1,
+        'variant_count': len(variants),
+        'ids': [v.get('variant_id') for v in variants],
+        'difficulties': difficulties,
+        'difficulty_counts': counts,
+        'key_concepts': list(dict.fromkeys(c for c in concepts if isinstance(c, str) and c.strip())),
+    }
+
+
+def storage_path(json_path: str, fmt: str = None) -> str:
+    """JSON 기준 경로를 실제 저장 형식의 경로로 바꿉니다."""
+    fmt = (fmt or STORAGE_FORMAT).lower()
+    base, ext = os.path.splitext(json_path)
+    return base + QVS_EXT if fmt == 'qvs' and ext == JSON_EXT else json_path
+
+
+def resolve_path(json_path: str):
+    """q1_xxx.json 이름으로 실제 파일(.json 또는 .qvs)을 찾습니다. 없으면 None."""
+    if os.path.exists(json_path):
+        return json_path
+    qvs_path = os.path.splitext(json_path)[0] + QVS_EXT
+    return qvs_path if os.path.exists(qvs_path) else None
+
+
+def is_variant_file(filename: str) -> bool:
+    return filename.endswith(JSON_EXT) or filename.endswith(QVS_EXT)
+
+
+def json_name(filename: str) -> str:
+    """API에 노출하는 파일명 (.qvs도 .json 이름으로 노출)"""
+    return os.path.splitext(filename)[0] + JSON_EXT if filename.endswith(QVS_EXT) else filename
+
+
+def write_variant_set(json_path: str, data: dict, fmt: str = None) -> str:
+    """변형 문제 세트를 저장하고 실제 저장된 경로를 반환합니다."""
+    path = storage_path(json_path, fmt)
+    tmp_path = f'{path}.{uuid.uuid4().hex[:8]}.tmp'
+    if path.endswith(QVS_EXT):
+        variants = data.get('variants', [])
+        meta = {k: v for k, v in data.items() if k != 'variants'}
+        meta_record = _pack(meta)
+        records = [_pack(v) for v in variants]
+
+        header = build_header(variants, _set_concepts(meta))
+        # 오프셋은 헤더 끝 기준
+        offsets, pos = [], len(meta_record)
+        for record in records:
+            offsets.append(pos)
+            pos += len(record)
+        header['meta'] = 0
+        header['offsets'] = offsets
+        header_bytes = json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(_LEN.pack(len(header_bytes)))
+            f.write(header_bytes)
+            f.write(meta_record)
+            for record in records:
+                f.write(record)
+    else:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _read_qvs_header(f) -> tuple:
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError('QVS 파일 형식이 아닙니다.')
+    (header_len,) = _LEN.unpack(f.read(_LEN.size))
+    header = json.loads(f.read(header_len).decode('utf-8'))
+    return header, len(MAGIC) + _LEN.size + header_len
+
+
+def read_header(path: str) -> dict:
+    """개수/난이도/ID 요약. .qvs는 헤더만 읽고, .json은 전체를 읽어서 만듭니다."""
+    if path.endswith(QVS_EXT):
+        with open(path, 'rb') as f:
+            header, base = _read_qvs_header(f)
+            if 'key_concepts' not in header:
+                # key_concepts 추가 전에 저장된 파일은 meta 레코드에서 보충
+                header['key_concepts'] = _set_concepts(_unpack(f, base + header['meta']))
+        return header
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return build_header(data.get('variants', []), _set_concepts(data))
+
+
+def read_variants(path: str, indices=None) -> list:
+    """변형 문제 레코드를 읽습니다. indices를 주면 해당 위치만 읽습니다."""
+    if path.endswith(QVS_EXT):
+        with open(path, 'rb') as f:
+            header, base = _read_qvs_header(f)
+            offsets = header['offsets']
+            wanted = range(len(offsets)) if indices is None else indices
+            return [_unpack(f, base + offsets[i]) for i in wanted]
+    with open(path, 'r', encoding='utf-8') as f:
+        variants = json.load(f).get('variants', [])
+    return variants if indices is None else [variants[i] for i in indices]
+
+
+def read_variant_set(path: str) -> dict:
+    """전체 변형 문제 세트를 기존 JSON과 같은 dict로 읽습니다."""
+    if path.endswith(QVS_EXT):
+        with open(path, 'rb') as f:
+            header, base = _read_qvs_header(f)
+            data = _unpack(f, base + header['meta'])
+            data['variants'] = [_unpack(f, base + off) for off in header['offsets']]
+        return data
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)